@@ -0,0 +1,170 @@
+"""
+Benchmark full MkDocs builds of a synthetic site with the likec4 plugin.
+
+The site has ``--pages`` pages spread over ``--projects`` projects, each page
+embedding ``--views`` views. Code generation is done by ``likec4_stub.py``, so
+neither Node.js nor likec4 is needed. Each build runs in its own process and
+reports wall time, CPU time and peak RSS, plus the time spent in each plugin
+hook, read from the plugin's trace (see the ``trace`` option).
+
+    python benchmarks/build.py --pages 1000 --projects 8 --views 3 --latency 0.5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import stat
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic import generate_site
+
+from mkdocs_likec4.profiling import run_measured
+
+HERE = Path(__file__).resolve().parent
+
+
+def write_stub(root: Path) -> Path:
+    """Write an executable that runs the stub with this Python interpreter."""
+    stub = root / "likec4"
+    stub.write_text(
+        f'#!/bin/sh\nexec "{sys.executable}" "{HERE / "likec4_stub.py"}" "$@"\n'
+    )
+    stub.chmod(stub.stat().st_mode | stat.S_IXUSR)
+    return stub
+
+
+def write_config(root: Path, stub: Path, options: dict) -> Path:
+    plugin = {
+        "likec4_path": str(stub),
+        "cache": False,
+        "trace": "trace.json",
+        "profile_report": "profile.json",
+        **options,
+    }
+    config = root / "mkdocs.yml"
+    # JSON is valid YAML
+    config.write_text(
+        json.dumps(
+            {
+                "site_name": "Benchmark",
+                "docs_dir": "docs",
+                "site_dir": "site",
+                "plugins": [{"likec4": plugin}],
+            },
+            indent=2,
+        )
+    )
+    return config
+
+
+def hook_costs(trace_file: Path) -> dict:
+    """Total time in milliseconds and call count per span name."""
+    costs: dict[str, list] = {}
+    for event in json.loads(trace_file.read_text())["traceEvents"]:
+        if event["ph"] == "X":
+            cost = costs.setdefault(event["name"], [0.0, 0])
+            cost[0] += event["dur"] / 1000
+            cost[1] += 1
+    return {name: {"ms": ms, "calls": n} for name, (ms, n) in sorted(costs.items())}
+
+
+def run_build(args, options: dict) -> dict:
+    with tempfile.TemporaryDirectory(prefix="mkdocs_likec4_bench_") as tmp:
+        root = Path(tmp)
+        generate_site(root, args.pages, args.projects, args.views, args.depth)
+        config = write_config(root, write_stub(root), options)
+        env = dict(
+            os.environ,
+            LIKEC4_STUB_LATENCY=str(args.latency),
+            LIKEC4_STUB_SIZE=str(args.bundle_size),
+        )
+        env.pop("MKDOCS_LIKEC4_TRACE", None)
+
+        start = time.perf_counter()
+        proc = run_measured(
+            [sys.executable, "-m", "mkdocs", "build", "-q", "-f", str(config)],
+            capture_output=True,
+            text=True,
+            env=env,
+        )
+        wall = time.perf_counter() - start
+        if proc.returncode != 0:
+            sys.exit(f"Build failed:\n{proc.stderr}")
+
+        run = {
+            "wall_time": wall,
+            "hooks": hook_costs(root / "trace.json"),
+            "profile": json.loads((root / "profile.json").read_text()),
+        }
+        if proc.usage is not None:
+            # Includes the likec4 processes, which mkdocs waited for
+            run["cpu_time"] = proc.usage.cpu_time
+            run["max_rss"] = proc.usage.max_rss
+        return run
+
+
+def report(runs: list) -> None:
+    walls = [r["wall_time"] for r in runs]
+    print(f"builds:     {len(runs)}")
+    print(f"wall time:  median {statistics.median(walls):.2f}s, min {min(walls):.2f}s")
+    if "cpu_time" in runs[0]:
+        cpu = statistics.median(r["cpu_time"] for r in runs)
+        rss = max(r["max_rss"] for r in runs) / 1024 / 1024
+        print(f"CPU time:   median {cpu:.2f}s")
+        print(f"peak RSS:   {rss:.0f} MB")
+    print()
+    print(f"{'span':<24} {'calls':>7} {'total ms':>10} {'per call ms':>12}")
+    for name in runs[0]["hooks"]:
+        ms = statistics.median(r["hooks"][name]["ms"] for r in runs)
+        calls = runs[0]["hooks"][name]["calls"]
+        print(f"{name:<24} {calls:>7} {ms:>10.1f} {ms / calls:>12.3f}")
+
+
+def parse_option(text: str) -> tuple:
+    key, _, value = text.partition("=")
+    try:
+        return key, json.loads(value)
+    except ValueError:
+        return key, value
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--projects", type=int, default=4)
+    parser.add_argument("--views", type=int, default=2, help="views per page")
+    parser.add_argument("--depth", type=int, default=1, help="page nesting depth")
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="codegen time per project (s)"
+    )
+    parser.add_argument(
+        "--bundle-size", type=int, default=1_000_000, help="bundle size (bytes)"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--option",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="plugin option, e.g. pipeline=eager; values are parsed as JSON",
+    )
+    parser.add_argument("--json", type=Path, help="also write the results here")
+    args = parser.parse_args()
+    if args.projects < 1:
+        parser.error("--projects must be at least 1")
+
+    options = dict(parse_option(o) for o in args.option)
+    runs = [run_build(args, options) for _ in range(args.repeat)]
+    report(runs)
+    if args.json:
+        params = {k: v for k, v in vars(args).items() if k != "json"}
+        params["option"] = options
+        args.json.write_text(json.dumps({"params": params, "runs": runs}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Stand-in for the likec4 CLI, for benchmarking the plugin without Node.js.
+
+Supports ``--version`` and ``codegen webcomponent``. Code generation sleeps
+for ``LIKEC4_STUB_LATENCY`` seconds and writes a bundle of
+``LIKEC4_STUB_SIZE`` bytes, so that the cost of the real CLI can be modelled.
+"""
+
+import os
+import random
+import sys
+import time
+
+
+def codegen(args: list) -> int:
+    out = args[args.index("-o") + 1]
+    prefix = "likec4"
+    if "--webcomponent-prefix" in args:
+        prefix = args[args.index("--webcomponent-prefix") + 1]
+    time.sleep(float(os.environ.get("LIKEC4_STUB_LATENCY", "0")))
+
+    size = int(os.environ.get("LIKEC4_STUB_SIZE", "1000000"))
+    head = f"customElements.define('{prefix}-view', class extends HTMLElement {{}});\n"
+    # Identifier soup compresses about as well as a minified bundle
+    rng = random.Random(out)
+    words = ["".join(rng.choices("abcdefghijklmnop", k=6)) for _ in range(512)]
+    body = []
+    length = len(head)
+    while length < size:
+        line = "var " + ",".join(rng.choices(words, k=12)) + ";\n"
+        body.append(line)
+        length += len(line)
+    with open(out, "w") as f:
+        f.write((head + "".join(body))[:size])
+    return 0
+
+
+def main(args: list) -> int:
+    if args == ["--version"]:
+        print("likec4 0.0.0-stub")
+        return 0
+    if args[:2] == ["codegen", "webcomponent"]:
+        return codegen(args[2:])
+    print(f"likec4 stub: unsupported command: {' '.join(args)}", file=sys.stderr)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,189 @@
+"""
+Micro-benchmarks of the code that runs for every page.
+
+Times ``LikeC4Parser.sub`` (next to the regex ``PATTERN.sub`` it replaced),
+``LikeC4Parser.parse_options``, ``LikeC4Parser.to_html`` and
+``LikeC4Plugin._find_nearest_project`` on synthetic corpora, and compares the
+results with stored baselines:
+
+    python benchmarks/micro.py --save      # record baselines on this machine
+    python benchmarks/micro.py             # fail if anything got slower
+
+Timings depend on the machine, so baselines should be recorded on the machine
+that checks them.
+"""
+
+import argparse
+import json
+import random
+import sys
+import timeit
+from pathlib import Path
+
+from synthetic import FENCE_OPTIONS, PROSE, page, project_name
+
+from mkdocs_likec4.parser import LikeC4Parser, ViewOptions
+from mkdocs_likec4.plugin import LikeC4Plugin
+
+HERE = Path(__file__).resolve().parent
+DEFAULT_BASELINE = HERE / "baselines.json"
+
+
+def corpora() -> dict:
+    """Markdown pages of the shapes found on large sites."""
+    rng = random.Random(0)
+    views = [f"view{i}" for i in range(50)]
+    return {
+        "no_views": page([], rng, paragraphs=20),
+        "few_views": page(rng.choices(views, k=3), rng, paragraphs=5),
+        "many_views": page(rng.choices(views, k=200), rng, paragraphs=5),
+        # About 1 MB of prose with a handful of views
+        "large_page": page(rng.choices(views, k=10), rng, paragraphs=2000)
+        + f"\n{PROSE}\n" * 2000,
+    }
+
+
+def fence_lines() -> list:
+    rng = random.Random(1)
+    return [
+        (rng.choice(FENCE_OPTIONS) + f" project={project_name(i % 7)}").strip()
+        for i in range(1000)
+    ]
+
+
+def deep_tree_plugin(depth: int = 30, projects: int = 200) -> tuple:
+    """A plugin with projects at every level of a deep tree, and pages below."""
+    plugin = LikeC4Plugin()
+    docs = Path("/docs")
+    plugin.project_map = {}
+    for i in range(projects):
+        level = i % depth
+        plugin.project_map[project_name(i)] = "/".join(
+            [f"team{i % 10}"] + [f"d{d}" for d in range(level)]
+        )
+    pages = [
+        docs.joinpath(f"team{i % 10}", *(f"d{d}" for d in range(depth)), "page.md")
+        for i in range(100)
+    ] + [docs / "unrelated" / "page.md"]
+    return plugin, docs, pages
+
+
+def cases() -> dict:
+    """Benchmarked callables, each processing one unit of work per call."""
+    benches = {}
+    for name, text in corpora().items():
+        benches[f"PATTERN.sub[{name}]"] = lambda text=text: LikeC4Parser.PATTERN.sub(
+            "", text
+        )
+        # The scanner that replaced PATTERN in on_page_markdown
+        benches[f"sub[{name}]"] = lambda text=text: LikeC4Parser.sub(str, text)
+
+    lines = fence_lines()
+
+    def parse_options():
+        for line in lines:
+            LikeC4Parser.parse_options(line, "view")
+
+    benches["parse_options[1000 fences]"] = parse_options
+
+    opts = [
+        LikeC4Parser.parse_options(line, f"view{i}") for i, line in enumerate(lines)
+    ]
+    lazy = [ViewOptions(o.view_id, project=o.project, loading="lazy") for o in opts]
+
+    def to_html():
+        for o in opts:
+            LikeC4Parser.to_html(o)
+
+    def to_html_lazy():
+        for o in lazy:
+            LikeC4Parser.to_html(o, "likec4_views.js")
+
+    benches["to_html[1000 views]"] = to_html
+    benches["to_html[1000 lazy views]"] = to_html_lazy
+
+    plugin, docs, pages = deep_tree_plugin()
+
+    def find_nearest():
+        for p in pages:
+            plugin._find_nearest_project(p, docs)
+
+    def find_nearest_cold():
+        # Assigning the projects drops the index and the per-directory memo
+        plugin.project_map = plugin.project_map
+        find_nearest()
+
+    benches["_find_nearest_project[101 deep pages]"] = find_nearest
+    benches["_find_nearest_project[101 deep pages, cold]"] = find_nearest_cold
+    return benches
+
+
+def measure(func, repeat: int, min_time: float) -> float:
+    """Best time per call in seconds, over ``repeat`` runs of auto-sized loops."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--save", action="store_true", help="store the results as the baseline"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed slowdown relative to the baseline (default: 0.25 = 25%%)",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--min-time", type=float, default=0.2, help="seconds per timing loop"
+    )
+    parser.add_argument("-k", dest="filter", help="only run benchmarks containing this")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline.is_file() and not args.save:
+        baseline = json.loads(args.baseline.read_text())
+
+    results = {}
+    failed = []
+    print(f"{'benchmark':<46} {'time':>12} {'baseline':>12} {'change':>8}")
+    for name, func in cases().items():
+        if args.filter and args.filter not in name:
+            continue
+        results[name] = seconds = measure(func, args.repeat, args.min_time)
+        line = f"{name:<46} {seconds * 1e6:>10.1f}us"
+        if name in baseline:
+            change = seconds / baseline[name] - 1
+            line += f" {baseline[name] * 1e6:>10.1f}us {change:>+8.1%}"
+            if change > args.tolerance:
+                failed.append(name)
+                line += "  SLOWER"
+        print(line)
+
+    if args.save:
+        stored = {}
+        if args.baseline.is_file():
+            stored = json.loads(args.baseline.read_text())
+        stored.update(results)
+        args.baseline.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n")
+        print(f"\nSaved baseline to {args.baseline}")
+    elif not baseline:
+        print(f"\nNo baseline at {args.baseline}, run with --save to record one")
+
+    if failed:
+        print(
+            f"\n{len(failed)} benchmark(s) slower than the baseline by more than "
+            f"{args.tolerance:.0%}: {', '.join(failed)}",
+            file=sys.stderr,
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""Generators for synthetic documentation sites and markdown pages."""
+
+import json
+import random
+from pathlib import Path
+
+PROSE = (
+    "The order service publishes events to the message broker, and the billing "
+    "service consumes them to create invoices. See the container view for the "
+    "deployment boundaries, and the sequence below for the checkout flow."
+)
+
+FENCE_OPTIONS = [
+    "",
+    " browser=false",
+    " dynamic-variant=sequence",
+    " color-scheme=dark",
+    " browser=true dynamic-variant=diagram",
+]
+
+
+def project_name(index: int) -> str:
+    return f"project{index}"
+
+
+def view_block(view_id: str, rng: random.Random, project: str = "") -> str:
+    options = rng.choice(FENCE_OPTIONS)
+    if project:
+        options += f" project={project}"
+    return f"```likec4-view{options}\n{view_id}\n```\n"
+
+
+def page(views: list, rng: random.Random, paragraphs: int = 3) -> str:
+    """A markdown page with ``views`` spread between prose and code blocks."""
+    parts = ["# Synthetic page\n"]
+    for i, view_id in enumerate(views):
+        parts.append(f"\n## Section {i}\n\n{PROSE}\n\n")
+        parts.append(view_block(view_id, rng))
+    for i in range(paragraphs):
+        parts.append(f"\n## Notes {i}\n\n{PROSE}\n\n```python\nprint({i})\n```\n")
+    return "".join(parts)
+
+
+def generate_site(
+    root: Path,
+    pages: int,
+    projects: int,
+    views: int,
+    depth: int = 1,
+    seed: int = 0,
+) -> Path:
+    """
+    Write a doc tree with ``pages`` pages spread over ``projects`` projects.
+
+    Every page embeds ``views`` views of the project it belongs to, and pages
+    are nested ``depth`` directories below their project's directory.
+    Returns the docs directory.
+    """
+    rng = random.Random(seed)
+    docs = root / "docs"
+    docs.mkdir(parents=True)
+    (docs / "index.md").write_text("# Benchmark\n")
+    view_ids = [f"view{i}" for i in range(max(views, 1))]
+    for p in range(projects):
+        project_dir = docs / project_name(p)
+        project_dir.mkdir()
+        (project_dir / "likec4.config.json").write_text(
+            json.dumps({"name": project_name(p)})
+        )
+        views_src = "".join(f"  view {v} {{\n    include *\n  }}\n" for v in view_ids)
+        (project_dir / "model.c4").write_text(
+            "model {\n  system = softwareSystem 'System'\n}\n"
+            f"views {{\n{views_src}}}\n"
+        )
+    for i in range(pages):
+        nested = Path(project_name(i % projects)).joinpath(
+            *(f"level{d}" for d in range(depth))
+        )
+        dest = docs / nested / f"page{i}.md"
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        dest.write_text(page(rng.choices(view_ids, k=views), rng))
+    return docs
@@ -0,0 +1,125 @@
+(function () {
+  // Loads LikeC4 web component bundles, each at most once per document, so
+  // that instant navigation never evaluates a bundle twice.
+  //
+  // The bundles listed in this script's data-likec4-bundles attribute are
+  // loaded right away. The bundle of a view element with a data-likec4-bundle
+  // attribute is loaded when the element is added to the page.
+  //
+  // Lazy views are <template>s inside a data-likec4-lazy wrapper. Their bundle
+  // is loaded once the wrapper comes within a viewport height of the visible
+  // area, and the view is mounted when the wrapper becomes visible.
+  //
+  // Bundle URLs are relative to this script, so they stay valid when instant
+  // navigation swaps the page content.
+  var loader = window.mkdocsLikec4Loader;
+  if (!loader) {
+    var loaded = {};
+    var script =
+      document.currentScript || document.querySelector('script[src$="mkdocs_likec4/loader.js"]');
+    var base = script ? script.src : document.baseURI;
+
+    var mount = function (wrapper) {
+      var template = wrapper.querySelector("template");
+      if (!template) return;
+      var placeholder = wrapper.querySelector(".likec4-placeholder");
+      var view = template.content.firstElementChild;
+      if (placeholder && view) view.appendChild(placeholder);
+      wrapper.replaceChild(template.content, template);
+      wrapper.style.minHeight = "";
+      document.dispatchEvent(new CustomEvent("mkdocs-likec4:mount", { detail: wrapper }));
+    };
+
+    var near = null;
+    var visible = null;
+    if ("IntersectionObserver" in window) {
+      near = new IntersectionObserver(
+        function (entries) {
+          entries.forEach(function (entry) {
+            if (!entry.isIntersecting) return;
+            near.unobserve(entry.target);
+            loader.load(entry.target.getAttribute("data-likec4-lazy"));
+          });
+        },
+        { rootMargin: "100% 0px" }
+      );
+      visible = new IntersectionObserver(function (entries) {
+        entries.forEach(function (entry) {
+          if (!entry.isIntersecting) return;
+          visible.unobserve(entry.target);
+          mount(entry.target);
+        });
+      });
+    }
+
+    var observe = function (wrapper) {
+      if (!near) {
+        loader.load(wrapper.getAttribute("data-likec4-lazy"));
+        mount(wrapper);
+        return;
+      }
+      near.observe(wrapper);
+      visible.observe(wrapper);
+    };
+
+    loader = window.mkdocsLikec4Loader = {
+      load: function (src) {
+        var url = new URL(src, base).href;
+        if (loaded[url]) return;
+        loaded[url] = true;
+        var script = document.createElement("script");
+        script.src = url;
+        document.head.appendChild(script);
+      },
+      scan: function (root) {
+        if (root.hasAttribute && root.hasAttribute("data-likec4-bundle")) {
+          loader.load(root.getAttribute("data-likec4-bundle"));
+        }
+        var els = root.querySelectorAll ? root.querySelectorAll("[data-likec4-bundle]") : [];
+        for (var i = 0; i < els.length; i++) {
+          loader.load(els[i].getAttribute("data-likec4-bundle"));
+        }
+        if (root.hasAttribute && root.hasAttribute("data-likec4-lazy")) observe(root);
+        var lazy = root.querySelectorAll ? root.querySelectorAll("[data-likec4-lazy]") : [];
+        for (var j = 0; j < lazy.length; j++) observe(lazy[j]);
+      },
+    };
+
+    var init = function () {
+      loader.scan(document);
+
+      new MutationObserver(function (records) {
+        for (var i = 0; i < records.length; i++) {
+          var nodes = records[i].addedNodes;
+          for (var j = 0; j < nodes.length; j++) {
+            if (nodes[j].nodeType === 1) loader.scan(nodes[j]);
+          }
+        }
+      }).observe(document.body, { childList: true, subtree: true });
+
+      // Material for MkDocs emits every page shown by instant navigation
+      if (window.document$ && window.document$.subscribe) {
+        window.document$.subscribe(function () {
+          loader.scan(document);
+        });
+      }
+    };
+
+    if (document.readyState === "loading") {
+      document.addEventListener("DOMContentLoaded", init);
+    } else {
+      init();
+    }
+  }
+
+  // Module scripts have no currentScript, they load every listed bundle
+  var current = document.currentScript;
+  var lists = current ? [current] : document.querySelectorAll("script[data-likec4-bundles]");
+  for (var i = 0; i < lists.length; i++) {
+    var bundles = lists[i].getAttribute("data-likec4-bundles");
+    if (!bundles) continue;
+    bundles.split(" ").forEach(function (src) {
+      if (src) loader.load(src);
+    });
+  }
+})();
@@ -0,0 +1,99 @@
+(function () {
+  // Prefetches the LikeC4 bundles of linked pages when a link is hovered,
+  // focused or scrolled into view, using the page-to-bundle manifest written
+  // next to this script.
+  if (window.mkdocsLikec4Prefetch) return;
+  var connection = navigator.connection;
+  if (connection && (connection.saveData || /2g/.test(connection.effectiveType || ""))) {
+    return;
+  }
+
+  var script = document.currentScript;
+  var manifestUrl = new URL("prefetch.json", script.src);
+  var root = new URL("../../", script.src);
+  var manifest = null;
+  var pending = [];
+  var prefetched = {};
+
+  function bundlesOf(href) {
+    var url = new URL(href, document.baseURI);
+    if (url.origin !== root.origin || url.pathname.indexOf(root.pathname) !== 0) return [];
+    var page = decodeURI(url.pathname.slice(root.pathname.length));
+    var ids = manifest.pages[page];
+    if (!ids && /(^|\/)index\.html$/.test(page)) {
+      ids = manifest.pages[page.replace(/index\.html$/, "")];
+    }
+    return (ids || []).map(function (i) {
+      return manifest.bundles[i];
+    });
+  }
+
+  function prefetch(link) {
+    if (!manifest) {
+      pending.push(link);
+      return;
+    }
+    bundlesOf(link.href).forEach(function (bundle) {
+      if (prefetched[bundle]) return;
+      prefetched[bundle] = true;
+      var hint = document.createElement("link");
+      hint.rel = "prefetch";
+      hint.as = "script";
+      hint.href = new URL(bundle, root).href;
+      document.head.appendChild(hint);
+    });
+  }
+
+  function onInteraction(event) {
+    var link = event.target.closest && event.target.closest("a[href]");
+    if (link) prefetch(link);
+  }
+
+  var visible =
+    "IntersectionObserver" in window
+      ? new IntersectionObserver(function (entries) {
+          entries.forEach(function (entry) {
+            if (!entry.isIntersecting) return;
+            visible.unobserve(entry.target);
+            prefetch(entry.target);
+          });
+        })
+      : null;
+
+  function observe(root) {
+    if (!visible) return;
+    var links = root.querySelectorAll("a[href]");
+    for (var i = 0; i < links.length; i++) visible.observe(links[i]);
+  }
+
+  window.mkdocsLikec4Prefetch = { observe: observe };
+
+  fetch(manifestUrl)
+    .then(function (response) {
+      return response.ok ? response.json() : null;
+    })
+    .then(function (data) {
+      if (!data) return;
+      manifest = data;
+      pending.splice(0).forEach(prefetch);
+    })
+    .catch(function () {});
+
+  document.addEventListener("mouseover", onInteraction, { passive: true });
+  document.addEventListener("focusin", onInteraction);
+  document.addEventListener("touchstart", onInteraction, { passive: true });
+
+  if (document.readyState === "loading") {
+    document.addEventListener("DOMContentLoaded", function () {
+      observe(document);
+    });
+  } else {
+    observe(document);
+  }
+  // Links of pages shown by instant navigation in Material for MkDocs
+  if (window.document$ && window.document$.subscribe) {
+    window.document$.subscribe(function () {
+      observe(document);
+    });
+  }
+})();
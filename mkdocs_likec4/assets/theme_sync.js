@@ -1,31 +1,92 @@
 (function () {
+  // Keeps the color scheme of LikeC4 views with data-likec4-auto-scheme in
+  // sync with the MkDocs theme. Views are kept in a registry that is updated
+  // as they are added to the page, and changes are applied in one animation
+  // frame. Running this script again, e.g. after instant navigation, only
+  // registers the views of the new page.
+  if (window.mkdocsLikec4ThemeSync) {
+    window.mkdocsLikec4ThemeSync.register(document);
+    return;
+  }
+
+  var views = new Set();
+  var frame = 0;
+
   function resolve() {
     var attr = document.body && document.body.getAttribute("data-md-color-scheme");
     if (attr) return attr === "slate" ? "dark" : "light";
     return window.matchMedia("(prefers-color-scheme: dark)").matches ? "dark" : "light";
   }
 
-  function apply() {
+  function flush() {
+    frame = 0;
     var scheme = resolve();
-    var els = document.querySelectorAll("[data-likec4-auto-scheme]");
-    for (var i = 0; i < els.length; i++) {
-      if (els[i].getAttribute("color-scheme") !== scheme) {
-        els[i].setAttribute("color-scheme", scheme);
+    views.forEach(function (el) {
+      if (!el.isConnected) {
+        views.delete(el);
+      } else if (el.getAttribute("color-scheme") !== scheme) {
+        el.setAttribute("color-scheme", scheme);
       }
+    });
+  }
+
+  function schedule() {
+    if (!frame) frame = requestAnimationFrame(flush);
+  }
+
+  function register(root) {
+    var found = false;
+    if (root.hasAttribute && root.hasAttribute("data-likec4-auto-scheme")) {
+      views.add(root);
+      found = true;
+    }
+    var els = root.querySelectorAll ? root.querySelectorAll("[data-likec4-auto-scheme]") : [];
+    for (var i = 0; i < els.length; i++) {
+      views.add(els[i]);
+      found = true;
     }
+    if (found) schedule();
   }
 
+  window.mkdocsLikec4ThemeSync = { register: register };
+
   function init() {
-    apply();
+    register(document);
+    // Apply the initial scheme right away, before the views first render
+    flush();
 
-    new MutationObserver(apply).observe(document.body, {
+    new MutationObserver(function (records) {
+      for (var i = 0; i < records.length; i++) {
+        var record = records[i];
+        if (record.type === "attributes") {
+          schedule();
+          continue;
+        }
+        for (var j = 0; j < record.addedNodes.length; j++) {
+          if (record.addedNodes[j].nodeType === 1) register(record.addedNodes[j]);
+        }
+      }
+    }).observe(document.body, {
       attributes: true,
       attributeFilter: ["data-md-color-scheme"],
+      childList: true,
+      subtree: true,
+    });
+
+    // Lazy views are added to the page later, see loader.js
+    document.addEventListener("mkdocs-likec4:mount", function (event) {
+      register(event.detail || document);
     });
+    // Material for MkDocs emits every page shown by instant navigation
+    if (window.document$ && window.document$.subscribe) {
+      window.document$.subscribe(function () {
+        register(document);
+      });
+    }
 
     var mq = window.matchMedia("(prefers-color-scheme: dark)");
-    if (mq.addEventListener) mq.addEventListener("change", apply);
-    else if (mq.addListener) mq.addListener(apply);
+    if (mq.addEventListener) mq.addEventListener("change", schedule);
+    else if (mq.addListener) mq.addListener(schedule);
   }
 
   if (document.readyState === "loading") {
@@ -0,0 +1,102 @@
+import gzip
+import json
+import logging
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+from .compress import format_size
+
+log = logging.getLogger(f"mkdocs.plugins.{__name__}")
+
+
+@dataclass
+class BundleSize:
+    """Raw and gzip size of a generated bundle, in bytes."""
+
+    project: Optional[str]
+    path: str
+    size: int
+    gzip: int
+
+
+@dataclass
+class SizeBudget:
+    """Byte limits for each bundle and for all bundles together."""
+
+    project: Optional[int] = None
+    project_gzip: Optional[int] = None
+    total: Optional[int] = None
+    total_gzip: Optional[int] = None
+
+    @property
+    def enabled(self) -> bool:
+        return any(v is not None for v in asdict(self).values())
+
+
+def gzip_size(path: Path) -> int:
+    """
+    Size of ``path`` after gzip compression.
+
+    A ``.gz`` sibling written after the file, see :mod:`~mkdocs_likec4.compress`,
+    is measured instead of compressing the file again.
+    """
+    gz = path.with_name(path.name + ".gz")
+    try:
+        if gz.stat().st_mtime_ns >= path.stat().st_mtime_ns:
+            return gz.stat().st_size
+    except FileNotFoundError:
+        pass
+    return len(gzip.compress(path.read_bytes(), compresslevel=9, mtime=0))
+
+
+def measure(site_dir: Path, bundles: dict) -> list[BundleSize]:
+    """Measure the bundles in ``bundles``, which maps site paths to projects."""
+    sizes = []
+    for path, project in sorted(bundles.items()):
+        file = site_dir / path
+        if file.is_file():
+            sizes.append(
+                BundleSize(project, path, file.stat().st_size, gzip_size(file))
+            )
+    return sizes
+
+
+def check(sizes: list[BundleSize], budget: SizeBudget) -> list[str]:
+    """Describe every budget that ``sizes`` exceed."""
+    exceeded = []
+
+    def over(what: str, size: int, limit: Optional[int]) -> None:
+        if limit is not None and size > limit:
+            exceeded.append(
+                f"{what} is {format_size(size)}, "
+                f"over its budget of {format_size(limit)}"
+            )
+
+    for bundle in sizes:
+        label = f"project '{bundle.project}'" if bundle.project else "default project"
+        over(f"Bundle of {label}", bundle.size, budget.project)
+        over(f"Gzipped bundle of {label}", bundle.gzip, budget.project_gzip)
+    over("Total bundle size", sum(b.size for b in sizes), budget.total)
+    over("Total gzipped bundle size", sum(b.gzip for b in sizes), budget.total_gzip)
+    return exceeded
+
+
+def write_report(
+    path: Path, sizes: list[BundleSize], budget: SizeBudget, exceeded: list[str]
+) -> None:
+    """Write the sizes as JSON, with stable ordering so reports can be diffed."""
+    report = {
+        "bundles": [asdict(b) for b in sizes],
+        "total": {
+            "size": sum(b.size for b in sizes),
+            "gzip": sum(b.gzip for b in sizes),
+        },
+        "budget": asdict(budget),
+        "exceeded": exceeded,
+    }
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+    except OSError as e:
+        log.warning("mkdocs-likec4: Failed to write size report %s: %s", path, e)
@@ -0,0 +1,203 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Iterable, Optional
+
+import pathspec
+import pyjson5
+
+log = logging.getLogger(f"mkdocs.plugins.{__name__}")
+
+SOURCE_SUFFIXES = (".c4", ".likec4")
+# Icons and images referenced by relative paths end up in the bundle
+ASSET_SUFFIXES = (".svg", ".png", ".jpg", ".jpeg", ".gif", ".webp")
+CONFIG_FILE = "likec4.config.json"
+DEFAULT_EXCLUDE = ("node_modules/", ".*/")
+
+
+def is_input(path: Path) -> bool:
+    """Whether a file can affect the generated web component of its project."""
+    return (
+        path.suffix.lower() in SOURCE_SUFFIXES + ASSET_SUFFIXES
+        or path.name == CONFIG_FILE
+    )
+
+
+def include_dirs(project_path: Path) -> list[Path]:
+    """
+    List the directories outside ``project_path`` that its config includes.
+
+    Both ``"include": [...]`` and ``"include": {"paths": [...]}`` are accepted.
+    """
+    try:
+        with project_path.joinpath(CONFIG_FILE).open("r") as f:
+            config = pyjson5.load(f)
+    except (pyjson5.Json5Exception, OSError):
+        return []
+    include = config.get("include") if isinstance(config, dict) else None
+    if isinstance(include, dict):
+        include = include.get("paths")
+    if not isinstance(include, list):
+        return []
+    root = project_path.resolve()
+    dirs = []
+    for rel in include:
+        if not isinstance(rel, str):
+            continue
+        path = (project_path / rel).resolve()
+        if path.is_dir() and not path.is_relative_to(root) and path not in dirs:
+            dirs.append(path)
+    return dirs
+
+
+def input_files(root: Path, exclude: Iterable[str] = DEFAULT_EXCLUDE) -> list[Path]:
+    """
+    List the input files below ``root``, see :func:`is_input`.
+
+    Directories matching the gitignore-style ``exclude`` patterns, relative to
+    ``root``, are not descended into.
+    """
+    spec = pathspec.GitIgnoreSpec.from_lines(exclude)
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        rel = Path(dirpath).relative_to(root).as_posix()
+        prefix = "" if rel == "." else f"{rel}/"
+        dirnames[:] = [d for d in dirnames if not spec.match_file(f"{prefix}{d}/")]
+        files.extend(
+            Path(dirpath, name)
+            for name in filenames
+            if is_input(Path(name)) and not spec.match_file(f"{prefix}{name}")
+        )
+    return sorted(files)
+
+
+class BundleCache:
+    """
+    Content-addressed on-disk cache for generated web component bundles.
+
+    Entries keep the suffix of the stored file, so other build artifacts of a
+    project, like exported images, can be cached alongside the bundles.
+    """
+
+    BUNDLES_DIR = "bundles"
+    INDEX_FILE = "sources.json"
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_size: int,
+        exclude: Iterable[str] = DEFAULT_EXCLUDE,
+    ):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.exclude = exclude
+        self._index: Optional[dict] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def source_files(
+        project_path: Path, exclude: Iterable[str] = DEFAULT_EXCLUDE
+    ) -> list[Path]:
+        """
+        List the files that determine a project's generated bundle.
+
+        These are the inputs in the project directory, followed by those in the
+        directories its config includes.
+        """
+        files = input_files(project_path, exclude)
+        for path in include_dirs(project_path):
+            files.extend(input_files(path, exclude))
+        return list(dict.fromkeys(files))
+
+    def fingerprint(self, project_path: Path, params: dict) -> str:
+        """
+        Compute the cache key for a project.
+
+        The key covers the content of every input file, including images and
+        included directories, plus ``params`` (likec4 version and codegen
+        flags). File digests are reused from the previous build as long as the
+        file's mtime and size are unchanged.
+        """
+        with self._lock:
+            index = self._load_index()
+        h = hashlib.sha256(json.dumps(params, sort_keys=True).encode())
+        for path in self.source_files(project_path, self.exclude):
+            st = path.stat()
+            entry = index.get(str(path))
+            if entry and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+                digest = entry[2]
+            else:
+                digest = hashlib.sha256(path.read_bytes()).hexdigest()
+                index[str(path)] = [st.st_mtime_ns, st.st_size, digest]
+            # Included directories may lie outside the project
+            rel = Path(os.path.relpath(path, project_path)).as_posix()
+            h.update(f"{rel}\0{digest}\n".encode())
+        return h.hexdigest()
+
+    def _bundle_path(self, key: str, suffix: str) -> Path:
+        return self.cache_dir / self.BUNDLES_DIR / f"{key}{suffix}"
+
+    def get(self, key: str, dest: Path) -> bool:
+        """Copy a cached bundle to ``dest``. Returns False on a cache miss."""
+        cached = self._bundle_path(key, dest.suffix)
+        try:
+            shutil.copyfile(cached, dest)
+        except FileNotFoundError:
+            return False
+        # Refresh the mtime so eviction treats this entry as recently used
+        os.utime(cached)
+        return True
+
+    def put(self, key: str, src: Path) -> None:
+        """Store a freshly generated bundle and evict old entries if needed."""
+        cached = self._bundle_path(key, src.suffix)
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cached.with_name(f"{cached.name}.tmp")
+        try:
+            shutil.copyfile(src, tmp)
+            os.replace(tmp, cached)
+        except OSError as e:
+            log.warning("mkdocs-likec4: Failed to cache %s: %s", src, e)
+            return
+        with self._lock:
+            self._evict()
+
+    def _evict(self) -> None:
+        """Remove least recently used bundles until the cache fits ``max_size``."""
+        entries = []
+        for p in self.cache_dir.joinpath(self.BUNDLES_DIR).iterdir():
+            if p.suffix == ".tmp":
+                continue
+            st = p.stat()
+            entries.append((st.st_mtime, st.st_size, p))
+        total = sum(size for _, size, _ in entries)
+        for _, size, p in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_size:
+                break
+            p.unlink(missing_ok=True)
+            total -= size
+            log.debug("mkdocs-likec4: Evicted cached bundle %s", p.name)
+
+    def _load_index(self) -> dict:
+        if self._index is None:
+            try:
+                with self.cache_dir.joinpath(self.INDEX_FILE).open("r") as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def save(self) -> None:
+        """Persist the source digest index for the next build."""
+        if self._index is None:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with self.cache_dir.joinpath(self.INDEX_FILE).open("w") as f:
+                json.dump(self._index, f)
+        except OSError as e:
+            log.warning("mkdocs-likec4: Failed to write cache index: %s", e)
@@ -0,0 +1,91 @@
+import logging
+import os
+import shutil
+import subprocess
+import threading
+from pathlib import Path
+from typing import Optional
+
+log = logging.getLogger(f"mkdocs.plugins.{__name__}")
+
+_versions: dict[tuple, Optional[str]] = {}
+_versions_lock = threading.Lock()
+
+
+class Likec4Cli:
+    """
+    A resolved likec4 executable.
+
+    Resolution prefers an explicitly configured path, then a project-local
+    ``node_modules/.bin/likec4``, then ``likec4`` on ``PATH``. Only if none of
+    them exist is ``npx`` used, with ``--no`` so that it never tries to
+    install the package from the registry.
+    """
+
+    def __init__(self, command: list[str]):
+        self.command = command
+
+    def __repr__(self) -> str:
+        return f"Likec4Cli({self.command!r})"
+
+    @classmethod
+    def resolve(
+        cls, configured: Optional[str] = None, search_dirs: tuple = ()
+    ) -> Optional["Likec4Cli"]:
+        """
+        Locate the likec4 executable without running it.
+
+        A relative ``configured`` path is taken relative to the first of
+        ``search_dirs``, which are also searched for ``node_modules``.
+        """
+        if configured:
+            path = Path(configured)
+            if not path.is_absolute() and search_dirs:
+                path = Path(search_dirs[0]) / path
+            if path.is_file():
+                return cls([str(path.resolve())])
+            log.warning("mkdocs-likec4: Configured likec4_path not found: %s", path)
+
+        for base in search_dirs:
+            local = Path(base) / "node_modules" / ".bin" / "likec4"
+            if local.is_file():
+                return cls([str(local.absolute())])
+
+        if likec4 := shutil.which("likec4"):
+            return cls([likec4])
+        if npx := shutil.which("npx"):
+            return cls([npx, "--no", "likec4"])
+        return None
+
+    @property
+    def version(self) -> Optional[str]:
+        """
+        The likec4 version, probed with ``likec4 --version`` on first access.
+
+        Results are remembered per executable and its modification time, so
+        rebuilds during ``mkdocs serve`` do not start Node.js again.
+        """
+        key = (*self.command, self._mtime())
+        with _versions_lock:
+            if key not in _versions:
+                _versions[key] = self._probe()
+            return _versions[key]
+
+    def _mtime(self) -> int:
+        try:
+            return os.stat(self.command[0]).st_mtime_ns
+        except OSError:
+            return 0
+
+    def _probe(self) -> Optional[str]:
+        try:
+            result = subprocess.run(
+                [*self.command, "--version"],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+        except (subprocess.CalledProcessError, OSError) as e:
+            log.warning("mkdocs-likec4: Failed to determine likec4 version: %s", e)
+            return None
+        return result.stdout.strip() or None
@@ -0,0 +1,96 @@
+import gzip
+import hashlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from .cache import BundleCache
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+log = logging.getLogger(f"mkdocs.plugins.{__name__}")
+
+SUFFIXES = {"gzip": ".gz", "brotli": ".br"}
+
+
+@dataclass
+class CompressedAsset:
+    """Sizes of an asset and of its precompressed variants, in bytes."""
+
+    path: Path
+    size: int
+    variants: dict[str, int] = field(default_factory=dict)
+    cached: int = 0
+
+
+def available_encodings(encodings: list) -> list:
+    """Drop the encodings whose compressor is not installed."""
+    if "brotli" in encodings and brotli is None:
+        log.warning(
+            "mkdocs-likec4: Skipping brotli compression, install the 'brotli' package"
+        )
+        return [e for e in encodings if e != "brotli"]
+    return list(encodings)
+
+
+def _encode(data: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        # A fixed mtime keeps the output identical for identical input
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    return brotli.compress(data, quality=11)
+
+
+def compress_file(
+    path: Path, encodings: list, cache: Optional[BundleCache] = None
+) -> CompressedAsset:
+    """
+    Write ``<path>.gz`` and/or ``<path>.br`` next to ``path``.
+
+    With a ``cache``, a variant compressed earlier from identical content is
+    copied instead of compressing again.
+    """
+    data = path.read_bytes()
+    asset = CompressedAsset(path, len(data))
+    digest = hashlib.sha256(data).hexdigest()
+    for encoding in encodings:
+        dest = path.with_name(path.name + SUFFIXES[encoding])
+        key = hashlib.sha256(f"{digest}\0{encoding}".encode()).hexdigest()
+        if cache is not None and cache.get(key, dest):
+            asset.cached += 1
+        else:
+            dest.write_bytes(_encode(data, encoding))
+            if cache is not None:
+                cache.put(key, dest)
+        asset.variants[encoding] = dest.stat().st_size
+    return asset
+
+
+def compress_assets(
+    paths: list,
+    encodings: list,
+    cache: Optional[BundleCache] = None,
+    max_workers: Optional[int] = None,
+) -> list[CompressedAsset]:
+    """Compress several files concurrently, returning results in input order."""
+    if not paths or not encodings:
+        return []
+    workers = min(max_workers or os.cpu_count() or 1, len(paths))
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="mkdocs-likec4-compress"
+    ) as pool:
+        futures = [pool.submit(compress_file, p, encodings, cache) for p in paths]
+        return [f.result() for f in futures]
+
+
+def format_size(size: int) -> str:
+    for unit in ("B", "kB"):
+        if size < 1000:
+            return f"{size} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1000
+    return f"{size:.1f} MB"
@@ -0,0 +1,179 @@
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+
+import pathspec
+import pyjson5
+
+from .cache import CONFIG_FILE
+
+log = logging.getLogger(f"mkdocs.plugins.{__name__}")
+
+INDEX_VERSION = 1
+
+
+class ProjectDiscovery:
+    """
+    Finds the ``likec4.config.json`` files below a docs directory.
+
+    Directories matching an exclude pattern are not descended into. The
+    listing of every directory is remembered together with its mtime, so a
+    directory whose entries did not change is not listed again. Likewise the
+    project name of a config file is only parsed again once its mtime or size
+    changes. With an ``index_file`` this is persisted between builds.
+    """
+
+    def __init__(self, index_file: Optional[Path] = None):
+        self.index_file = index_file
+        self._root: Optional[str] = None
+        self._dirs: Optional[dict] = None
+        self._configs: Optional[dict] = None
+        self._changed = False
+
+    def discover(
+        self,
+        docs_dir: Path,
+        include: Optional[list] = None,
+        exclude: Optional[list] = None,
+        exclude_docs: Optional[pathspec.PathSpec] = None,
+    ) -> list[tuple[str, str]]:
+        """
+        Return ``(project_name, project_dir)`` pairs in a stable order.
+
+        ``include`` and ``exclude`` are gitignore-style patterns relative to
+        ``docs_dir``. When ``include`` is given, only config files matching it
+        are used. Directories matching ``exclude`` or MkDocs' ``exclude_docs``
+        are skipped entirely.
+        """
+        self._load(str(docs_dir.resolve()))
+        include_spec = pathspec.GitIgnoreSpec.from_lines(include) if include else None
+        exclude_spec = pathspec.GitIgnoreSpec.from_lines(exclude or [])
+        if exclude_docs is not None:
+            exclude_spec = exclude_spec + exclude_docs
+
+        dirs, configs = {}, {}
+        projects = []
+        seen = set()
+        stack = ["."]
+        while stack:
+            rel = stack.pop()
+            path = docs_dir if rel == "." else docs_dir / rel
+            listing = self._list(path, rel, seen)
+            if listing is None:
+                continue
+            dirs[rel] = listing
+            _, subdirs, has_config = listing
+            prefix = "" if rel == "." else f"{rel}/"
+            if has_config:
+                config_path = f"{prefix}{CONFIG_FILE}"
+                if (
+                    include_spec is None or include_spec.match_file(config_path)
+                ) and not exclude_spec.match_file(config_path):
+                    entry = self._project_name(path / CONFIG_FILE, config_path)
+                    if entry is not None:
+                        configs[config_path] = entry
+                        if name := entry[2]:
+                            projects.append((name, rel))
+            # Reversed, so that directories are visited in sorted order
+            for name in reversed(subdirs):
+                if not exclude_spec.match_file(f"{prefix}{name}/"):
+                    stack.append(f"{prefix}{name}")
+
+        # Forget directories that were removed or are excluded now
+        if dirs.keys() != self._dirs.keys() or configs.keys() != self._configs.keys():
+            self._changed = True
+        self._dirs, self._configs = dirs, configs
+        return projects
+
+    def _list(self, path: Path, rel: str, seen: set) -> Optional[list]:
+        """List a directory as ``[mtime, subdirs, has_config]``, reusing the index."""
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        # Symlinked directories may form loops
+        if (st.st_dev, st.st_ino) in seen:
+            return None
+        seen.add((st.st_dev, st.st_ino))
+
+        cached = self._dirs.get(rel)
+        if cached is not None and cached[0] == st.st_mtime_ns:
+            return cached
+        subdirs, has_config = [], False
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.name == CONFIG_FILE:
+                        has_config = has_config or entry.is_file()
+                    elif entry.is_dir():
+                        subdirs.append(entry.name)
+        except OSError as e:
+            log.warning("mkdocs-likec4: Failed to list %s: %s", path, e)
+            return None
+        self._changed = True
+        return [st.st_mtime_ns, sorted(subdirs), has_config]
+
+    def _project_name(self, path: Path, config_path: str) -> Optional[list]:
+        """Read a config file as ``[mtime, size, name]``, reusing the index."""
+        try:
+            st = path.stat()
+        except OSError as e:
+            log.warning("mkdocs-likec4: Failed to read %s: %s", path, e)
+            return None
+        cached = self._configs.get(config_path)
+        if cached is not None and cached[:2] == [st.st_mtime_ns, st.st_size]:
+            return cached
+        try:
+            with path.open("r") as f:
+                config_data = pyjson5.load(f)
+        except (pyjson5.Json5Exception, OSError) as e:
+            log.warning("mkdocs-likec4: Failed to read %s: %s", path, e)
+            return None
+        name = config_data.get("name") if isinstance(config_data, dict) else None
+        self._changed = True
+        return [st.st_mtime_ns, st.st_size, name or None]
+
+    def _load(self, root: str) -> None:
+        if self._root == root:
+            return
+        # The index is only valid for the docs directory it was built from
+        self._root, self._dirs, self._configs = root, {}, {}
+        self._changed = True
+        if self.index_file is None:
+            return
+        try:
+            with self.index_file.open("r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if (
+            isinstance(data, dict)
+            and data.get("version") == INDEX_VERSION
+            and data.get("root") == root
+        ):
+            self._changed = False
+            self._dirs = data.get("dirs", {})
+            self._configs = data.get("configs", {})
+
+    def save(self) -> None:
+        """Persist the index, if it changed since it was loaded."""
+        if self.index_file is None or not self._changed:
+            return
+        try:
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            with self.index_file.open("w") as f:
+                json.dump(
+                    {
+                        "version": INDEX_VERSION,
+                        "root": self._root,
+                        "dirs": self._dirs,
+                        "configs": self._configs,
+                    },
+                    f,
+                )
+        except OSError as e:
+            log.warning("mkdocs-likec4: Failed to write discovery index: %s", e)
+            return
+        self._changed = False
@@ -0,0 +1,138 @@
+import logging
+import shutil
+import struct
+import subprocess
+import tempfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from .cache import BundleCache
+from .cli import Likec4Cli
+from .generator import NOT_FOUND_MESSAGE, WebComponentGenerator
+
+log = logging.getLogger(f"mkdocs.plugins.{__name__}")
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def png_size(path: Path) -> Optional[tuple[int, int]]:
+    """Read the pixel dimensions from a PNG file's header."""
+    with path.open("rb") as f:
+        header = f.read(24)
+    if len(header) < 24 or header[:8] != PNG_SIGNATURE or header[12:16] != b"IHDR":
+        return None
+    return struct.unpack(">II", header[16:24])
+
+
+class ViewExporter:
+    """
+    Exports static PNG images of views with ``likec4 export png``.
+
+    Each project is exported at most once per build into a private directory,
+    in the background once :meth:`start` is called, or on first use. With a
+    ``cache`` the exported images are stored as one archive per project and
+    source fingerprint.
+    """
+
+    VIEWS_DIR = f"{WebComponentGenerator.ASSETS_DIR}/views"
+
+    def __init__(
+        self,
+        build_dir: str,
+        cli: Optional[Likec4Cli],
+        cache: Optional[BundleCache] = None,
+        max_workers: int = 1,
+    ):
+        self.build_dir = build_dir
+        self.cli = cli
+        self.cache = cache
+        self._store = Path(tempfile.mkdtemp(prefix="mkdocs_likec4_export_"))
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="mkdocs-likec4-export"
+        )
+        self._images: dict[Optional[str], Future] = {}
+
+    @classmethod
+    def get_image_path(cls, project: Optional[str], view_id: str) -> str:
+        """Get the site-relative path for the image of a view."""
+        folder = project.lower() if project else "_default"
+        return f"{cls.VIEWS_DIR}/{folder}/{view_id}.png"
+
+    def start(self, project: Optional[str], project_dir: Optional[str]) -> None:
+        """Start exporting a project's images unless it is already underway."""
+        if project not in self._images:
+            self._images[project] = self._executor.submit(
+                self._export, project, project_dir
+            )
+
+    def image(
+        self, project: Optional[str], project_dir: Optional[str], view_id: str
+    ) -> Optional[tuple[Path, int, int]]:
+        """Return the exported image of a view and its width and height."""
+        self.start(project, project_dir)
+        path = self._images[project].result().get(view_id)
+        if path is None:
+            return None
+        size = png_size(path)
+        return (path, *size) if size else None
+
+    def copy(self, project: Optional[str], view_id: str, site_dir: Path) -> None:
+        """Copy the image of a view, as returned by :meth:`image`, into the site."""
+        dest = site_dir / self.get_image_path(project, view_id)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(self._images[project].result()[view_id], dest)
+
+    def _export(
+        self, project: Optional[str], project_dir: Optional[str]
+    ) -> dict[str, Path]:
+        project_path = WebComponentGenerator.get_project_path(
+            project, project_dir, self.build_dir
+        )
+        out_dir = self._store / (project or "_default")
+        label = f"project '{project}'" if project else "default project"
+
+        cache_key = None
+        archive = self._store / f"{project or '_default'}.zip"
+        if self.cache is not None and self.cli is not None and self.cli.version:
+            cache_key = self.cache.fingerprint(
+                Path(project_path), {"likec4": self.cli.version, "export": "png"}
+            )
+            if self.cache.get(cache_key, archive):
+                shutil.unpack_archive(archive, out_dir)
+                return self._collect(out_dir)
+
+        error = self._run_cli(project_path, out_dir)
+        if error:
+            log.warning(
+                "mkdocs-likec4: Failed to export images of %s: %s", label, error
+            )
+            return {}
+        images = self._collect(out_dir)
+        if cache_key is not None and images:
+            shutil.make_archive(str(archive.with_suffix("")), "zip", out_dir)
+            self.cache.put(cache_key, archive)
+        log.debug("mkdocs-likec4: Exported %d images of %s", len(images), label)
+        return images
+
+    def _run_cli(self, project_path: str, out_dir: Path) -> Optional[str]:
+        if self.cli is None:
+            return NOT_FOUND_MESSAGE
+        cmd = [*self.cli.command, "export", "png", project_path, "-o", str(out_dir)]
+        try:
+            subprocess.run(cmd, check=True, capture_output=True, text=True)
+        except subprocess.CalledProcessError as e:
+            return f"{e}\n{e.stderr.strip()}" if e.stderr else str(e)
+        except FileNotFoundError:
+            return NOT_FOUND_MESSAGE
+        return None
+
+    @staticmethod
+    def _collect(out_dir: Path) -> dict[str, Path]:
+        # Depending on the likec4 version, images are grouped by source folder
+        return {p.stem: p for p in sorted(out_dir.rglob("*.png"))}
+
+    def close(self) -> None:
+        # Exports already running are waited for, they write into the store
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        shutil.rmtree(self._store, ignore_errors=True)
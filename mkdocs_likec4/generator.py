@@ -1,13 +1,44 @@
 import logging
-import shutil
+import os
 import subprocess
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional, Union
 
+from .cache import DEFAULT_EXCLUDE, BundleCache
+from .cli import Likec4Cli
 from .parser import LikeC4Parser
+from .profiling import ProcessUsage, run_measured
+from .tracing import NULL_TRACER, NullTracer, Tracer
+from .treeshake import shaken_workspace
 
 log = logging.getLogger(f"mkdocs.plugins.{__name__}")
 
+NOT_FOUND_MESSAGE = (
+    "'likec4' command not found. Install likec4 locally or globally, "
+    "or set likec4_path."
+)
+
+
+@dataclass
+class GenerationResult:
+    """Outcome of generating the web component for a single project."""
+
+    project: Optional[str]
+    ok: bool = False
+    cached: bool = False
+    error: Optional[str] = None
+    duration: float = 0.0
+    # Resource usage of the likec4 process, unknown if it could not be measured
+    cpu_time: Optional[float] = None
+    max_rss: Optional[int] = None
+
+    @property
+    def label(self) -> str:
+        return f"project '{self.project}'" if self.project else "default project"
+
 
 class WebComponentGenerator:
     """Generates LikeC4 web component JavaScript files."""
@@ -21,6 +52,15 @@ class WebComponentGenerator:
             return f"{cls.ASSETS_DIR}/likec4_views.js"
         return f"{cls.ASSETS_DIR}/likec4_views_{project}.js".lower()
 
+    @staticmethod
+    def get_project_path(
+        project_name: Optional[str], project_dir: Optional[str], build_dir: str
+    ) -> str:
+        """Get the workspace path that likec4 is run on for a project."""
+        if project_name is None:
+            return build_dir
+        return str(Path(build_dir) / (project_dir or project_name))
+
     @classmethod
     def generate(
         cls,
@@ -30,55 +70,153 @@ class WebComponentGenerator:
         site_dir: Path,
         *,
         use_dot: bool = False,
-    ) -> None:
-        """Generate web component JS file for a LikeC4 project."""
+        cache: Optional[BundleCache] = None,
+        node_memory: Optional[int] = None,
+        cli: Optional[Likec4Cli] = None,
+        views: Optional[frozenset] = None,
+        tracer: Union[Tracer, NullTracer] = NULL_TRACER,
+        exclude: Iterable[str] = DEFAULT_EXCLUDE,
+    ) -> GenerationResult:
+        """
+        Generate web component JS file for a LikeC4 project.
+
+        When a ``cache`` is given, a bundle generated earlier from identical
+        sources and flags is copied into place instead of running the CLI.
+        ``node_memory`` caps the Node.js heap of the codegen process (in MB).
+        ``cli`` is the likec4 executable to run; it is looked up if omitted.
+        With ``views`` the bundle only contains those views, plus the views
+        they navigate to or extend (see
+        :func:`~mkdocs_likec4.treeshake.shaken_workspace`), and ``exclude`` lists
+        the gitignore-style patterns of directories not to copy from the project.
+        Code generation is recorded as a span of ``tracer``.
+
+        Nothing is logged above debug level, so that callers running several
+        generations concurrently can report the results in a stable order.
+        """
+        result = GenerationResult(project_name)
         if project_name is not None and not LikeC4Parser.is_valid_identifier(
             project_name
         ):
-            log.error(
-                "mkdocs-likec4: Invalid project name '%s': must start with a letter "
-                "and contain only letters, numbers, hyphens, and underscores",
-                project_name,
+            result.error = (
+                f"Invalid project name '{project_name}': must start with a letter "
+                "and contain only letters, numbers, hyphens, and underscores"
             )
-            return
+            return result
 
         site_dir.joinpath(cls.ASSETS_DIR).mkdir(parents=True, exist_ok=True)
         dest_file = site_dir.joinpath(cls.get_script_path(project_name))
 
-        project_path = (
-            build_dir
-            if project_name is None
-            else str(Path(build_dir) / (project_dir or project_name))
-        )
-        log.info(
+        project_path = cls.get_project_path(project_name, project_dir, build_dir)
+
+        prefix = project_name.lower() if project_name else None
+        if cli is None:
+            cli = Likec4Cli.resolve()
+        cache_key = None
+        if cache is not None and cli is not None and (version := cli.version):
+            params = {"likec4": version, "use_dot": use_dot, "prefix": prefix}
+            if views is not None:
+                params["views"] = sorted(views)
+            cache_key = cache.fingerprint(Path(project_path), params)
+            if cache.get(cache_key, dest_file):
+                result.ok = result.cached = True
+                return result
+
+        log.debug(
             "mkdocs-likec4: Generating web component for %s from %s",
-            f"project '{project_name}'" if project_name else "default project",
+            result.label,
             project_path,
         )
 
-        npx = shutil.which("npx")
-        if not npx:
-            log.error(
-                "mkdocs-likec4: 'npx' or 'likec4' command not found. "
-                "Ensure Node.js and likec4 are installed."
+        start = time.monotonic()
+        workspace = (
+            nullcontext(project_path)
+            if views is None
+            else shaken_workspace(Path(project_path), views, exclude)
+        )
+        with (
+            tracer.span("codegen", "codegen", project=result.label),
+            workspace as source,
+        ):
+            result.error, usage = cls._codegen(
+                str(source),
+                dest_file,
+                use_dot=use_dot,
+                prefix=prefix,
+                node_memory=node_memory,
+                cli=cli,
             )
-        cmd = [npx, "likec4", "codegen", "webcomponent"]
+        result.ok = result.error is None
+        result.duration = time.monotonic() - start
+        if usage is not None:
+            result.cpu_time, result.max_rss = usage.cpu_time, usage.max_rss
+
+        if result.ok and cache_key is not None:
+            cache.put(cache_key, dest_file)
+        return result
+
+    @classmethod
+    def _codegen(
+        cls,
+        project_path: str,
+        dest_file: Path,
+        *,
+        use_dot: bool,
+        prefix: Optional[str],
+        node_memory: Optional[int],
+        cli: Optional[Likec4Cli],
+    ) -> tuple[Optional[str], Optional[ProcessUsage]]:
+        """
+        Generate a bundle with the likec4 CLI.
+
+        Returns an error message on failure, and the resource usage of the CLI
+        process if one was run.
+        """
+        if cli is None:
+            return NOT_FOUND_MESSAGE, None
+        return cls._run_cli(
+            cli,
+            project_path,
+            dest_file,
+            use_dot=use_dot,
+            prefix=prefix,
+            node_memory=node_memory,
+        )
+
+    @staticmethod
+    def _run_cli(
+        cli: Likec4Cli,
+        project_path: str,
+        dest_file: Path,
+        *,
+        use_dot: bool,
+        prefix: Optional[str],
+        node_memory: Optional[int],
+    ) -> tuple[Optional[str], Optional[ProcessUsage]]:
+        """Run ``likec4 codegen webcomponent``, see :meth:`_codegen`."""
+        cmd = [*cli.command, "codegen", "webcomponent"]
         if not use_dot:
             cmd.append("--no-use-dot")
-        if project_name is not None:
-            cmd.extend(["--webcomponent-prefix", project_name.lower()])
+        if prefix is not None:
+            cmd.extend(["--webcomponent-prefix", prefix])
         cmd.extend([project_path, "-o", str(dest_file)])
 
+        env = None
+        if node_memory is not None:
+            env = dict(os.environ)
+            env["NODE_OPTIONS"] = (
+                f"{env.get('NODE_OPTIONS', '')} --max-old-space-size={node_memory}"
+            ).strip()
+
         try:
-            subprocess.run(cmd, check=True)
-        except subprocess.CalledProcessError as e:
-            log.error(
-                "mkdocs-likec4: Failed to generate web component for project '%s': %s",
-                project_name or "default",
-                e,
+            proc = run_measured(
+                cmd, check=True, capture_output=True, text=True, env=env
             )
+        except subprocess.CalledProcessError as e:
+            error = f"Failed to generate web component: {e}"
+            if e.stderr:
+                error += f"\n{e.stderr.strip()}"
+            return error, None
         except FileNotFoundError:
-            log.error(
-                "mkdocs-likec4: 'npx' or 'likec4' command not found. "
-                "Ensure Node.js and likec4 are installed."
-            )
+            return NOT_FOUND_MESSAGE, None
+        log.debug("mkdocs-likec4: likec4 output for %s:\n%s", project_path, proc.stdout)
+        return None, getattr(proc, "usage", None)
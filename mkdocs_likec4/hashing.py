@@ -0,0 +1,85 @@
+import hashlib
+import json
+import logging
+import posixpath
+import re
+from pathlib import Path
+
+from .generator import WebComponentGenerator
+
+log = logging.getLogger(f"mkdocs.plugins.{__name__}")
+
+MANIFEST_FILE = f"{WebComponentGenerator.ASSETS_DIR}/manifest.json"
+HASH_LENGTH = 12
+# The attributes that the plugin writes bundle URLs and names into
+URL_ATTRIBUTE = re.compile(
+    r'(\s(?:src|href|data-likec4-bundles?|data-likec4-lazy)=")([^"]*)(")'
+)
+
+
+class AssetManifest:
+    """
+    Content-hashed file names for generated bundles.
+
+    Bundles are generated under their fixed names, see
+    :meth:`WebComponentGenerator.get_script_path`, and renamed once they are
+    complete. The manifest maps each fixed site path to the hashed one, and is
+    used to rewrite the references in pages that were rendered before the
+    bundles existed.
+    """
+
+    def __init__(self):
+        self.paths: dict[str, str] = {}
+
+    def add(self, site_dir: Path, script_path: str) -> None:
+        """Rename a file in ``site_dir`` to a name containing its content hash."""
+        src = site_dir / script_path
+        try:
+            digest = hashlib.sha256(src.read_bytes()).hexdigest()[:HASH_LENGTH]
+        except OSError as e:
+            log.warning("mkdocs-likec4: Failed to hash %s: %s", script_path, e)
+            return
+        stem, suffix = posixpath.splitext(script_path)
+        hashed = f"{stem}.{digest}{suffix}"
+        src.replace(site_dir / hashed)
+        self.paths[script_path] = hashed
+
+    def resolve(self, script_path: str) -> str:
+        return self.paths.get(script_path, script_path)
+
+    def rewrite(self, text: str) -> str:
+        """
+        Replace references to the fixed file names with the hashed ones.
+
+        Only the attribute values the plugin emits are rewritten, so that the
+        names in the text of a page are left alone.
+        """
+        if not self.paths:
+            return text
+        names = {
+            posixpath.basename(path): posixpath.basename(hashed)
+            for path, hashed in self.paths.items()
+        }
+        pattern = re.compile(
+            r"(?<![\w.-])(" + "|".join(map(re.escape, names)) + r")(?![\w.-])"
+        )
+        return URL_ATTRIBUTE.sub(
+            lambda attr: (
+                attr.group(1)
+                + pattern.sub(lambda m: names[m.group(1)], attr.group(2))
+                + attr.group(3)
+            ),
+            text,
+        )
+
+    def rewrite_file(self, path: Path) -> None:
+        try:
+            text = path.read_text(encoding="utf-8")
+            path.write_text(self.rewrite(text), encoding="utf-8")
+        except OSError as e:
+            log.warning("mkdocs-likec4: Failed to update asset URLs in %s: %s", path, e)
+
+    def write(self, site_dir: Path) -> None:
+        dest = site_dir / MANIFEST_FILE
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        dest.write_text(json.dumps(self.paths, indent=2, sort_keys=True))
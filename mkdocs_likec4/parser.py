@@ -2,12 +2,24 @@ import logging
 import re
 from dataclasses import dataclass
 from html import escape
-from typing import Optional
+from typing import Callable, Iterator, Optional
 
 log = logging.getLogger(f"mkdocs.plugins.{__name__}")
 
 IDENTIFIER_PATTERN = re.compile(r"^[a-zA-Z][a-zA-Z0-9_-]*$")
 
+FENCE_INFO = "likec4-view"
+FENCES = ("```", "~~~")
+
+# Attribute and allowed values of each fence option, except project
+OPTION_VALUES = {
+    "browser": ("browser", ("true", "false")),
+    "dynamic-variant": ("dynamic_variant", ("diagram", "sequence")),
+    "color-scheme": ("color_scheme", ("auto", "light", "dark")),
+    "loading": ("loading", ("eager", "lazy")),
+    "static": ("static", ("true", "false")),
+}
+
 
 @dataclass
 class ViewOptions:
@@ -18,18 +30,45 @@ class ViewOptions:
     dynamic_variant: str = "diagram"
     project: Optional[str] = None
     color_scheme: str = "auto"
+    loading: str = "eager"
+    static: bool = False
+
+
+@dataclass
+class Placeholder:
+    """A pre-rendered image of a view, shown until the web component renders."""
+
+    url: str
+    width: int
+    height: int
+
+    def to_html(self, view_id: str, css_class: str = "likec4-placeholder") -> str:
+        return (
+            f'<img class="{css_class}" src="{escape(self.url, quote=True)}" '
+            f'alt="{escape(view_id, quote=True)}" width="{self.width}" '
+            f'height="{self.height}" style="max-width: 100%; height: auto" '
+            'loading="lazy">'
+        )
+
+
+@dataclass
+class ViewFence:
+    """A likec4-view code block found by :meth:`LikeC4Parser.scan`."""
+
+    start: int
+    end: int
+    indent: str
+    options: str
+    view_id: str
 
 
 class LikeC4Parser:
     """Parser for likec4-view markdown code blocks."""
 
+    # The backtick blocks found by scan, as a regex
     PATTERN = re.compile(
         r"([ \t]*)```likec4-view([^\r\n]*)\r?\n([^\r\n]+)\r?\n\1```",
     )
-    OPT_BROWSER = re.compile(r"\bbrowser=(true|false)\b")
-    OPT_VARIANT = re.compile(r"\bdynamic-variant=(diagram|sequence)\b")
-    OPT_PROJECT = re.compile(r"\bproject=([^\s]+)\b")
-    OPT_COLOR_SCHEME = re.compile(r"\bcolor-scheme=(auto|light|dark)\b")
 
     @classmethod
     def is_valid_identifier(cls, value: str) -> bool:
@@ -42,32 +81,115 @@ class LikeC4Parser:
         options_text: str,
         view_id: str,
         default_color_scheme: str = "auto",
+        default_loading: str = "eager",
     ) -> ViewOptions:
         """
         Parse options from the opening fence line of a likec4-view block.
 
         Options can appear in any order and are all optional with sensible defaults.
         The color-scheme value defaults to ``default_color_scheme`` (typically the
-        plugin-wide setting) unless overridden in the fence line.
+        plugin-wide setting) unless overridden in the fence line, and the same
+        applies to loading and ``default_loading``.
         """
-        opts = ViewOptions(view_id=view_id, color_scheme=default_color_scheme)
+        opts = ViewOptions(
+            view_id=view_id,
+            color_scheme=default_color_scheme,
+            loading=default_loading,
+        )
+
+        seen = set()
+        for token in options_text.split():
+            key, _, value = token.partition("=")
+            if not value or key in seen:
+                continue
+            if key == "project":
+                opts.project = value
+            elif key in OPTION_VALUES:
+                attr, allowed = OPTION_VALUES[key]
+                if value not in allowed:
+                    continue
+                setattr(opts, attr, value == "true" if attr == "static" else value)
+            else:
+                continue
+            # Like other options, the first valid occurrence wins
+            seen.add(key)
+        return opts
 
-        if m := cls.OPT_BROWSER.search(options_text):
-            opts.browser = m.group(1)
+    @staticmethod
+    def scan(markdown: str) -> Iterator[ViewFence]:
+        """
+        Find the likec4-view blocks in ``markdown`` in a single pass.
 
-        if m := cls.OPT_VARIANT.search(options_text):
-            opts.dynamic_variant = m.group(1)
+        A block is fenced with three backticks or tildes at the start of a
+        line, optionally indented (as inside lists, admonitions and tabs), has
+        the view ID on its only line, and is closed by the same fence with the
+        same indentation. Pages without ``likec4-view`` are skipped after a
+        single substring search.
+        """
+        pos = 0
+        while (info := markdown.find(FENCE_INFO, pos)) != -1:
+            pos = info + len(FENCE_INFO)
+            fence_start = info - 3
+            fence = markdown[fence_start:info]
+            if fence not in FENCES:
+                continue
+            line_start = markdown.rfind("\n", 0, fence_start) + 1
+            indent = markdown[line_start:fence_start]
+            if indent.strip(" \t"):
+                continue
+            options_end = markdown.find("\n", pos)
+            if options_end == -1:
+                return
+            options = markdown[pos:options_end].rstrip("\r")
+            if options[:1] not in ("", " ", "\t"):
+                # Another info string starting with likec4-view
+                continue
+            view_end = markdown.find("\n", options_end + 1)
+            if view_end == -1:
+                return
+            view_id = markdown[options_end + 1 : view_end].rstrip("\r")
+            closing = indent + fence
+            if not view_id or not markdown.startswith(closing, view_end + 1):
+                continue
+            pos = view_end + 1 + len(closing)
+            yield ViewFence(line_start, pos, indent, options, view_id)
 
-        if m := cls.OPT_PROJECT.search(options_text):
-            opts.project = m.group(1)
+    @classmethod
+    def sub(cls, replacer: Callable[[ViewFence], str], markdown: str) -> str:
+        """Replace every likec4-view block with ``replacer(block)``."""
+        parts = []
+        last = 0
+        for block in cls.scan(markdown):
+            parts.append(markdown[last : block.start])
+            parts.append(replacer(block))
+            last = block.end
+        if not parts:
+            return markdown
+        parts.append(markdown[last:])
+        return "".join(parts)
 
-        if m := cls.OPT_COLOR_SCHEME.search(options_text):
-            opts.color_scheme = m.group(1)
+    @classmethod
+    def to_html(
+        cls,
+        opts: ViewOptions,
+        bundle_url: Optional[str] = None,
+        placeholder: Optional[Placeholder] = None,
+    ) -> str:
+        """
+        Render the web component element for a view.
 
-        return opts
+        With ``bundle_url`` the element names the script that defines it, for
+        the on-demand loader to fetch when the element is added to the page.
+        Lazy views are wrapped in a ``<template>`` that the loader mounts once
+        the view scrolls into sight; they always need a ``bundle_url``.
+
+        A ``placeholder`` image is rendered inside the element and hidden by
+        the web component's shadow root once it renders. Static views are
+        rendered as the image only.
+        """
+        if opts.static and placeholder is not None:
+            return placeholder.to_html(opts.view_id, "likec4-static")
 
-    @classmethod
-    def to_html(cls, opts: ViewOptions) -> str:
         if not cls.is_valid_identifier(opts.view_id):
             log.warning(
                 "mkdocs-likec4: Invalid view ID '%s': contains unsafe characters",
@@ -91,4 +213,15 @@ class LikeC4Parser:
             attrs += f' color-scheme="{opts.color_scheme}"'
         elif opts.color_scheme == "auto":
             attrs += " data-likec4-auto-scheme"
-        return f"<{tag} {attrs}></{tag}>"
+        image = placeholder.to_html(opts.view_id) if placeholder else ""
+        if bundle_url is None:
+            return f"<{tag} {attrs}>{image}</{tag}>"
+        url = escape(bundle_url, quote=True)
+        if opts.loading != "lazy":
+            return f'<{tag} {attrs} data-likec4-bundle="{url}">{image}</{tag}>'
+        # The loader moves the placeholder into the view when mounting it
+        style = "" if placeholder else ' style="min-height: 300px"'
+        return (
+            f'<div class="likec4-lazy" data-likec4-lazy="{url}"{style}>'
+            f"{image}<template><{tag} {attrs}></{tag}></template></div>"
+        )
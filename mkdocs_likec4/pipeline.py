@@ -0,0 +1,103 @@
+import logging
+import shutil
+import tempfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional
+
+from .generator import GenerationResult, WebComponentGenerator
+
+log = logging.getLogger(f"mkdocs.plugins.{__name__}")
+
+Job = Callable[[Optional[str], Path], GenerationResult]
+
+
+class CodegenPipeline:
+    """
+    Runs web component generation in the background while pages are rendered.
+
+    MkDocs cleans ``site_dir`` after ``on_config``, so speculative jobs write
+    into a private staging directory. Their bundles are copied into the site
+    when :meth:`join` is called from ``on_post_build``.
+    """
+
+    def __init__(self, job: Job, max_workers: int):
+        self._job = job
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="mkdocs-likec4"
+        )
+        self._staging = Path(tempfile.mkdtemp(prefix="mkdocs_likec4_"))
+        self._pending: dict[Optional[str], tuple[Future, Path]] = {}
+
+    def start(self, project: Optional[str]) -> None:
+        """Start generating a project's bundle unless it is already underway."""
+        if project in self._pending:
+            return
+        stage = self._staging / (project or "_default")
+        log.debug("mkdocs-likec4: Starting early codegen for %s", project or "default")
+        self._pending[project] = (
+            self._executor.submit(self._job, project, stage),
+            stage,
+        )
+
+    def join(self, projects: list, site_dir: Path) -> list[GenerationResult]:
+        """
+        Wait for the bundles of ``projects`` and place them in ``site_dir``.
+
+        Projects that were never started are generated now. Speculative jobs for
+        projects not in ``projects`` are cancelled, or discarded once finished.
+        """
+        jobs = [
+            self._pending.pop(project, None)
+            or (self._executor.submit(self._job, project, site_dir), None)
+            for project in projects
+        ]
+        self._discard_pending()
+
+        results = []
+        for project, (future, stage) in zip(projects, jobs):
+            result = future.result()
+            if stage is not None:
+                if result.ok:
+                    try:
+                        self._copy_bundle(project, stage, site_dir)
+                    except OSError as e:
+                        result.ok = False
+                        result.error = f"Failed to copy generated bundle: {e}"
+                self._remove_stage(stage)
+            results.append(result)
+
+        self.close()
+        return results
+
+    def close(self) -> None:
+        """Discard all outstanding jobs and release the worker threads."""
+        self._discard_pending()
+        self._executor.shutdown(wait=False)
+        self._remove_stage(None)
+
+    def _discard_pending(self) -> None:
+        for project, (future, stage) in self._pending.items():
+            log.debug(
+                "mkdocs-likec4: Discarding early codegen for unreferenced %s",
+                project or "default",
+            )
+            if not future.cancel():
+                future.add_done_callback(lambda _f, s=stage: self._remove_stage(s))
+        self._pending.clear()
+
+    @staticmethod
+    def _copy_bundle(project: Optional[str], stage: Path, site_dir: Path) -> None:
+        script_path = WebComponentGenerator.get_script_path(project)
+        dest = site_dir / script_path
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(stage / script_path, dest)
+
+    def _remove_stage(self, stage: Optional[Path]) -> None:
+        if stage is not None:
+            shutil.rmtree(stage, ignore_errors=True)
+        try:
+            self._staging.rmdir()
+        except OSError:
+            # Other jobs are still writing into the staging directory
+            pass
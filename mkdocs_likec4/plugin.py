@@ -1,20 +1,40 @@
+import json
 import logging
+import os
+import posixpath
 import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
 from importlib import resources
 from pathlib import Path
 from typing import Optional
 
-import pyjson5
 from mkdocs.config import config_options
+from mkdocs.exceptions import PluginError
 from mkdocs.plugins import BasePlugin
 from mkdocs.utils import get_relative_url
 
-from .generator import WebComponentGenerator
-from .parser import LikeC4Parser
+from .budget import SizeBudget, check, measure, write_report
+from .cache import DEFAULT_EXCLUDE, BundleCache
+from .cli import Likec4Cli
+from .compress import available_encodings, compress_assets, format_size
+from .discovery import ProjectDiscovery
+from .export import ViewExporter
+from .generator import GenerationResult, WebComponentGenerator
+from .hashing import AssetManifest
+from .parser import LikeC4Parser, Placeholder, ViewOptions
+from .pipeline import CodegenPipeline
+from .profiling import BuildProfile
+from .serve import ServeTracker
+from .tracing import NULL_TRACER, TRACE_ENV, Tracer, traced
 
 log = logging.getLogger(f"mkdocs.plugins.{__name__}")
 
 THEME_SYNC_SCRIPT = f"{WebComponentGenerator.ASSETS_DIR}/theme_sync.js"
+LOADER_SCRIPT = f"{WebComponentGenerator.ASSETS_DIR}/loader.js"
+PREFETCH_SCRIPT = f"{WebComponentGenerator.ASSETS_DIR}/prefetch.js"
+PREFETCH_MANIFEST = f"{WebComponentGenerator.ASSETS_DIR}/prefetch.json"
+MEMINFO = Path("/proc/meminfo")
 
 
 class LikeC4Plugin(BasePlugin):
@@ -26,13 +46,86 @@ class LikeC4Plugin(BasePlugin):
             "color_scheme",
             config_options.Choice(["auto", "light", "dark"], default="auto"),
         ),
+        ("cache", config_options.Type(bool, default=True)),
+        ("cache_dir", config_options.Type(str, default=".cache/plugin/likec4")),
+        ("cache_max_size", config_options.Type(int, default=256)),
+        ("max_workers", config_options.Optional(config_options.Type(int))),
+        ("worker_memory", config_options.Optional(config_options.Type(int))),
+        (
+            "pipeline",
+            config_options.Choice(["off", "eager", "on_demand"], default="off"),
+        ),
+        ("serve_debounce", config_options.Type(int, default=300)),
+        ("likec4_path", config_options.Optional(config_options.Type(str))),
+        ("tree_shake", config_options.Type(bool, default=False)),
+        (
+            "loading",
+            config_options.Choice(["eager", "combined", "on_demand"], default="eager"),
+        ),
+        ("lazy", config_options.Type(bool, default=False)),
+        ("placeholders", config_options.Type(bool, default=False)),
+        (
+            "script_type",
+            config_options.Choice(["defer", "module", "blocking"], default="defer"),
+        ),
+        (
+            "script_placement",
+            config_options.Choice(["content", "head", "body"], default="content"),
+        ),
+        ("preload", config_options.Type(bool, default=True)),
+        ("prefetch", config_options.Type(bool, default=False)),
+        ("hash_filenames", config_options.Type(bool, default=False)),
+        (
+            "compress",
+            config_options.ListOfItems(
+                config_options.Choice(["gzip", "brotli"]), default=[]
+            ),
+        ),
+        ("budget_project", config_options.Optional(config_options.Type(int))),
+        ("budget_project_gzip", config_options.Optional(config_options.Type(int))),
+        ("budget_total", config_options.Optional(config_options.Type(int))),
+        ("budget_total_gzip", config_options.Optional(config_options.Type(int))),
+        ("budget_strict", config_options.Type(bool, default=False)),
+        ("size_report", config_options.Optional(config_options.Type(str))),
+        ("profile_report", config_options.Optional(config_options.Type(str))),
+        ("trace", config_options.Optional(config_options.Type(str))),
+        (
+            "projects_include",
+            config_options.ListOfItems(config_options.Type(str), default=[]),
+        ),
+        (
+            "projects_exclude",
+            config_options.ListOfItems(
+                config_options.Type(str), default=list(DEFAULT_EXCLUDE)
+            ),
+        ),
     )
 
     def __init__(self):
         self.docs_dir = None
         self.page_projects = {}
+        self.project_views = {}
+        self.page_lazy_projects = {}
+        self.placeholder_images = set()
+        self.page_urls = {}
+        self.page_dest = {}
         self.project_map = {}
+        self.file_projects = {}
         self.pages_with_auto_views = set()
+        self.rendered_views = {}
+        self.cache = None
+        self.exporter = None
+        self.pipeline = None
+        self.tracker = None
+        self.cli = None
+        self.instant_navigation = False
+        self.size_report = None
+        self.profile_report = None
+        self.profile = BuildProfile()
+        self.tracer = NULL_TRACER
+        self.trace_file = None
+        self.discovery = ProjectDiscovery()
+        self.exclude_docs = None
 
     def _discover_projects(self, docs_dir: Path):
         """Discover LikeC4 projects by scanning for likec4.config.json files."""
@@ -40,20 +133,19 @@ class LikeC4Plugin(BasePlugin):
             log.warning("mkdocs-likec4: docs_dir does not exist: %s", docs_dir)
             return
 
-        for config_file in docs_dir.rglob("likec4.config.json"):
-            try:
-                with config_file.open("r") as f:
-                    config_data = pyjson5.load(f)
-                if project_name := config_data.get("name"):
-                    project_dir = str(config_file.parent.relative_to(docs_dir))
-                    self.project_map[project_name] = project_dir
-                    log.info(
-                        "mkdocs-likec4: Discovered project '%s' at %s",
-                        project_name,
-                        project_dir,
-                    )
-            except (pyjson5.Json5Exception, OSError) as e:
-                log.warning("mkdocs-likec4: Failed to read %s: %s", config_file, e)
+        for project_name, project_dir in self.discovery.discover(
+            docs_dir,
+            self.config["projects_include"],
+            self.config["projects_exclude"],
+            self.exclude_docs,
+        ):
+            project_dir = str(Path(project_dir))
+            self.project_map[project_name] = project_dir
+            log.info(
+                "mkdocs-likec4: Discovered project '%s' at %s",
+                project_name,
+                project_dir,
+            )
 
         if not self.project_map:
             self.project_map[None] = "."
@@ -61,103 +153,675 @@ class LikeC4Plugin(BasePlugin):
                 "mkdocs-likec4: No projects discovered, using default root project"
             )
 
+    @property
+    def project_map(self) -> dict:
+        """Project names mapped to their directories, relative to docs_dir."""
+        return self._project_map
+
+    @project_map.setter
+    def project_map(self, value: dict) -> None:
+        self._project_map = value
+        # Rebuilt from the new projects on first use
+        self._project_dirs_index = None
+        self._nearest_projects = {}
+
     def _find_nearest_project(self, page_path: Path, docs_dir: Path) -> Optional[str]:
         """Find the nearest LikeC4 project by traversing upward from the page."""
-        current = page_path.parent
-        while current >= docs_dir:
-            relative_str = str(current.relative_to(docs_dir))
-            for project_name, project_dir in self.project_map.items():
-                if project_dir == relative_str:
-                    return project_name
-            if current == docs_dir:
+        try:
+            page_dir = page_path.parent.relative_to(docs_dir).as_posix()
+        except ValueError:
+            return None
+        return self._project_for_dir(page_dir)
+
+    def _project_for_dir(self, page_dir: str) -> Optional[str]:
+        """
+        The project of the nearest enclosing project directory of ``page_dir``.
+
+        ``page_dir`` is a POSIX path relative to docs_dir. Looks up each
+        ancestor in an index from directories to projects, and remembers the
+        result for every directory until the projects change.
+        """
+        if page_dir in self._nearest_projects:
+            return self._nearest_projects[page_dir]
+        if self._project_dirs_index is None:
+            self._project_dirs_index = {}
+            for name, project_dir in self.project_map.items():
+                # The first project wins if several share a directory
+                self._project_dirs_index.setdefault(Path(project_dir).as_posix(), name)
+        project = None
+        current = page_dir
+        while True:
+            if current in self._project_dirs_index:
+                project = self._project_dirs_index[current]
                 break
-            current = current.parent
-        return None
+            if current == ".":
+                break
+            current = posixpath.dirname(current) or "."
+        self._nearest_projects[page_dir] = project
+        return project
+
+    def on_startup(self, *, command, dirty):
+        # Defining on_startup keeps this instance alive across serve rebuilds
+        if command == "serve":
+            self.tracker = ServeTracker(
+                self.config["serve_debounce"] / 1000, self.config["projects_exclude"]
+            )
+        if self.config["trace"] or os.environ.get(TRACE_ENV):
+            # Kept for the whole session, so that serve rebuilds end up in one trace
+            self.tracer = Tracer()
 
+    def on_shutdown(self):
+        if self.pipeline is not None:
+            self.pipeline.close()
+            self.pipeline = None
+        if self.tracker is not None:
+            self.tracker.close()
+            self.tracker = None
+        self._close_exporter()
+        if self.trace_file is not None:
+            self.tracer.write(self.trace_file)
+
+    @traced
     def on_config(self, config):
         self.docs_dir = Path(config["docs_dir"])
+        self.page_projects = {}
+        self.project_views = {}
+        self.page_lazy_projects = {}
+        self.placeholder_images = set()
+        self.page_urls = {}
+        self.page_dest = {}
+        self.project_map = {}
+        self.file_projects = {}
+        self.pages_with_auto_views = set()
+        self.rendered_views = {}
+        self._close_exporter()
+        self.profile = BuildProfile()
+        self.exclude_docs = config.get("exclude_docs")
+        config_dir = Path(config.get("config_file_path") or "mkdocs.yml").parent
+        # The index is only worth keeping on disk together with the cache
+        index_file = None
+        if self.config["cache"]:
+            index_file = config_dir / self.config["cache_dir"] / "discovery.json"
+        if self.discovery.index_file != index_file:
+            self.discovery = ProjectDiscovery(index_file)
+        start = time.perf_counter()
         self._discover_projects(self.docs_dir)
+        self.profile.discovery = time.perf_counter() - start
+        self.discovery.save()
+        theme = config.get("theme") or {}
+        self.instant_navigation = "navigation.instant" in (theme.get("features") or [])
+        if self.tracker is not None:
+            self.tracker.watch(self._project_dirs())
+        self.cli = Likec4Cli.resolve(
+            self.config["likec4_path"], (config_dir, Path.cwd())
+        )
+        self.size_report = None
+        if self.config["size_report"]:
+            self.size_report = config_dir / self.config["size_report"]
+        self.profile_report = None
+        if self.config["profile_report"]:
+            self.profile_report = config_dir / self.config["profile_report"]
+        self.trace_file = None
+        if self.tracer.enabled:
+            if self.config["trace"]:
+                self.trace_file = config_dir / self.config["trace"]
+            else:
+                self.trace_file = Path(os.environ[TRACE_ENV])
+        if self.config["cache"]:
+            self.cache = BundleCache(
+                config_dir / self.config["cache_dir"],
+                self.config["cache_max_size"] * 1024 * 1024,
+                self.config["projects_exclude"],
+            )
+        self._start_pipeline()
+        self._start_exports()
         return config
 
+    def _start_pipeline(self) -> None:
+        """Start background codegen so it overlaps with page rendering."""
+        if self.pipeline is not None:
+            self.pipeline.close()
+            self.pipeline = None
+        if (
+            self.config["pipeline"] == "off"
+            # The referenced views are only known once all pages are rendered
+            or self.config["tree_shake"]
+        ):
+            return
+        self.pipeline = CodegenPipeline(
+            self._generate, self._worker_count(len(self.project_map))
+        )
+        if self.config["pipeline"] == "eager":
+            for project in self.project_map:
+                if self.tracker is None or self.tracker.is_stale(project):
+                    self.pipeline.start(project)
+
+    @traced
+    def on_serve(self, server, config, builder):
+        """Watch the sources of every project to regenerate only changed ones."""
+        if self.tracker is not None:
+            self.tracker.watch(self._project_dirs(), server.observer)
+        return server
+
+    def _project_dirs(self) -> dict:
+        return {name: self.docs_dir / d for name, d in self.project_map.items()}
+
+    @traced
+    def on_files(self, files, *, config):
+        """Resolve the nearest project of every page before the pages are rendered."""
+        self.file_projects = {
+            file.src_uri: self._project_for_dir(posixpath.dirname(file.src_uri) or ".")
+            for file in files.documentation_pages()
+        }
+        return files
+
+    @traced
     def on_page_markdown(self, markdown: str, page, **kwargs) -> str:
         """Parse likec4-view code blocks and replace with web component HTML."""
+        start = time.perf_counter()
+        blocks = 0
         page_file = page.file.src_uri
         projects_on_page = set()
         page_path = self.docs_dir / page.file.src_path
-        default_scheme = self.config["color_scheme"]
+        nearest_project = None
         has_auto_view = False
+        eager_projects = set()
+        has_lazy_view = False
 
-        def replacer(match):
-            nonlocal has_auto_view
-            indent, options_text, view_id = (
-                match.group(1),
-                match.group(2),
-                match.group(3),
-            )
-            opts = LikeC4Parser.parse_options(
-                options_text.strip(),
-                view_id.strip(),
-                default_color_scheme=default_scheme,
+        def replacer(block):
+            nonlocal blocks, nearest_project, has_auto_view, has_lazy_view
+            if not blocks:
+                if page_file in self.file_projects:
+                    nearest_project = self.file_projects[page_file]
+                else:
+                    nearest_project = self._find_nearest_project(
+                        page_path, self.docs_dir
+                    )
+            blocks += 1
+            opts, html = self._render_view(
+                block.options.strip(), block.view_id.strip(), nearest_project
             )
 
-            if opts.project is None:
-                opts.project = self._find_nearest_project(page_path, self.docs_dir)
+            if html is None:
+                # Placeholder images are linked relative to the page
+                placeholder = self._placeholder(opts.project, opts.view_id, page.url)
+                if opts.static:
+                    if placeholder is not None:
+                        return block.indent + LikeC4Parser.to_html(
+                            opts, placeholder=placeholder
+                        )
+                    log.warning(
+                        "mkdocs-likec4: No image of view '%s' in %s, "
+                        "embedding it interactively",
+                        opts.view_id,
+                        page_file,
+                    )
+                html = LikeC4Parser.to_html(opts, self._bundle_url(opts), placeholder)
 
             projects_on_page.add(opts.project)
+            self.project_views.setdefault(opts.project, set()).add(opts.view_id)
             if opts.color_scheme == "auto":
                 has_auto_view = True
-            return indent + LikeC4Parser.to_html(opts)
+            if opts.loading == "lazy":
+                has_lazy_view = True
+            else:
+                eager_projects.add(opts.project)
+            return block.indent + html
 
-        markdown = LikeC4Parser.PATTERN.sub(replacer, markdown)
+        markdown = LikeC4Parser.sub(replacer, markdown)
         if projects_on_page:
             self.page_projects[page_file] = projects_on_page
+            self.page_urls[page_file] = page.url
+            if self.pipeline is not None:
+                for project in projects_on_page & self.project_map.keys():
+                    if self.tracker is None or self.tracker.is_stale(project):
+                        self.pipeline.start(project)
         if has_auto_view:
             self.pages_with_auto_views.add(page_file)
+        if has_lazy_view:
+            # Their bundles are fetched by the loader when they come into view
+            self.page_lazy_projects[page_file] = projects_on_page - eager_projects
+        self.profile.add_page(time.perf_counter() - start, blocks)
         return markdown
 
+    def _render_view(
+        self, options_text: str, view_id: str, default_project: Optional[str]
+    ) -> tuple[ViewOptions, Optional[str]]:
+        """
+        Parse the options of a view and render it, memoized for the build.
+
+        The HTML is None if it depends on the page, i.e. with a placeholder.
+        The returned options are shared between pages and must not be changed.
+        """
+        key = (options_text, view_id, default_project)
+        if (rendered := self.rendered_views.get(key)) is not None:
+            return rendered
+        opts = LikeC4Parser.parse_options(
+            options_text,
+            view_id,
+            default_color_scheme=self.config["color_scheme"],
+            default_loading="lazy" if self.config["lazy"] else "eager",
+        )
+        if opts.project is None:
+            opts.project = default_project
+        html = None
+        if not (self.config["placeholders"] or opts.static):
+            html = LikeC4Parser.to_html(opts, self._bundle_url(opts))
+        self.rendered_views[key] = (opts, html)
+        return opts, html
+
+    def _bundle_url(self, opts: ViewOptions) -> Optional[str]:
+        """The bundle URL for views that the loader defines, see to_html."""
+        if self.config["loading"] == "on_demand" or opts.loading == "lazy":
+            return self._loader_url(opts.project)
+        return None
+
+    def _placeholder(
+        self, project: Optional[str], view_id: str, page_url: str
+    ) -> Optional[Placeholder]:
+        """Export the image of a view, to be copied into the site after the build."""
+        if project not in self.project_map:
+            return None
+        if self.exporter is None:
+            self.exporter = self._new_exporter()
+        image = self.exporter.image(project, self.project_map[project], view_id)
+        if image is None:
+            return None
+        self.placeholder_images.add((project, view_id))
+        _, width, height = image
+        url = get_relative_url(ViewExporter.get_image_path(project, view_id), page_url)
+        return Placeholder(url, width, height)
+
+    def _new_exporter(self) -> ViewExporter:
+        return ViewExporter(
+            str(self.docs_dir),
+            self.cli,
+            self.cache,
+            self._worker_count(len(self.project_map)),
+        )
+
+    def _start_exports(self) -> None:
+        """Export the images of every project in the background, for placeholders."""
+        if not self.config["placeholders"]:
+            return
+        self.exporter = self._new_exporter()
+        for project, project_dir in self.project_map.items():
+            self.exporter.start(project, project_dir)
+
+    def _close_exporter(self) -> None:
+        if self.exporter is not None:
+            self.exporter.close()
+            self.exporter = None
+
+    def _page_scripts(self, page) -> tuple[list[tuple[str, str]], list[str]]:
+        """
+        List the scripts a page needs as ``(url, attributes)`` pairs.
+
+        Also returns the URLs of the bundles that the loader fetches right
+        away, which are worth a preload hint as well.
+        """
+        page_file = page.file.src_uri
+        projects = self.page_projects[page_file]
+        lazy_projects = self.page_lazy_projects.get(page_file, set())
+        # Projects whose names differ only in case share a bundle
+        bundles = sorted(
+            {
+                get_relative_url(WebComponentGenerator.get_script_path(p), page.url)
+                for p in projects - lazy_projects
+            }
+        )
+        loader_url = get_relative_url(LOADER_SCRIPT, page.url)
+        loading = self.config["loading"]
+        if loading == "eager" and (
+            self.instant_navigation or page_file in self.page_lazy_projects
+        ):
+            # Plain tags would evaluate the bundles again on every navigation,
+            # or once more when the loader fetches them for a lazy view
+            loading = "combined"
+        if loading == "on_demand":
+            # The views name their bundles, see LikeC4Parser.to_html
+            scripts = [(loader_url, "")]
+            bundles = []
+        elif loading == "combined":
+            names = sorted({self._loader_url(p) for p in projects - lazy_projects})
+            scripts = [(loader_url, f' data-likec4-bundles="{" ".join(names)}"')]
+        else:
+            scripts = [(url, "") for url in bundles]
+            bundles = []
+        if page_file in self.pages_with_auto_views:
+            scripts.append((get_relative_url(THEME_SYNC_SCRIPT, page.url), ""))
+        return scripts, bundles
+
+    @staticmethod
+    def _loader_url(project: Optional[str]) -> str:
+        """The URL of a project's bundle relative to loader.js."""
+        return posixpath.relpath(
+            WebComponentGenerator.get_script_path(project),
+            posixpath.dirname(LOADER_SCRIPT),
+        )
+
+    def _script_tag(self, url: str, attrs: str) -> str:
+        script_type = self.config["script_type"]
+        if script_type == "defer":
+            attrs += " defer"
+        elif script_type == "module":
+            attrs += ' type="module"'
+        return f'<script src="{url}"{attrs}></script>'
+
+    def _preload_tag(self, url: str) -> str:
+        if self.config["script_type"] == "module":
+            return f'<link rel="modulepreload" href="{url}">'
+        return f'<link rel="preload" href="{url}" as="script">'
+
+    @traced
     def on_page_content(self, html, page, **kwargs):
         """Inject project-specific JavaScript only on pages that use likec4-view."""
-        page_file = page.file.src_uri
-        if page_file not in self.page_projects:
+        if (
+            page.file.src_uri not in self.page_projects
+            or self.config["script_placement"] != "content"
+        ):
             return html
+        scripts, _ = self._page_scripts(page)
+        tags = [self._script_tag(url, attrs) for url, attrs in scripts]
+        return "\n".join(tags) + "\n" + html
 
-        scripts = [
-            f'<script src="{get_relative_url(WebComponentGenerator.get_script_path(p), page.url)}"></script>'
-            for p in self.page_projects[page_file]
-        ]
-        if page_file in self.pages_with_auto_views:
-            scripts.append(
-                f'<script src="{get_relative_url(THEME_SYNC_SCRIPT, page.url)}"></script>'
+    @traced
+    def on_post_page(self, output: str, page, config) -> str:
+        """Add preload hints, and the scripts unless they went into the content."""
+        if self.config["prefetch"]:
+            # Every page may link to pages with diagrams
+            url = get_relative_url(PREFETCH_SCRIPT, page.url)
+            output = self._insert_before(
+                output, "</body>", [f'<script src="{url}" defer></script>']
             )
-        return "\n".join(scripts) + "\n" + html
+        if page.file.src_uri not in self.page_projects:
+            return output
+        # Rewritten with hashed bundle names once the bundles exist
+        self.page_dest[page.file.src_uri] = page.file.abs_dest_path
+        scripts, bundles = self._page_scripts(page)
+        head = []
+        if self.config["preload"]:
+            head = [self._preload_tag(url) for url, _ in scripts]
+            # Fetched by the loader, which the browser cannot discover on its own
+            head += [self._preload_tag(url) for url in bundles]
+        tags = [self._script_tag(url, attrs) for url, attrs in scripts]
+        body = []
+        if self.config["script_placement"] == "head":
+            head += tags
+        elif self.config["script_placement"] == "body":
+            body = tags
+        output = self._insert_before(output, "</head>", head)
+        return self._insert_before(output, "</body>", body)
 
+    @staticmethod
+    def _insert_before(output: str, closing_tag: str, tags: list) -> str:
+        if not tags:
+            return output
+        html = "\n".join(tags) + "\n"
+        index = output.lower().rfind(closing_tag)
+        if index == -1:
+            # Themes without the tag still get the scripts
+            return html + output if closing_tag == "</head>" else output + html
+        return output[:index] + html + output[index:]
+
+    @traced
     def on_post_build(self, config):
         """Generate web component JS files for all projects used across the site."""
         site_dir = Path(config["site_dir"])
         all_projects = {p for projects in self.page_projects.values() for p in projects}
 
-        for project in all_projects:
+        projects = []
+        for project in sorted(all_projects, key=lambda p: p or ""):
             if project in self.project_map:
-                WebComponentGenerator.generate(
-                    project,
-                    self.project_map[project],
-                    str(self.docs_dir),
-                    site_dir,
-                    use_dot=self.config["use_dot"],
-                )
+                projects.append(project)
             else:
                 log.warning(
                     "mkdocs-likec4: Skipping generation for undiscovered project: %s",
                     project,
                 )
 
+        referenced = list(projects)
+        if self.tracker is not None:
+            flags = (self.config["use_dot"], self._views_key(projects))
+            projects = self.tracker.reuse(projects, site_dir, flags)
+
+        results = self._generate_all(projects, site_dir)
+        for result in results:
+            self._log_result(result)
+        if self.tracker is not None:
+            self.tracker.remember(results, site_dir)
+        self.profile.codegen = results
+
+        if self.exporter is not None:
+            for project, view_id in sorted(
+                self.placeholder_images, key=lambda i: (i[0] or "", i[1])
+            ):
+                self.exporter.copy(project, view_id, site_dir)
+            self._close_exporter()
+
+        if self.cache is not None:
+            self.cache.save()
+
+        assets = AssetManifest()
+        if self.config["hash_filenames"]:
+            self._hash_bundles(referenced, site_dir, assets)
+
+        written = [
+            assets.resolve(WebComponentGenerator.get_script_path(p)) for p in referenced
+        ]
         if self.pages_with_auto_views:
-            self._copy_theme_sync_asset(site_dir)
+            written.append(self._copy_asset(THEME_SYNC_SCRIPT, site_dir))
+        if self.page_lazy_projects or (
+            self.page_projects
+            and (self.config["loading"] != "eager" or self.instant_navigation)
+        ):
+            written.append(self._copy_asset(LOADER_SCRIPT, site_dir))
+        if self.config["prefetch"]:
+            self._write_prefetch_manifest(site_dir, assets)
+            written.append(self._copy_asset(PREFETCH_SCRIPT, site_dir))
+            written.append(PREFETCH_MANIFEST)
+
+        if self.config["compress"]:
+            self._compress(written, site_dir)
+
+        if self.profile_report is not None:
+            self.profile.write(self.profile_report)
+            for line in self.profile.summary():
+                log.info("mkdocs-likec4: Profile: %s", line)
+
+        self._check_sizes(referenced, site_dir, assets)
+
+    @traced
+    def on_build_error(self, error, **kwargs):
+        if self.pipeline is not None:
+            self.pipeline.close()
+            self.pipeline = None
+        self._close_exporter()
+
+    def _generate(self, project: Optional[str], site_dir: Path) -> GenerationResult:
+        return WebComponentGenerator.generate(
+            project,
+            self.project_map[project],
+            str(self.docs_dir),
+            site_dir,
+            use_dot=self.config["use_dot"],
+            cache=self.cache,
+            node_memory=self.config["worker_memory"],
+            cli=self.cli,
+            views=self._views(project),
+            tracer=self.tracer,
+            exclude=self.config["projects_exclude"],
+        )
+
+    def _views(self, project: Optional[str]) -> Optional[frozenset]:
+        """The views to keep in a project's bundle, or None to keep all."""
+        if not self.config["tree_shake"]:
+            return None
+        return frozenset(self.project_views.get(project, ()))
+
+    def _views_key(self, projects: list) -> Optional[tuple]:
+        if not self.config["tree_shake"]:
+            return None
+        return tuple((p, tuple(sorted(self._views(p)))) for p in projects)
+
+    def _generate_all(self, projects: list, site_dir: Path) -> list:
+        """Run codegen for all projects concurrently, in input order."""
+        if self.pipeline is not None:
+            pipeline, self.pipeline = self.pipeline, None
+            return pipeline.join(projects, site_dir)
+        if not projects:
+            return []
+        with ThreadPoolExecutor(max_workers=self._worker_count(len(projects))) as pool:
+            futures = [pool.submit(self._generate, p, site_dir) for p in projects]
+            return [f.result() for f in futures]
+
+    def _worker_count(self, jobs: int) -> int:
+        """
+        Size the codegen pool.
+
+        Defaults to the CPU count. With ``worker_memory`` set, the pool is further
+        limited so that the Node.js heaps fit into the available memory.
+        """
+        workers = self.config["max_workers"] or os.cpu_count() or 1
+        if memory := self.config["worker_memory"]:
+            if available := self._available_memory():
+                workers = min(workers, available // (memory * 1024 * 1024))
+        return max(1, min(workers, jobs))
+
+    @staticmethod
+    def _available_memory() -> Optional[int]:
+        """
+        Return the available physical memory in bytes, if the platform reports it.
+
+        On Linux this is ``MemAvailable``, which unlike the free pages reported
+        by ``sysconf`` includes the page cache that can be reclaimed.
+        """
+        try:
+            with MEMINFO.open("r") as f:
+                for line in f:
+                    if line.startswith("MemAvailable:"):
+                        return int(line.split()[1]) * 1024
+        except (OSError, ValueError, IndexError):
+            pass
+        try:
+            return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+        except (AttributeError, ValueError, OSError):
+            return None
+
+    @staticmethod
+    def _log_result(result: GenerationResult) -> None:
+        if result.cached:
+            log.info("mkdocs-likec4: Using cached web component for %s", result.label)
+        elif result.ok:
+            log.info(
+                "mkdocs-likec4: Generated web component for %s in %.1fs",
+                result.label,
+                result.duration,
+            )
+        else:
+            log.error("mkdocs-likec4: %s: %s", result.label.capitalize(), result.error)
+
+    def _hash_bundles(
+        self, projects: list, site_dir: Path, assets: AssetManifest
+    ) -> None:
+        """Rename bundles to content-hashed names and update the pages using them."""
+        for script_path in sorted(
+            {WebComponentGenerator.get_script_path(p) for p in projects}
+        ):
+            if (site_dir / script_path).is_file():
+                assets.add(site_dir, script_path)
+        for dest in self.page_dest.values():
+            assets.rewrite_file(Path(dest))
+        assets.write(site_dir)
+
+    def _write_prefetch_manifest(self, site_dir: Path, assets: AssetManifest) -> None:
+        """
+        Map page URLs to the bundles they load, relative to the site root.
+
+        Bundle paths are listed once and referenced by index from the pages.
+        """
+        bundles = sorted(
+            {
+                assets.resolve(WebComponentGenerator.get_script_path(p))
+                for projects in self.page_projects.values()
+                for p in projects
+                if p in self.project_map
+            }
+        )
+        index = {bundle: i for i, bundle in enumerate(bundles)}
+        pages = {}
+        for page_file, projects in sorted(self.page_projects.items()):
+            ids = sorted(
+                {
+                    index[assets.resolve(WebComponentGenerator.get_script_path(p))]
+                    for p in projects
+                    if p in self.project_map
+                }
+            )
+            if ids and page_file in self.page_urls:
+                pages[self.page_urls[page_file]] = ids
+        dest = site_dir / PREFETCH_MANIFEST
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        dest.write_text(
+            json.dumps({"bundles": bundles, "pages": pages}, separators=(",", ":"))
+        )
+
+    def _compress(self, asset_paths: list, site_dir: Path) -> None:
+        """Write precompressed siblings of the assets, for servers that use them."""
+        encodings = available_encodings(self.config["compress"])
+        paths = [
+            site_dir / p
+            for p in sorted(set(asset_paths))
+            if site_dir.joinpath(p).is_file()
+        ]
+        for asset in compress_assets(
+            paths, encodings, self.cache, self.config["max_workers"]
+        ):
+            sizes = ", ".join(
+                f"{encoding} {format_size(size)}"
+                for encoding, size in asset.variants.items()
+            )
+            log.info(
+                "mkdocs-likec4: Compressed %s: %s -> %s",
+                asset.path.relative_to(site_dir).as_posix(),
+                format_size(asset.size),
+                sizes,
+            )
+
+    def _check_sizes(
+        self, projects: list, site_dir: Path, assets: AssetManifest
+    ) -> None:
+        """Compare the bundle sizes with the budgets and write the size report."""
+        # Budgets are configured in kB
+        budget = SizeBudget(
+            **{
+                key: limit * 1000
+                for key in ("project", "project_gzip", "total", "total_gzip")
+                if (limit := self.config[f"budget_{key}"]) is not None
+            }
+        )
+        if not budget.enabled and self.size_report is None:
+            return
+        bundles = {}
+        for project in projects:
+            path = assets.resolve(WebComponentGenerator.get_script_path(project))
+            bundles.setdefault(path, project)
+        sizes = measure(site_dir, bundles)
+        exceeded = check(sizes, budget)
+        if self.size_report is not None:
+            write_report(self.size_report, sizes, budget, exceeded)
+        if not exceeded:
+            return
+        if self.config["budget_strict"]:
+            raise PluginError("mkdocs-likec4: " + "; ".join(exceeded))
+        for message in exceeded:
+            log.warning("mkdocs-likec4: %s", message)
 
     @staticmethod
-    def _copy_theme_sync_asset(site_dir: Path) -> None:
-        dest = site_dir / THEME_SYNC_SCRIPT
+    def _copy_asset(script_path: str, site_dir: Path) -> str:
+        dest = site_dir / script_path
         dest.parent.mkdir(parents=True, exist_ok=True)
-        src = resources.files("mkdocs_likec4").joinpath("assets/theme_sync.js")
+        src = resources.files("mkdocs_likec4").joinpath(f"assets/{dest.name}")
         with resources.as_file(src) as src_path:
             shutil.copy2(src_path, dest)
+        return script_path
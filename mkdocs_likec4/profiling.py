@@ -0,0 +1,140 @@
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+log = logging.getLogger(f"mkdocs.plugins.{__name__}")
+
+
+@dataclass
+class ProcessUsage:
+    """CPU time (user + system, in seconds) and peak RSS (in bytes) of a process."""
+
+    cpu_time: float
+    max_rss: int
+
+
+def run_measured(
+    cmd: list,
+    *,
+    check: bool = False,
+    capture_output: bool = False,
+    text: bool = False,
+    env: Optional[dict] = None,
+) -> subprocess.CompletedProcess:
+    """
+    Run ``cmd`` like :func:`subprocess.run`, also recording its resource usage.
+
+    The usage is stored as ``usage`` on the returned process, or None on
+    platforms without :func:`os.wait4`. Output is captured into temporary files
+    rather than pipes, so the child can be reaped with ``wait4`` without
+    risking a full pipe blocking it.
+    """
+    if not hasattr(os, "wait4"):
+        proc = subprocess.run(
+            cmd, check=check, capture_output=capture_output, text=text, env=env
+        )
+        proc.usage = None
+        return proc
+
+    with ExitStack() as stack:
+        out = err = None
+        if capture_output:
+            out = stack.enter_context(tempfile.TemporaryFile())
+            err = stack.enter_context(tempfile.TemporaryFile())
+        popen = subprocess.Popen(cmd, stdout=out, stderr=err, env=env)
+        try:
+            _, status, rusage = os.wait4(popen.pid, 0)
+        except BaseException:
+            popen.kill()
+            popen.wait()
+            raise
+        popen.returncode = os.waitstatus_to_exitcode(status)
+        stdout = stderr = None
+        if capture_output:
+            stdout, stderr = (_read(f, text) for f in (out, err))
+
+    proc = subprocess.CompletedProcess(cmd, popen.returncode, stdout, stderr)
+    # ru_maxrss is in kilobytes on Linux, but in bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    proc.usage = ProcessUsage(
+        rusage.ru_utime + rusage.ru_stime, rusage.ru_maxrss * scale
+    )
+    if check:
+        proc.check_returncode()
+    return proc
+
+
+def _read(f, text: bool):
+    f.seek(0)
+    data = f.read()
+    return data.decode(errors="replace") if text else data
+
+
+@dataclass
+class BuildProfile:
+    """Where the plugin spent its time during one build."""
+
+    discovery: float = 0.0
+    markdown: float = 0.0
+    pages: int = 0
+    blocks: int = 0
+    codegen: list = field(default_factory=list)
+
+    def add_page(self, duration: float, blocks: int) -> None:
+        self.markdown += duration
+        self.pages += 1
+        self.blocks += blocks
+
+    def to_dict(self) -> dict:
+        return {
+            "discovery": {"time": self.discovery},
+            "markdown": {
+                "time": self.markdown,
+                "pages": self.pages,
+                "blocks": self.blocks,
+            },
+            "codegen": [
+                {
+                    "project": r.project,
+                    "ok": r.ok,
+                    "cached": r.cached,
+                    "wall_time": r.duration,
+                    "cpu_time": r.cpu_time,
+                    "max_rss": r.max_rss,
+                }
+                for r in self.codegen
+            ],
+        }
+
+    def summary(self) -> list[str]:
+        """Human-readable lines for the build log."""
+        lines = [
+            f"project discovery {self.discovery:.3f}s",
+            f"likec4-view blocks {self.markdown:.3f}s "
+            f"({self.blocks} blocks on {self.pages} pages)",
+        ]
+        for r in self.codegen:
+            if r.cached:
+                detail = "cached"
+            else:
+                detail = f"{r.duration:.1f}s wall"
+                if r.cpu_time is not None:
+                    detail += f", {r.cpu_time:.1f}s CPU"
+                if r.max_rss is not None:
+                    detail += f", {r.max_rss / 1024 / 1024:.0f} MB peak RSS"
+            lines.append(f"codegen for {r.label} {detail}")
+        return lines
+
+    def write(self, path: Path) -> None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(self.to_dict(), indent=2) + "\n")
+        except OSError as e:
+            log.warning("mkdocs-likec4: Failed to write profile %s: %s", path, e)
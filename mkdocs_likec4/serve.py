@@ -0,0 +1,199 @@
+import logging
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+
+import pathspec
+
+from watchdog.events import (
+    EVENT_TYPE_CREATED,
+    EVENT_TYPE_DELETED,
+    EVENT_TYPE_MODIFIED,
+    EVENT_TYPE_MOVED,
+    FileSystemEventHandler,
+)
+
+from .cache import DEFAULT_EXCLUDE, include_dirs, is_input
+from .generator import GenerationResult, WebComponentGenerator
+
+log = logging.getLogger(f"mkdocs.plugins.{__name__}")
+
+CHANGE_EVENTS = (
+    EVENT_TYPE_CREATED,
+    EVENT_TYPE_DELETED,
+    EVENT_TYPE_MODIFIED,
+    EVENT_TYPE_MOVED,
+)
+
+
+def is_source(path: str) -> bool:
+    """Whether a file affects the generated web component of its project."""
+    return is_input(Path(path))
+
+
+class _ProjectHandler(FileSystemEventHandler):
+    def __init__(
+        self,
+        tracker: "ServeTracker",
+        project: Optional[str],
+        root: Optional[Path] = None,
+        exclude: Optional[pathspec.PathSpec] = None,
+    ):
+        self.tracker = tracker
+        self.project = project
+        self.root = root
+        self.exclude = exclude
+
+    def _excluded(self, path: str) -> bool:
+        if self.root is None or self.exclude is None:
+            return False
+        try:
+            rel = Path(path).relative_to(self.root).as_posix()
+        except ValueError:
+            return False
+        return self.exclude.match_file(rel)
+
+    def on_any_event(self, event):
+        if event.is_directory or event.event_type not in CHANGE_EVENTS:
+            return
+        paths = (event.src_path, getattr(event, "dest_path", ""))
+        if any(p and is_source(p) and not self._excluded(p) for p in paths):
+            self.tracker.mark_dirty(self.project)
+
+
+class ServeTracker:
+    """
+    Regenerates only the projects whose sources changed during ``mkdocs serve``.
+
+    Bundles are kept in a session directory between rebuilds. A project is
+    regenerated when a watched input file changed, when its bundle is not
+    stored yet, or when the codegen flags differ from the previous build. The
+    project directory is watched along with the directories its config
+    includes, except for the parts matching ``exclude``.
+    """
+
+    def __init__(self, debounce: float, exclude: Iterable[str] = DEFAULT_EXCLUDE):
+        self.debounce = debounce
+        self.exclude = pathspec.GitIgnoreSpec.from_lines(exclude)
+        self._store = Path(tempfile.mkdtemp(prefix="mkdocs_likec4_serve_"))
+        self._stored: set = set()
+        self._flags = None
+        self._last_change: dict[Optional[str], float] = {}
+        self._lock = threading.Lock()
+        self._observer = None
+        self._watches: dict[Optional[str], tuple] = {}
+
+    def watch(self, project_dirs: dict, observer=None) -> None:
+        """Watch the source directories of the given projects."""
+        if observer is not None:
+            self._observer = observer
+        if self._observer is None:
+            return
+        wanted = {
+            project: tuple([path, *include_dirs(path)])
+            for project, path in project_dirs.items()
+            if path.is_dir()
+        }
+        for project in list(self._watches):
+            dirs, watches = self._watches[project]
+            if wanted.get(project) != dirs:
+                self._unschedule(watches)
+                del self._watches[project]
+                self._stored.discard(project)
+        for project, dirs in wanted.items():
+            if project not in self._watches:
+                watches = [
+                    self._observer.schedule(
+                        _ProjectHandler(self, project, path, self.exclude),
+                        str(path),
+                        recursive=True,
+                    )
+                    for path in dirs
+                ]
+                self._watches[project] = (dirs, watches)
+
+    def _unschedule(self, watches: list) -> None:
+        for watch in watches:
+            try:
+                self._observer.unschedule(watch)
+            except KeyError:
+                # The observer was already stopped by the server
+                pass
+
+    def mark_dirty(self, project: Optional[str]) -> None:
+        with self._lock:
+            self._last_change[project] = time.monotonic()
+
+    def is_stale(self, project: Optional[str]) -> bool:
+        """Whether the next build has to regenerate ``project``."""
+        with self._lock:
+            return project not in self._stored or project in self._last_change
+
+    def _settle(self) -> None:
+        """Wait until no source change has been seen for ``debounce`` seconds."""
+        while True:
+            with self._lock:
+                latest = max(self._last_change.values(), default=None)
+            if latest is None:
+                return
+            remaining = latest + self.debounce - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(remaining)
+
+    def reuse(self, projects: list, site_dir: Path, flags: tuple) -> list:
+        """
+        Copy unchanged bundles into ``site_dir``.
+
+        Returns the subset of ``projects`` that needs to be regenerated.
+        """
+        if flags != self._flags:
+            self._stored.clear()
+            self._flags = flags
+        self._settle()
+        with self._lock:
+            self._stored.difference_update(self._last_change)
+            self._last_change.clear()
+
+        stale = []
+        for project in projects:
+            if project in self._stored:
+                try:
+                    self._copy(project, self._store, site_dir)
+                    log.debug(
+                        "mkdocs-likec4: Sources unchanged, reusing bundle for %s",
+                        project or "default",
+                    )
+                    continue
+                except OSError:
+                    self._stored.discard(project)
+            stale.append(project)
+        return stale
+
+    def remember(self, results: list[GenerationResult], site_dir: Path) -> None:
+        """Store freshly generated bundles for the following rebuilds."""
+        for result in results:
+            if not result.ok:
+                continue
+            try:
+                self._copy(result.project, site_dir, self._store)
+                self._stored.add(result.project)
+            except OSError as e:
+                log.debug("mkdocs-likec4: Failed to keep bundle: %s", e)
+
+    @staticmethod
+    def _copy(project: Optional[str], src_dir: Path, dest_dir: Path) -> None:
+        script_path = WebComponentGenerator.get_script_path(project)
+        dest = dest_dir / script_path
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(src_dir / script_path, dest)
+
+    def close(self) -> None:
+        if self._observer is not None:
+            for _, watches in self._watches.values():
+                self._unschedule(watches)
+        self._watches.clear()
+        shutil.rmtree(self._store, ignore_errors=True)
@@ -0,0 +1,113 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Iterator
+
+log = logging.getLogger(f"mkdocs.plugins.{__name__}")
+
+TRACE_ENV = "MKDOCS_LIKEC4_TRACE"
+
+
+class NullTracer:
+    """Tracer used when tracing is off. Its spans do nothing."""
+
+    enabled = False
+    _span = nullcontext()
+
+    def span(self, name: str, cat: str = "plugin", **args):
+        return self._span
+
+    def write(self, path: Path) -> None:
+        pass
+
+
+NULL_TRACER = NullTracer()
+
+
+class Tracer:
+    """
+    Records spans as Chrome trace events.
+
+    The written file can be opened in Perfetto (https://ui.perfetto.dev) or in
+    chrome://tracing. Spans may be recorded from several threads at once.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self._origin = time.perf_counter_ns()
+        self._events: list[dict] = []
+        self._threads: dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, cat: str = "plugin", **args) -> Iterator[None]:
+        """Record the time spent in the ``with`` block as a complete event."""
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end = time.perf_counter_ns()
+            tid = threading.get_native_id()
+            event = {
+                "name": name,
+                "cat": cat,
+                "ph": "X",
+                "ts": (start - self._origin) / 1000,
+                "dur": (end - start) / 1000,
+                "pid": os.getpid(),
+                "tid": tid,
+            }
+            if args:
+                event["args"] = args
+            with self._lock:
+                self._threads.setdefault(tid, threading.current_thread().name)
+                self._events.append(event)
+
+    def write(self, path: Path) -> None:
+        """Write all spans recorded so far in the Chrome trace-event format."""
+        pid = os.getpid()
+        with self._lock:
+            events = [
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": tid,
+                    "args": {"name": name},
+                }
+                for tid, name in self._threads.items()
+            ]
+            spans = len(self._events)
+            events += self._events
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(
+                json.dumps({"traceEvents": events, "displayTimeUnit": "ms"})
+            )
+        except OSError as e:
+            log.warning("mkdocs-likec4: Failed to write trace %s: %s", path, e)
+            return
+        log.info("mkdocs-likec4: Wrote trace with %d spans to %s", spans, path)
+
+
+def traced(hook):
+    """Record a span for each call of a plugin hook, labelled with the page."""
+    name = hook.__name__
+
+    @functools.wraps(hook)
+    def wrapper(self, *args, **kwargs):
+        tracer = self.tracer
+        if not tracer.enabled:
+            return hook(self, *args, **kwargs)
+        page = kwargs.get("page")
+        span_args = {"page": page.file.src_uri} if page is not None else {}
+        with tracer.span(name, "hook", **span_args):
+            return hook(self, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,184 @@
+import logging
+import os
+import re
+import shutil
+import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from .cache import DEFAULT_EXCLUDE, SOURCE_SUFFIXES, include_dirs, input_files
+
+log = logging.getLogger(f"mkdocs.plugins.{__name__}")
+
+VIEWS_HEADER = re.compile(r"^\s*views\s*$")
+VIEW_HEADER = re.compile(
+    r"^\s*(?:(?:dynamic|deployment)\s+)?view\s+(?!of\b)([A-Za-z_][\w-]*)"
+    r"(?:\s+extends\s+([A-Za-z_][\w-]*))?"
+)
+NAVIGATE_TO = re.compile(r"\bnavigateTo\s+([A-Za-z_][\w-]*)")
+
+
+@dataclass
+class ViewBlock:
+    """A named view declaration inside a ``views`` block."""
+
+    name: str
+    start: int
+    end: int
+    refs: set = field(default_factory=set)
+
+
+def _mask(text: str) -> str:
+    """Blank out comments and string literals, keeping offsets and newlines."""
+    out = list(text)
+    i, n = 0, len(text)
+    while i < n:
+        c = text[i]
+        if text.startswith("//", i):
+            end = text.find("\n", i)
+            end = n if end == -1 else end
+        elif text.startswith("/*", i):
+            end = text.find("*/", i + 2)
+            end = n if end == -1 else end + 2
+        elif c in "'\"":
+            quote = c * 3 if text.startswith(c * 3, i) else c
+            end = i + len(quote)
+            while end < n and not text.startswith(quote, end):
+                end += 2 if text[end] == "\\" else 1
+            end = min(n, end + len(quote))
+        else:
+            i += 1
+            continue
+        for j in range(i, end):
+            if out[j] != "\n":
+                out[j] = " "
+        i = end
+    return "".join(out)
+
+
+def _blocks(masked: str, start: int, end: int) -> Iterator[tuple[str, int, int, int]]:
+    """
+    Yield ``(header, header_start, open, close)`` for the brace blocks directly
+    inside ``masked[start:end]``. The header is the line text before ``{``.
+    """
+    depth = 0
+    line_start = open_at = start
+    for i in range(start, end):
+        c = masked[i]
+        if c == "{":
+            if depth == 0:
+                line_start = max(masked.rfind("\n", start, i), start - 1) + 1
+                open_at = i
+            depth += 1
+        elif c == "}" and depth:
+            depth -= 1
+            if depth == 0:
+                yield masked[line_start:open_at], line_start, open_at, i
+
+
+def scan_views(text: str) -> list[ViewBlock]:
+    """Find the named views declared in a LikeC4 source file."""
+    masked = _mask(text)
+    views = []
+    for header, _, body, close in _blocks(masked, 0, len(masked)):
+        if not VIEWS_HEADER.match(header):
+            continue
+        for view_header, start, _, end in _blocks(masked, body + 1, close):
+            if m := VIEW_HEADER.match(view_header):
+                refs = set(NAVIGATE_TO.findall(masked, start, end))
+                if m.group(2):
+                    # The base view is needed to resolve the extending one
+                    refs.add(m.group(2))
+                views.append(ViewBlock(m.group(1), start, end + 1, refs))
+    return views
+
+
+def remove_views(text: str, views: list[ViewBlock]) -> str:
+    """Cut ``views`` out of ``text``, keeping line numbers intact."""
+    for view in sorted(views, key=lambda v: v.start, reverse=True):
+        removed = text[view.start : view.end]
+        text = text[: view.start] + "\n" * removed.count("\n") + text[view.end :]
+    return text
+
+
+def reachable(views: dict, roots: set) -> set:
+    """Close ``roots`` over the ``navigateTo`` and ``extends`` links of ``views``."""
+    keep = set()
+    pending = list(roots)
+    while pending:
+        name = pending.pop()
+        if name in keep:
+            continue
+        keep.add(name)
+        for view in views.get(name, ()):
+            pending.extend(view.refs)
+    return keep
+
+
+def _link_dir(src: Path, dest: Path, exclude: Iterable[str]) -> None:
+    """Make ``src`` available at ``dest``, copying its inputs if links fail."""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        dest.symlink_to(src, target_is_directory=True)
+    except OSError:
+        # Creating symlinks needs extra privileges on Windows
+        for path in input_files(src, exclude):
+            target = dest / path.relative_to(src)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(path, target)
+
+
+@contextmanager
+def shaken_workspace(
+    project_path: Path, keep: set, exclude: Iterable[str] = DEFAULT_EXCLUDE
+) -> Iterator[Path]:
+    """
+    Copy a project's inputs, without the views that are not in ``keep``.
+
+    Views reachable from a kept view through ``navigateTo`` or ``extends`` are
+    kept as well, and so are unnamed views. Icons and images are copied along,
+    and the directories the config includes are linked at the same relative
+    location, so that relative paths keep working. Only the project's own
+    views are shaken. The copy is removed when the context exits.
+    """
+    project_path = project_path.resolve()
+    files = input_files(project_path, exclude)
+    sources = {
+        p: p.read_text(encoding="utf-8") for p in files if p.suffix in SOURCE_SUFFIXES
+    }
+    scanned = {p: scan_views(text) for p, text in sources.items()}
+    by_name: dict[str, list[ViewBlock]] = {}
+    for blocks in scanned.values():
+        for view in blocks:
+            by_name.setdefault(view.name, []).append(view)
+    keep = reachable(by_name, keep)
+    log.debug(
+        "mkdocs-likec4: Keeping %d of %d views of %s",
+        len(keep & by_name.keys()),
+        len(by_name),
+        project_path,
+    )
+
+    # An included ancestor would bring back the unshaken sources
+    includes = [
+        d for d in include_dirs(project_path) if not project_path.is_relative_to(d)
+    ]
+    root = Path(os.path.commonpath([project_path, *includes]))
+    workspace = Path(tempfile.mkdtemp(prefix="mkdocs_likec4_shaken_"))
+    try:
+        project_copy = workspace / project_path.relative_to(root)
+        for path in files:
+            dest = project_copy / path.relative_to(project_path)
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            if path in sources:
+                dropped = [v for v in scanned[path] if v.name not in keep]
+                dest.write_text(remove_views(sources[path], dropped), encoding="utf-8")
+            else:
+                shutil.copyfile(path, dest)
+        for include in includes:
+            _link_dir(include, workspace / include.relative_to(root), exclude)
+        yield project_copy
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
@@ -0,0 +1,106 @@
+import gzip
+import json
+import os
+
+import pytest
+
+from mkdocs_likec4.budget import (
+    BundleSize,
+    SizeBudget,
+    check,
+    gzip_size,
+    measure,
+    write_report,
+)
+
+SCRIPT = "assets/mkdocs_likec4/likec4_views_a.js"
+
+
+@pytest.fixture
+def site(tmp_path):
+    bundle = tmp_path / SCRIPT
+    bundle.parent.mkdir(parents=True)
+    bundle.write_text("bundle a " * 100)
+    return tmp_path
+
+
+class TestMeasure:
+    """Tests for measuring bundle sizes."""
+
+    def test_raw_and_gzip_size(self, site):
+        sizes = measure(site, {SCRIPT: "a"})
+
+        data = (site / SCRIPT).read_bytes()
+        expected = len(gzip.compress(data, compresslevel=9, mtime=0))
+        assert sizes == [BundleSize("a", SCRIPT, len(data), expected)]
+
+    def test_missing_bundle_is_skipped(self, tmp_path):
+        assert measure(tmp_path, {SCRIPT: "a"}) == []
+
+    def test_current_gz_sibling_is_used(self, site):
+        gz = site / f"{SCRIPT}.gz"
+        gz.write_bytes(b"x" * 7)
+
+        assert gzip_size(site / SCRIPT) == 7
+
+    def test_stale_gz_sibling_is_ignored(self, site):
+        gz = site / f"{SCRIPT}.gz"
+        gz.write_bytes(b"x" * 7)
+        bundle = site / SCRIPT
+        st = bundle.stat()
+        os.utime(gz, ns=(st.st_atime_ns, st.st_mtime_ns - 1_000_000_000))
+
+        assert gzip_size(bundle) != 7
+
+
+class TestCheck:
+    """Tests for comparing sizes with budgets."""
+
+    sizes = [
+        BundleSize("a", "a.js", 3000, 1000),
+        BundleSize(None, "b.js", 2000, 500),
+    ]
+
+    def test_within_budget(self):
+        budget = SizeBudget(project=3000, project_gzip=1000, total=5000)
+
+        assert check(self.sizes, budget) == []
+
+    def test_project_budget(self):
+        exceeded = check(self.sizes, SizeBudget(project=2500))
+
+        assert exceeded == [
+            "Bundle of project 'a' is 3.0 kB, over its budget of 2.5 kB"
+        ]
+
+    def test_gzip_budgets(self):
+        exceeded = check(self.sizes, SizeBudget(project_gzip=600, total_gzip=1400))
+
+        assert exceeded == [
+            "Gzipped bundle of project 'a' is 1.0 kB, over its budget of 600 B",
+            "Total gzipped bundle size is 1.5 kB, over its budget of 1.4 kB",
+        ]
+
+    def test_total_budget(self):
+        exceeded = check(self.sizes, SizeBudget(total=4000))
+
+        assert exceeded == ["Total bundle size is 5.0 kB, over its budget of 4.0 kB"]
+
+    def test_enabled(self):
+        assert not SizeBudget().enabled
+        assert SizeBudget(total_gzip=1).enabled
+
+
+def test_write_report(tmp_path):
+    sizes = [BundleSize("a", "a.js", 3000, 1000)]
+    path = tmp_path / "reports" / "sizes.json"
+
+    write_report(path, sizes, SizeBudget(total=10), ["too big"])
+
+    report = json.loads(path.read_text())
+    assert report["bundles"] == [
+        {"project": "a", "path": "a.js", "size": 3000, "gzip": 1000}
+    ]
+    assert report["total"] == {"size": 3000, "gzip": 1000}
+    assert report["budget"]["total"] == 10
+    assert report["exceeded"] == ["too big"]
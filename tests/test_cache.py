@@ -0,0 +1,196 @@
+"""Tests for the LikeC4 cache module."""
+
+import json
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from mkdocs_likec4.cache import BundleCache
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Create a minimal LikeC4 project directory."""
+    project = tmp_path / "docs" / "proj"
+    project.mkdir(parents=True)
+    (project / "likec4.config.json").write_text('{"name": "proj"}')
+    (project / "model.c4").write_text("model { }")
+    (project / "index.md").write_text("# Not a source")
+    return project
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Create an empty cache with a generous size cap."""
+    return BundleCache(tmp_path / "cache", 1024 * 1024)
+
+
+class TestSourceFiles:
+    """Tests for the source_files method."""
+
+    def test_lists_model_and_config_files(self, project):
+        """Test that only model sources and the project config are listed."""
+        names = [p.name for p in BundleCache.source_files(project)]
+        assert names == ["likec4.config.json", "model.c4"]
+
+    def test_includes_nested_sources(self, project):
+        """Test that sources in subdirectories are included."""
+        (project / "sub").mkdir()
+        (project / "sub" / "views.likec4").write_text("views { }")
+
+        names = [p.name for p in BundleCache.source_files(project)]
+        assert "views.likec4" in names
+
+    def test_lists_images(self, project):
+        """Test that icons referenced by relative paths are listed."""
+        (project / "icons").mkdir()
+        (project / "icons" / "db.svg").write_text("<svg/>")
+        (project / "logo.PNG").write_bytes(b"png")
+
+        names = [p.name for p in BundleCache.source_files(project)]
+        assert names == ["db.svg", "likec4.config.json", "logo.PNG", "model.c4"]
+
+    def test_skips_excluded_directories(self, project):
+        """Test that node_modules and hidden directories are not walked."""
+        for rel in ("node_modules/pkg", ".git", "vendor"):
+            (project / rel).mkdir(parents=True)
+            (project / rel / "x.c4").write_text("model { }")
+
+        with patch("os.scandir", wraps=os.scandir) as scandir:
+            files = BundleCache.source_files(project)
+
+        assert [p.relative_to(project).as_posix() for p in files] == [
+            "likec4.config.json",
+            "model.c4",
+            "vendor/x.c4",
+        ]
+        listed = {Path(c.args[0]).relative_to(project) for c in scandir.call_args_list}
+        assert listed == {Path("."), Path("vendor")}
+        assert [
+            p.name
+            for p in BundleCache.source_files(
+                project, [".*/", "node_modules/", "vendor/"]
+            )
+        ] == [
+            "likec4.config.json",
+            "model.c4",
+        ]
+
+    @pytest.mark.parametrize(
+        "include", [["../shared"], {"paths": ["../shared"]}], ids=["list", "paths"]
+    )
+    def test_includes_config_include_dirs(self, project, include):
+        """Test that directories included by the config are listed."""
+        shared = project.parent / "shared"
+        shared.mkdir()
+        (shared / "specs.c4").write_text("specification { }")
+        (project / "likec4.config.json").write_text(
+            json.dumps({"name": "proj", "include": include})
+        )
+
+        files = BundleCache.source_files(project)
+
+        assert files[-1] == shared.resolve() / "specs.c4"
+
+
+class TestFingerprint:
+    """Tests for the fingerprint method."""
+
+    def test_stable_for_unchanged_sources(self, cache, project):
+        """Test that the same sources and params yield the same key."""
+        params = {"likec4": "1.0.0", "use_dot": False}
+        assert cache.fingerprint(project, params) == cache.fingerprint(project, params)
+
+    def test_changes_with_source_content(self, cache, project):
+        """Test that editing a source file changes the key."""
+        before = cache.fingerprint(project, {})
+        (project / "model.c4").write_text("model { a = element }")
+        assert cache.fingerprint(project, {}) != before
+
+    def test_changes_with_params(self, cache, project):
+        """Test that codegen flags are part of the key."""
+        assert cache.fingerprint(project, {"use_dot": False}) != cache.fingerprint(
+            project, {"use_dot": True}
+        )
+
+    def test_ignores_non_source_files(self, cache, project):
+        """Test that markdown changes do not invalidate the key."""
+        before = cache.fingerprint(project, {})
+        (project / "index.md").write_text("# Changed")
+        assert cache.fingerprint(project, {}) == before
+
+    def test_changes_with_icon(self, cache, project):
+        """Test that editing a local icon changes the key."""
+        (project / "db.svg").write_text("<svg/>")
+        before = cache.fingerprint(project, {})
+        (project / "db.svg").write_text("<svg></svg>")
+        assert cache.fingerprint(project, {}) != before
+
+    def test_changes_with_included_sources(self, cache, project):
+        """Test that editing an included directory outside the project changes the key."""
+        shared = project.parent / "shared"
+        shared.mkdir()
+        (shared / "specs.c4").write_text("specification { }")
+        (project / "likec4.config.json").write_text(
+            json.dumps({"name": "proj", "include": ["../shared"]})
+        )
+        before = cache.fingerprint(project, {})
+        (shared / "specs.c4").write_text("specification { element a }")
+        assert cache.fingerprint(project, {}) != before
+
+    def test_trusts_unchanged_mtime_and_size(self, cache, project):
+        """Test that files with unchanged mtime and size are not rehashed."""
+        source = project / "model.c4"
+        before = cache.fingerprint(project, {})
+        st = source.stat()
+        source.write_text("model {x}")  # same size as before
+        os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+        assert cache.fingerprint(project, {}) == before
+
+    def test_index_persists_across_instances(self, cache, project, tmp_path):
+        """Test that saved digests are reused by a new cache instance."""
+        cache.fingerprint(project, {})
+        cache.save()
+
+        reloaded = BundleCache(tmp_path / "cache", 1024 * 1024)
+        assert str(project / "model.c4") in reloaded._load_index()
+
+
+class TestGetPut:
+    """Tests for storing and retrieving bundles."""
+
+    def test_miss_returns_false(self, cache, tmp_path):
+        """Test that a missing key is reported as a miss."""
+        assert cache.get("missing", tmp_path / "out.js") is False
+        assert not (tmp_path / "out.js").exists()
+
+    def test_put_then_get(self, cache, tmp_path):
+        """Test that a stored bundle is copied to the destination on a hit."""
+        src = tmp_path / "bundle.js"
+        src.write_text("console.log(1)")
+        cache.put("key", src)
+
+        dest = tmp_path / "out.js"
+        assert cache.get("key", dest) is True
+        assert dest.read_text() == "console.log(1)"
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Test that the oldest entries are evicted once the cap is exceeded."""
+        cache = BundleCache(tmp_path / "cache", 25)
+        src = tmp_path / "bundle.js"
+        src.write_text("x" * 10)
+        cache.put("old", src)
+        cache.put("used", src)
+        bundles = tmp_path / "cache" / "bundles"
+        os.utime(bundles / "old.js", (1, 1))
+        os.utime(bundles / "used.js", (2, 2))
+        cache.get("used", tmp_path / "out.js")
+
+        cache.put("new", src)
+
+        assert not (bundles / "old.js").exists()
+        assert (bundles / "used.js").exists()
+        assert (bundles / "new.js").exists()
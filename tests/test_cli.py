@@ -0,0 +1,105 @@
+import os
+import subprocess
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from mkdocs_likec4 import cli as cli_module
+from mkdocs_likec4.cli import Likec4Cli
+
+
+@pytest.fixture(autouse=True)
+def clear_versions():
+    cli_module._versions.clear()
+    yield
+    cli_module._versions.clear()
+
+
+def make_executable(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("#!/bin/sh\n")
+    path.chmod(0o755)
+    return path
+
+
+class TestResolve:
+    """Tests for locating the likec4 executable."""
+
+    @patch("mkdocs_likec4.cli.shutil.which", return_value="/usr/bin/likec4")
+    def test_configured_path_relative_to_config(self, _mock_which, tmp_path):
+        likec4 = make_executable(tmp_path / "tools" / "likec4")
+
+        cli = Likec4Cli.resolve("tools/likec4", (tmp_path,))
+
+        assert cli.command == [str(likec4)]
+
+    @patch("mkdocs_likec4.cli.shutil.which", return_value="/usr/bin/likec4")
+    def test_missing_configured_path_falls_back(self, _mock_which, tmp_path, caplog):
+        cli = Likec4Cli.resolve("missing/likec4", (tmp_path,))
+
+        assert cli.command == ["/usr/bin/likec4"]
+        assert "likec4_path not found" in caplog.text
+
+    @patch("mkdocs_likec4.cli.shutil.which", return_value="/usr/bin/likec4")
+    def test_local_install_preferred(self, _mock_which, tmp_path):
+        likec4 = make_executable(tmp_path / "node_modules" / ".bin" / "likec4")
+
+        cli = Likec4Cli.resolve(None, (tmp_path / "missing", tmp_path))
+
+        assert cli.command == [str(likec4)]
+
+    def test_path_before_npx(self, tmp_path):
+        with patch(
+            "mkdocs_likec4.cli.shutil.which",
+            side_effect=lambda name: f"/usr/bin/{name}",
+        ):
+            cli = Likec4Cli.resolve(None, (tmp_path,))
+
+        assert cli.command == ["/usr/bin/likec4"]
+
+    def test_npx_never_installs(self, tmp_path):
+        with patch(
+            "mkdocs_likec4.cli.shutil.which",
+            side_effect=lambda name: "/usr/bin/npx" if name == "npx" else None,
+        ):
+            cli = Likec4Cli.resolve(None, (tmp_path,))
+
+        assert cli.command == ["/usr/bin/npx", "--no", "likec4"]
+
+    @patch("mkdocs_likec4.cli.shutil.which", return_value=None)
+    def test_not_found(self, _mock_which, tmp_path):
+        assert Likec4Cli.resolve(None, (tmp_path,)) is None
+
+
+class TestVersion:
+    """Tests for the memoized version probe."""
+
+    @patch("mkdocs_likec4.cli.subprocess.run")
+    def test_probed_once_per_executable(self, mock_run, tmp_path):
+        likec4 = make_executable(tmp_path / "likec4")
+        mock_run.return_value = MagicMock(stdout="1.2.3\n")
+
+        assert Likec4Cli([str(likec4)]).version == "1.2.3"
+        assert Likec4Cli([str(likec4)]).version == "1.2.3"
+
+        mock_run.assert_called_once()
+        assert mock_run.call_args[0][0] == [str(likec4), "--version"]
+
+    @patch("mkdocs_likec4.cli.subprocess.run")
+    def test_reprobed_when_executable_changes(self, mock_run, tmp_path):
+        likec4 = make_executable(tmp_path / "likec4")
+        mock_run.return_value = MagicMock(stdout="1.2.3\n")
+        Likec4Cli([str(likec4)]).version
+        stat = likec4.stat()
+        os.utime(likec4, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        Likec4Cli([str(likec4)]).version
+
+        assert mock_run.call_count == 2
+
+    @patch(
+        "mkdocs_likec4.cli.subprocess.run",
+        side_effect=subprocess.CalledProcessError(1, "likec4"),
+    )
+    def test_failed_probe(self, _mock_run, tmp_path):
+        assert Likec4Cli([str(tmp_path / "likec4")]).version is None
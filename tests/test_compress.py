@@ -0,0 +1,111 @@
+import gzip
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from mkdocs_likec4.cache import BundleCache
+from mkdocs_likec4.compress import (
+    available_encodings,
+    compress_assets,
+    compress_file,
+    format_size,
+)
+
+
+@pytest.fixture
+def bundle(tmp_path):
+    path = tmp_path / "likec4_views_a.js"
+    path.write_text("customElements.define('likec4-view', View);\n" * 100)
+    return path
+
+
+class TestCompressFile:
+    """Tests for writing precompressed variants."""
+
+    def test_gzip_variant(self, bundle):
+        asset = compress_file(bundle, ["gzip"])
+
+        dest = bundle.with_name("likec4_views_a.js.gz")
+        assert gzip.decompress(dest.read_bytes()) == bundle.read_bytes()
+        assert asset.size == bundle.stat().st_size
+        assert asset.variants == {"gzip": dest.stat().st_size}
+        assert asset.variants["gzip"] < asset.size
+
+    def test_output_is_reproducible(self, bundle):
+        compress_file(bundle, ["gzip"])
+        first = bundle.with_name("likec4_views_a.js.gz").read_bytes()
+        compress_file(bundle, ["gzip"])
+
+        assert bundle.with_name("likec4_views_a.js.gz").read_bytes() == first
+
+    def test_brotli_variant(self, bundle):
+        brotli = MagicMock()
+        brotli.compress.return_value = b"br"
+        with patch("mkdocs_likec4.compress.brotli", brotli):
+            asset = compress_file(bundle, ["brotli"])
+
+        assert bundle.with_name("likec4_views_a.js.br").read_bytes() == b"br"
+        assert asset.variants == {"brotli": 2}
+        brotli.compress.assert_called_once_with(bundle.read_bytes(), quality=11)
+
+    def test_cached_variant_is_reused(self, bundle, tmp_path):
+        cache = BundleCache(tmp_path / "cache", 1024 * 1024)
+        compress_file(bundle, ["gzip"], cache)
+        bundle.with_name("likec4_views_a.js.gz").unlink()
+
+        with patch("mkdocs_likec4.compress.gzip.compress") as compress:
+            asset = compress_file(bundle, ["gzip"], cache)
+
+        compress.assert_not_called()
+        assert asset.cached == 1
+        assert bundle.with_name("likec4_views_a.js.gz").is_file()
+
+    def test_changed_content_is_compressed_again(self, bundle, tmp_path):
+        cache = BundleCache(tmp_path / "cache", 1024 * 1024)
+        compress_file(bundle, ["gzip"], cache)
+        bundle.write_text("changed")
+
+        asset = compress_file(bundle, ["gzip"], cache)
+
+        assert asset.cached == 0
+        gz = bundle.with_name("likec4_views_a.js.gz").read_bytes()
+        assert gzip.decompress(gz) == b"changed"
+
+
+class TestCompressAssets:
+    """Tests for compressing several assets."""
+
+    def test_results_in_input_order(self, tmp_path):
+        paths = []
+        for name in ("b.js", "a.js", "c.js"):
+            path = tmp_path / name
+            path.write_text(name)
+            paths.append(path)
+
+        results = compress_assets(paths, ["gzip"], max_workers=3)
+
+        assert [r.path for r in results] == paths
+        assert all((tmp_path / f"{p.name}.gz").is_file() for p in paths)
+
+    def test_nothing_to_do(self, bundle):
+        assert compress_assets([bundle], []) == []
+        assert compress_assets([], ["gzip"]) == []
+
+
+class TestAvailableEncodings:
+    def test_brotli_missing(self, caplog):
+        with patch("mkdocs_likec4.compress.brotli", None):
+            assert available_encodings(["gzip", "brotli"]) == ["gzip"]
+        assert "install the 'brotli' package" in caplog.text
+
+    def test_brotli_installed(self):
+        with patch("mkdocs_likec4.compress.brotli", MagicMock()):
+            assert available_encodings(["brotli"]) == ["brotli"]
+
+
+@pytest.mark.parametrize(
+    "size, expected",
+    [(512, "512 B"), (1536, "1.5 kB"), (2_500_000, "2.5 MB")],
+)
+def test_format_size(size, expected):
+    assert format_size(size) == expected
@@ -0,0 +1,188 @@
+import json
+import os
+from unittest.mock import patch
+
+import pathspec
+import pytest
+
+from mkdocs_likec4 import discovery
+from mkdocs_likec4.discovery import ProjectDiscovery
+
+
+@pytest.fixture
+def docs_dir(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    return docs
+
+
+def add_project(docs_dir, rel, name):
+    project_dir = docs_dir / rel
+    project_dir.mkdir(parents=True, exist_ok=True)
+    (project_dir / "likec4.config.json").write_text(json.dumps({"name": name}))
+    return project_dir
+
+
+class TestDiscover:
+    """Tests for finding projects below the docs directory."""
+
+    def test_sorted_posix_paths(self, docs_dir):
+        add_project(docs_dir, "b", "b")
+        add_project(docs_dir, "a/nested", "nested")
+        add_project(docs_dir, ".", "root")
+
+        projects = ProjectDiscovery().discover(docs_dir)
+
+        assert projects == [("root", "."), ("nested", "a/nested"), ("b", "b")]
+
+    def test_exclude_prunes_directories(self, docs_dir):
+        add_project(docs_dir, "docs", "kept")
+        add_project(docs_dir, "node_modules/pkg", "dependency")
+        add_project(docs_dir, ".hidden", "hidden")
+
+        with patch.object(discovery.os, "scandir", wraps=os.scandir) as scandir:
+            projects = ProjectDiscovery().discover(
+                docs_dir, exclude=["node_modules/", ".*/"]
+            )
+
+        assert projects == [("kept", "docs")]
+        listed = {c.args[0] for c in scandir.call_args_list}
+        assert listed == {docs_dir, docs_dir / "docs"}
+
+    def test_include_selects_configs(self, docs_dir):
+        add_project(docs_dir, "architecture/shop", "shop")
+        add_project(docs_dir, "examples/demo", "demo")
+
+        projects = ProjectDiscovery().discover(docs_dir, include=["architecture/**"])
+
+        assert projects == [("shop", "architecture/shop")]
+
+    def test_exclude_docs(self, docs_dir):
+        add_project(docs_dir, "drafts/wip", "wip")
+        add_project(docs_dir, "shop", "shop")
+        exclude_docs = pathspec.GitIgnoreSpec.from_lines(["drafts/"])
+
+        projects = ProjectDiscovery().discover(docs_dir, exclude_docs=exclude_docs)
+
+        assert projects == [("shop", "shop")]
+
+    def test_config_without_name_skipped(self, docs_dir):
+        (docs_dir / "likec4.config.json").write_text("{}")
+
+        assert ProjectDiscovery().discover(docs_dir) == []
+
+    def test_invalid_config_skipped(self, docs_dir):
+        (docs_dir / "likec4.config.json").write_text("{invalid")
+
+        assert ProjectDiscovery().discover(docs_dir) == []
+
+    def test_symlink_loop(self, docs_dir):
+        add_project(docs_dir, "shop", "shop")
+        (docs_dir / "shop" / "loop").symlink_to(docs_dir, target_is_directory=True)
+
+        assert ProjectDiscovery().discover(docs_dir) == [("shop", "shop")]
+
+
+class TestIndex:
+    """Tests for reusing directory listings and project names."""
+
+    def test_unchanged_tree_not_listed_again(self, docs_dir):
+        add_project(docs_dir, "a/b/c", "c")
+        finder = ProjectDiscovery()
+        finder.discover(docs_dir)
+
+        with (
+            patch.object(discovery.os, "scandir", wraps=os.scandir) as scandir,
+            patch.object(discovery.pyjson5, "load") as load,
+        ):
+            projects = finder.discover(docs_dir)
+
+        assert projects == [("c", "a/b/c")]
+        scandir.assert_not_called()
+        load.assert_not_called()
+
+    def test_new_directory_listed(self, docs_dir):
+        add_project(docs_dir, "a", "a")
+        finder = ProjectDiscovery()
+        finder.discover(docs_dir)
+        os.utime(docs_dir, ns=(0, 0))
+
+        add_project(docs_dir, "b", "b")
+
+        assert finder.discover(docs_dir) == [("a", "a"), ("b", "b")]
+
+    def test_changed_config_parsed_again(self, docs_dir):
+        project_dir = add_project(docs_dir, "a", "old")
+        finder = ProjectDiscovery()
+        finder.discover(docs_dir)
+
+        config = project_dir / "likec4.config.json"
+        config.write_text(json.dumps({"name": "renamed"}))
+        st = config.stat()
+        os.utime(config, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+        assert finder.discover(docs_dir) == [("renamed", "a")]
+
+    def test_removed_directory_forgotten(self, docs_dir):
+        project_dir = add_project(docs_dir, "a", "a")
+        finder = ProjectDiscovery()
+        finder.discover(docs_dir)
+
+        (project_dir / "likec4.config.json").unlink()
+        project_dir.rmdir()
+
+        assert finder.discover(docs_dir) == []
+        assert set(finder._dirs) == {"."}
+        assert finder._configs == {}
+
+    def test_other_docs_dir_not_reused(self, tmp_path):
+        first = tmp_path / "first"
+        second = tmp_path / "second"
+        add_project(first, "a", "first")
+        add_project(second, "a", "second")
+        finder = ProjectDiscovery()
+
+        assert finder.discover(first) == [("first", "a")]
+        assert finder.discover(second) == [("second", "a")]
+
+    def test_persisted(self, docs_dir, tmp_path):
+        add_project(docs_dir, "a", "a")
+        index_file = tmp_path / "cache" / "discovery.json"
+        first = ProjectDiscovery(index_file)
+        first.discover(docs_dir)
+        first.save()
+
+        second = ProjectDiscovery(index_file)
+        with (
+            patch.object(discovery.os, "scandir", wraps=os.scandir) as scandir,
+            patch.object(discovery.pyjson5, "load") as load,
+        ):
+            projects = second.discover(docs_dir)
+
+        assert projects == [("a", "a")]
+        scandir.assert_not_called()
+        load.assert_not_called()
+
+    def test_save_skipped_when_unchanged(self, docs_dir, tmp_path):
+        add_project(docs_dir, "a", "a")
+        index_file = tmp_path / "discovery.json"
+        finder = ProjectDiscovery(index_file)
+        finder.discover(docs_dir)
+        finder.save()
+        os.utime(index_file, ns=(0, 0))
+
+        finder.discover(docs_dir)
+        finder.save()
+
+        assert index_file.stat().st_mtime_ns == 0
+
+    def test_corrupt_index_ignored(self, docs_dir, tmp_path):
+        add_project(docs_dir, "a", "a")
+        index_file = tmp_path / "discovery.json"
+        index_file.write_text("not json")
+
+        finder = ProjectDiscovery(index_file)
+
+        assert finder.discover(docs_dir) == [("a", "a")]
+        finder.save()
+        assert json.loads(index_file.read_text())["version"] == discovery.INDEX_VERSION
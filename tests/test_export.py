@@ -0,0 +1,153 @@
+import struct
+import subprocess
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from mkdocs_likec4.cache import BundleCache
+from mkdocs_likec4.cli import Likec4Cli
+from mkdocs_likec4.export import PNG_SIGNATURE, ViewExporter, png_size
+
+
+def make_png(path: Path, width: int, height: int) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(
+        PNG_SIGNATURE
+        + struct.pack(">I", 13)
+        + b"IHDR"
+        + struct.pack(">II", width, height)
+        + b"\x08\x06\x00\x00\x00"
+    )
+    return path
+
+
+def fake_export(*views):
+    """Return a subprocess.run replacement that writes one image per view."""
+
+    def run(cmd, **kwargs):
+        out_dir = Path(cmd[cmd.index("-o") + 1])
+        for i, view in enumerate(views):
+            make_png(out_dir / "nested" / f"{view}.png", 100 + i, 50)
+        return subprocess.CompletedProcess(cmd, 0, "", "")
+
+    return run
+
+
+@pytest.fixture
+def docs(tmp_path):
+    project = tmp_path / "docs" / "proj"
+    project.mkdir(parents=True)
+    (project / "model.c4").write_text("model {}")
+    return tmp_path / "docs"
+
+
+@pytest.fixture
+def cli():
+    with patch.object(Likec4Cli, "version", "1.0.0"):
+        yield Likec4Cli(["likec4"])
+
+
+class TestPngSize:
+    """Tests for reading PNG dimensions."""
+
+    def test_reads_header(self, tmp_path):
+        assert png_size(make_png(tmp_path / "a.png", 640, 480)) == (640, 480)
+
+    def test_not_a_png(self, tmp_path):
+        path = tmp_path / "a.png"
+        path.write_bytes(b"GIF89a" + b"\0" * 30)
+
+        assert png_size(path) is None
+
+
+class TestViewExporter:
+    """Tests for exporting view images."""
+
+    def test_image_path(self):
+        assert (
+            ViewExporter.get_image_path("Proj", "index")
+            == "assets/mkdocs_likec4/views/proj/index.png"
+        )
+        assert (
+            ViewExporter.get_image_path(None, "index")
+            == "assets/mkdocs_likec4/views/_default/index.png"
+        )
+
+    @patch("mkdocs_likec4.export.subprocess.run")
+    def test_exports_project_once(self, mock_run, docs, cli):
+        mock_run.side_effect = fake_export("index", "other")
+        exporter = ViewExporter(str(docs), cli)
+
+        _, width, height = exporter.image("proj", "proj", "index")
+        assert exporter.image("proj", "proj", "other")[1:] == (101, 50)
+        assert exporter.image("proj", "proj", "missing") is None
+
+        assert (width, height) == (100, 50)
+        mock_run.assert_called_once()
+        assert mock_run.call_args[0][0][:4] == [
+            "likec4",
+            "export",
+            "png",
+            str(docs / "proj"),
+        ]
+        exporter.close()
+
+    @patch("mkdocs_likec4.export.subprocess.run")
+    def test_copy_into_site(self, mock_run, docs, cli, tmp_path):
+        mock_run.side_effect = fake_export("index")
+        exporter = ViewExporter(str(docs), cli)
+        exporter.image("proj", "proj", "index")
+
+        exporter.copy("proj", "index", tmp_path / "site")
+
+        assert png_size(tmp_path / "site" / "assets/mkdocs_likec4/views/proj/index.png")
+        exporter.close()
+
+    @patch("mkdocs_likec4.export.subprocess.run")
+    def test_failure_logged_once(self, mock_run, docs, cli, caplog):
+        mock_run.side_effect = subprocess.CalledProcessError(1, "likec4", stderr="boom")
+        exporter = ViewExporter(str(docs), cli)
+
+        assert exporter.image("proj", "proj", "index") is None
+        assert exporter.image("proj", "proj", "other") is None
+
+        mock_run.assert_called_once()
+        assert "boom" in caplog.text
+        exporter.close()
+
+    @patch("mkdocs_likec4.export.subprocess.run")
+    def test_cached_across_builds(self, mock_run, docs, cli, tmp_path):
+        mock_run.side_effect = fake_export("index")
+        cache = BundleCache(tmp_path / "cache", 10 * 1024 * 1024)
+
+        first = ViewExporter(str(docs), cli, cache)
+        first.image("proj", "proj", "index")
+        first.close()
+        second = ViewExporter(str(docs), cli, cache)
+
+        assert second.image("proj", "proj", "index")[1:] == (100, 50)
+        mock_run.assert_called_once()
+        second.close()
+
+    @patch("mkdocs_likec4.export.subprocess.run")
+    def test_start_exports_in_background(self, mock_run, docs, cli):
+        started = threading.Event()
+        release = threading.Event()
+
+        def run(cmd, **kwargs):
+            started.set()
+            release.wait(5)
+            return fake_export("index")(cmd, **kwargs)
+
+        mock_run.side_effect = run
+        exporter = ViewExporter(str(docs), cli)
+
+        exporter.start("proj", "proj")
+        assert started.wait(5)
+        release.set()
+
+        assert exporter.image("proj", "proj", "index")[1:] == (100, 50)
+        mock_run.assert_called_once()
+        exporter.close()
@@ -1,9 +1,26 @@
 """Tests for the LikeC4 generator module."""
 
 import subprocess
-from unittest.mock import patch
+from pathlib import Path
+from unittest.mock import MagicMock, patch
 
+import pytest
+
+from mkdocs_likec4.cache import BundleCache
+from mkdocs_likec4.cli import Likec4Cli
 from mkdocs_likec4.generator import WebComponentGenerator
+from mkdocs_likec4.profiling import ProcessUsage
+
+LIKEC4 = "/opt/likec4/node_modules/.bin/likec4"
+
+
+@pytest.fixture(autouse=True)
+def resolved_cli():
+    """Resolve likec4 to a fixed executable, independent of the test machine."""
+    with patch(
+        "mkdocs_likec4.generator.Likec4Cli.resolve", return_value=Likec4Cli([LIKEC4])
+    ) as mock_resolve:
+        yield mock_resolve
 
 
 class TestGetScriptPath:
@@ -33,9 +50,8 @@ class TestGetScriptPath:
 class TestGenerate:
     """Tests for the generate method."""
 
-    @patch("mkdocs_likec4.generator.subprocess.run")
-    @patch("mkdocs_likec4.generator.shutil.which")
-    def test_generate_default_project(self, mock_which, mock_run, tmp_path):
+    @patch("mkdocs_likec4.generator.run_measured")
+    def test_generate_default_project(self, mock_run, resolved_cli, tmp_path):
         """Test generating web component for default project."""
         site_dir = tmp_path / "site"
         site_dir.mkdir()
@@ -47,20 +63,19 @@ class TestGenerate:
             site_dir=site_dir,
         )
 
-        mock_which.assert_called_once_with("npx")
+        resolved_cli.assert_called_once_with()
         mock_run.assert_called_once()
         call_args = mock_run.call_args[0][0]
         call_kwargs = mock_run.call_args[1]
-        assert call_args[0] == mock_which.return_value
-        assert call_args[1] == "likec4"
-        assert call_args[2] == "codegen"
-        assert call_args[3] == "webcomponent"
+        assert call_args[0] == LIKEC4
+        assert call_args[1] == "codegen"
+        assert call_args[2] == "webcomponent"
         assert "/docs" in call_args
         assert "--webcomponent-prefix" not in call_args
         # Verify check=True is passed for proper error handling
         assert call_kwargs.get("check") is True
 
-    @patch("mkdocs_likec4.generator.subprocess.run")
+    @patch("mkdocs_likec4.generator.run_measured")
     def test_generate_named_project(self, mock_run, tmp_path):
         """Test generating web component for named project."""
         site_dir = tmp_path / "site"
@@ -79,7 +94,7 @@ class TestGenerate:
         prefix_idx = call_args.index("--webcomponent-prefix")
         assert call_args[prefix_idx + 1] == "myproject"
 
-    @patch("mkdocs_likec4.generator.subprocess.run")
+    @patch("mkdocs_likec4.generator.run_measured")
     def test_generate_creates_assets_dir(self, mock_run, tmp_path):
         """Test that generate creates the assets directory."""
         site_dir = tmp_path / "site"
@@ -95,7 +110,7 @@ class TestGenerate:
         assets_dir = site_dir / "assets" / "mkdocs_likec4"
         assert assets_dir.exists()
 
-    @patch("mkdocs_likec4.generator.subprocess.run")
+    @patch("mkdocs_likec4.generator.run_measured")
     def test_generate_invalid_project_name_skipped(self, mock_run, tmp_path):
         """Test that invalid project names are skipped."""
         site_dir = tmp_path / "site"
@@ -110,7 +125,7 @@ class TestGenerate:
 
         mock_run.assert_not_called()
 
-    @patch("mkdocs_likec4.generator.subprocess.run")
+    @patch("mkdocs_likec4.generator.run_measured")
     def test_generate_handles_subprocess_error(self, mock_run, tmp_path):
         """Test that subprocess errors are handled gracefully."""
         site_dir = tmp_path / "site"
@@ -125,7 +140,7 @@ class TestGenerate:
             site_dir=site_dir,
         )
 
-    @patch("mkdocs_likec4.generator.subprocess.run")
+    @patch("mkdocs_likec4.generator.run_measured")
     def test_generate_handles_file_not_found(self, mock_run, tmp_path):
         """Test that FileNotFoundError is handled gracefully."""
         site_dir = tmp_path / "site"
@@ -140,7 +155,7 @@ class TestGenerate:
             site_dir=site_dir,
         )
 
-    @patch("mkdocs_likec4.generator.subprocess.run")
+    @patch("mkdocs_likec4.generator.run_measured")
     def test_generate_output_path(self, mock_run, tmp_path):
         """Test that output path is correct."""
         site_dir = tmp_path / "site"
@@ -158,7 +173,7 @@ class TestGenerate:
         output_path = call_args[output_idx + 1]
         assert "likec4_views_proj.js" in output_path
 
-    @patch("mkdocs_likec4.generator.subprocess.run")
+    @patch("mkdocs_likec4.generator.run_measured")
     def test_generate_use_dot_false_by_default(self, mock_run, tmp_path):
         """Test that --no-use-dot flag is added by default (use_dot=False)."""
         site_dir = tmp_path / "site"
@@ -174,7 +189,7 @@ class TestGenerate:
         call_args = mock_run.call_args[0][0]
         assert "--no-use-dot" in call_args
 
-    @patch("mkdocs_likec4.generator.subprocess.run")
+    @patch("mkdocs_likec4.generator.run_measured")
     def test_generate_use_dot_true(self, mock_run, tmp_path):
         """Test that --no-use-dot flag is omitted when use_dot=True."""
         site_dir = tmp_path / "site"
@@ -190,3 +205,231 @@ class TestGenerate:
 
         call_args = mock_run.call_args[0][0]
         assert "--no-use-dot" not in call_args
+
+
+def fake_codegen(cmd, **kwargs):
+    """Stand-in for run_measured that writes a bundle to the -o path."""
+    Path(cmd[-1]).write_text("bundle")
+    return subprocess.CompletedProcess(cmd, 0, "", "")
+
+
+class TestGenerateWithCache:
+    """Tests for generate with a bundle cache."""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        return BundleCache(tmp_path / "cache", 1024 * 1024)
+
+    @pytest.fixture
+    def docs(self, tmp_path):
+        docs = tmp_path / "docs"
+        (docs / "proj").mkdir(parents=True)
+        (docs / "proj" / "model.c4").write_text("model { }")
+        return docs
+
+    @pytest.fixture
+    def cli(self):
+        cli = Likec4Cli([LIKEC4])
+        with patch.object(Likec4Cli, "version", "1.0.0"):
+            yield cli
+
+    @patch("mkdocs_likec4.generator.run_measured")
+    def test_miss_runs_codegen_and_stores(self, mock_run, cli, cache, docs, tmp_path):
+        """Test that a cache miss runs the CLI and stores its output."""
+        site_dir = tmp_path / "site"
+        mock_run.side_effect = fake_codegen
+
+        WebComponentGenerator.generate(
+            "proj", "proj", str(docs), site_dir, cache=cache, cli=cli
+        )
+
+        mock_run.assert_called_once()
+        assert list((tmp_path / "cache" / "bundles").glob("*.js"))
+
+    @patch("mkdocs_likec4.generator.run_measured")
+    def test_hit_skips_codegen(self, mock_run, cli, cache, docs, tmp_path):
+        """Test that a cache hit copies the bundle without running the CLI."""
+        mock_run.side_effect = fake_codegen
+        WebComponentGenerator.generate(
+            "proj", "proj", str(docs), tmp_path / "site1", cache=cache, cli=cli
+        )
+        mock_run.reset_mock()
+
+        site_dir = tmp_path / "site2"
+        WebComponentGenerator.generate(
+            "proj", "proj", str(docs), site_dir, cache=cache, cli=cli
+        )
+
+        mock_run.assert_not_called()
+        dest = site_dir / WebComponentGenerator.get_script_path("proj")
+        assert dest.read_text() == "bundle"
+
+    @patch("mkdocs_likec4.generator.run_measured")
+    def test_failed_codegen_not_cached(self, mock_run, cli, cache, docs, tmp_path):
+        """Test that failed generations are not stored in the cache."""
+        mock_run.side_effect = subprocess.CalledProcessError(1, "cmd")
+
+        WebComponentGenerator.generate(
+            "proj", "proj", str(docs), tmp_path / "site", cache=cache, cli=cli
+        )
+
+        assert not (tmp_path / "cache" / "bundles").exists()
+
+    @patch("mkdocs_likec4.generator.run_measured")
+    def test_unknown_version_bypasses_cache(self, mock_run, cache, docs, tmp_path):
+        """Test that the cache is skipped when the likec4 version is unknown."""
+        with patch.object(Likec4Cli, "version", None):
+            WebComponentGenerator.generate(
+                "proj", "proj", str(docs), tmp_path / "site", cache=cache
+            )
+
+        mock_run.assert_called_once()
+        assert not (tmp_path / "cache" / "bundles").exists()
+
+
+class TestGenerationResult:
+    """Tests for the result returned by generate."""
+
+    @patch("mkdocs_likec4.generator.run_measured")
+    def test_success(self, mock_run, tmp_path):
+        """Test that a successful run is reported as ok."""
+        result = WebComponentGenerator.generate("proj", "proj", "/docs", tmp_path)
+
+        assert result.ok is True
+        assert result.cached is False
+        assert result.error is None
+        assert result.project == "proj"
+
+    @patch("mkdocs_likec4.generator.run_measured")
+    def test_invalid_project_name_reports_error(self, mock_run, tmp_path):
+        """Test that an invalid project name is reported instead of logged."""
+        result = WebComponentGenerator.generate("1bad", None, "/docs", tmp_path)
+
+        assert result.ok is False
+        assert "Invalid project name '1bad'" in result.error
+
+    @patch("mkdocs_likec4.generator.run_measured")
+    def test_subprocess_error_includes_stderr(self, mock_run, tmp_path):
+        """Test that the CLI's stderr is part of the reported error."""
+        mock_run.side_effect = subprocess.CalledProcessError(
+            1, "cmd", stderr="Error: Specify exact project\n"
+        )
+
+        result = WebComponentGenerator.generate(None, None, "/docs", tmp_path)
+
+        assert result.ok is False
+        assert "Specify exact project" in result.error
+
+    @patch("mkdocs_likec4.generator.run_measured")
+    def test_missing_cli_does_not_run(self, mock_run, resolved_cli, tmp_path):
+        """Test that codegen is not attempted without a likec4 executable."""
+        resolved_cli.return_value = None
+        result = WebComponentGenerator.generate(None, None, "/docs", tmp_path)
+
+        mock_run.assert_not_called()
+        assert "not found" in result.error
+
+    @patch("mkdocs_likec4.generator.run_measured")
+    def test_output_is_captured(self, mock_run, tmp_path):
+        """Test that CLI output is captured so parallel runs do not interleave."""
+        WebComponentGenerator.generate(None, None, "/docs", tmp_path)
+
+        assert mock_run.call_args.kwargs["capture_output"] is True
+
+    @patch("mkdocs_likec4.generator.run_measured")
+    def test_node_memory_sets_heap_limit(self, mock_run, tmp_path):
+        """Test that node_memory is passed to Node.js via NODE_OPTIONS."""
+        WebComponentGenerator.generate(None, None, "/docs", tmp_path, node_memory=768)
+
+        env = mock_run.call_args.kwargs["env"]
+        assert "--max-old-space-size=768" in env["NODE_OPTIONS"]
+
+    @patch("mkdocs_likec4.generator.run_measured")
+    def test_no_env_override_by_default(self, mock_run, tmp_path):
+        """Test that the environment is inherited unchanged by default."""
+        WebComponentGenerator.generate(None, None, "/docs", tmp_path)
+
+        assert mock_run.call_args.kwargs["env"] is None
+
+    @patch("mkdocs_likec4.generator.run_measured")
+    def test_process_usage_is_recorded(self, mock_run, tmp_path):
+        """Test that the CPU time and peak RSS of the CLI end up in the result."""
+        proc = subprocess.CompletedProcess([], 0, "", "")
+        proc.usage = ProcessUsage(2.5, 300 * 2**20)
+        mock_run.return_value = proc
+
+        result = WebComponentGenerator.generate(None, None, "/docs", tmp_path)
+
+        assert result.cpu_time == 2.5
+        assert result.max_rss == 300 * 2**20
+
+    @patch("mkdocs_likec4.generator.run_measured")
+    def test_codegen_is_traced(self, mock_run, tmp_path):
+        """Test that the likec4 process is recorded as a span."""
+        tracer = MagicMock()
+
+        WebComponentGenerator.generate("proj", None, "/docs", tmp_path, tracer=tracer)
+
+        tracer.span.assert_called_once_with(
+            "codegen", "codegen", project="project 'proj'"
+        )
+
+
+class TestGenerateTreeShaken:
+    """Tests for generating bundles with a subset of the views."""
+
+    @pytest.fixture
+    def docs(self, tmp_path):
+        project = tmp_path / "docs" / "proj"
+        project.mkdir(parents=True)
+        (project / "views.c4").write_text(
+            "views {\n  view index {\n  }\n  view other {\n  }\n}\n"
+        )
+        return tmp_path / "docs"
+
+    @patch("mkdocs_likec4.generator.run_measured")
+    def test_codegen_runs_on_filtered_copy(self, mock_run, docs, tmp_path):
+        """Test that likec4 sees only the referenced views."""
+        seen = {}
+
+        def run(cmd, **kwargs):
+            workspace = Path(cmd[-3])
+            seen["workspace"] = workspace
+            seen["source"] = (workspace / "views.c4").read_text()
+            return subprocess.CompletedProcess(cmd, 0, "", "")
+
+        mock_run.side_effect = run
+
+        result = WebComponentGenerator.generate(
+            "proj", "proj", str(docs), tmp_path / "site", views=frozenset({"index"})
+        )
+
+        assert result.ok
+        assert seen["workspace"] != docs / "proj"
+        assert "view index" in seen["source"]
+        assert "view other" not in seen["source"]
+        assert not seen["workspace"].exists()
+
+    @patch("mkdocs_likec4.generator.run_measured")
+    def test_views_are_part_of_cache_key(self, mock_run, docs, tmp_path):
+        """Test that bundles with different view sets are cached separately."""
+        cache = BundleCache(tmp_path / "cache", 10 * 1024 * 1024)
+        (tmp_path / "site").mkdir()
+
+        def run(cmd, **kwargs):
+            Path(cmd[-1]).write_text("bundle")
+            return subprocess.CompletedProcess(cmd, 0, "", "")
+
+        mock_run.side_effect = run
+        with patch.object(Likec4Cli, "version", "1.0.0"):
+            for views in ({"index"}, {"index", "other"}, {"index"}):
+                WebComponentGenerator.generate(
+                    "proj",
+                    "proj",
+                    str(docs),
+                    tmp_path / "site",
+                    cache=cache,
+                    views=frozenset(views),
+                )
+
+        assert mock_run.call_count == 2
@@ -0,0 +1,84 @@
+import hashlib
+import json
+
+import pytest
+
+from mkdocs_likec4.hashing import AssetManifest
+
+SCRIPT = "assets/mkdocs_likec4/likec4_views_a.js"
+
+
+@pytest.fixture
+def site(tmp_path):
+    bundle = tmp_path / SCRIPT
+    bundle.parent.mkdir(parents=True)
+    bundle.write_text("bundle a")
+    return tmp_path
+
+
+def hashed_name(content: str) -> str:
+    digest = hashlib.sha256(content.encode()).hexdigest()[:12]
+    return f"likec4_views_a.{digest}.js"
+
+
+class TestAssetManifest:
+    """Tests for content-hashed bundle names."""
+
+    def test_add_renames_file(self, site):
+        assets = AssetManifest()
+
+        assets.add(site, SCRIPT)
+
+        hashed = f"assets/mkdocs_likec4/{hashed_name('bundle a')}"
+        assert assets.resolve(SCRIPT) == hashed
+        assert (site / hashed).read_text() == "bundle a"
+        assert not (site / SCRIPT).exists()
+
+    def test_resolve_unknown_path(self):
+        assert AssetManifest().resolve(SCRIPT) == SCRIPT
+
+    def test_missing_file_is_skipped(self, tmp_path, caplog):
+        assets = AssetManifest()
+
+        assets.add(tmp_path, SCRIPT)
+
+        assert assets.paths == {}
+        assert "Failed to hash" in caplog.text
+
+    def test_rewrite_references(self, site):
+        assets = AssetManifest()
+        assets.add(site, SCRIPT)
+        name = hashed_name("bundle a")
+
+        html = (
+            '<script src="../assets/mkdocs_likec4/likec4_views_a.js" defer></script>'
+            '<div data-likec4-bundles="likec4_views_a.js likec4_views_b.js"></div>'
+            '<link rel="preload" href="likec4_views_a.js" as="script">'
+            '<div data-likec4-lazy="../likec4_views_a.js" title="likec4_views_a.js">'
+            "<p>xlikec4_views_a.js likec4_views_a.json</p>"
+        )
+
+        assert assets.rewrite(html) == (
+            f'<script src="../assets/mkdocs_likec4/{name}" defer></script>'
+            f'<div data-likec4-bundles="{name} likec4_views_b.js"></div>'
+            f'<link rel="preload" href="{name}" as="script">'
+            f'<div data-likec4-lazy="../{name}" title="likec4_views_a.js">'
+            "<p>xlikec4_views_a.js likec4_views_a.json</p>"
+        )
+
+    def test_rewrite_leaves_text_alone(self, site):
+        assets = AssetManifest()
+        assets.add(site, SCRIPT)
+
+        html = "<p>The file likec4_views_a.js is mentioned here.</p>"
+
+        assert assets.rewrite(html) == html
+
+    def test_write_manifest(self, site):
+        assets = AssetManifest()
+        assets.add(site, SCRIPT)
+
+        assets.write(site)
+
+        manifest = json.loads((site / "assets/mkdocs_likec4/manifest.json").read_text())
+        assert manifest == {SCRIPT: f"assets/mkdocs_likec4/{hashed_name('bundle a')}"}
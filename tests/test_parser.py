@@ -1,6 +1,6 @@
 """Tests for the LikeC4 parser module."""
 
-from mkdocs_likec4.parser import LikeC4Parser, ViewOptions
+from mkdocs_likec4.parser import LikeC4Parser, Placeholder, ViewOptions
 
 
 class TestViewOptions:
@@ -128,6 +128,114 @@ line2
         assert match is None
 
 
+class TestScan:
+    """Tests for the single-pass block scanner."""
+
+    def test_matches_pattern(self):
+        """Test that scan finds the same blocks as PATTERN."""
+        markdown = """# Title
+
+```likec4-view browser=false project=proj
+view1
+```
+
+- Item:
+    ```likec4-view
+    view2
+    ```
+
+```python
+print("likec4-view")
+```
+"""
+        blocks = [(b.indent, b.options, b.view_id) for b in LikeC4Parser.scan(markdown)]
+        matches = [m.groups() for m in LikeC4Parser.PATTERN.finditer(markdown)]
+        assert blocks == matches
+        assert len(blocks) == 2
+
+    def test_block_offsets(self):
+        """Test that a block spans from the start of its line to the closing fence."""
+        markdown = "Intro\n\n  ```likec4-view\n  view\n  ```\nOutro"
+        [block] = LikeC4Parser.scan(markdown)
+        assert markdown[block.start : block.end] == "  ```likec4-view\n  view\n  ```"
+
+    def test_tilde_fence(self):
+        """Test that blocks fenced with tildes are found."""
+        markdown = "~~~likec4-view project=proj\nview\n~~~"
+        [block] = LikeC4Parser.scan(markdown)
+        assert block.options == " project=proj"
+        assert block.view_id == "view"
+
+    def test_mismatched_fences(self):
+        """Test that a block must be closed by the fence that opened it."""
+        assert not list(LikeC4Parser.scan("```likec4-view\nview\n~~~"))
+        assert not list(LikeC4Parser.scan("~~~likec4-view\nview\n```"))
+
+    def test_admonition_and_tabs(self):
+        """Test blocks indented inside admonitions and content tabs."""
+        markdown = """!!! note
+    ```likec4-view
+    view1
+    ```
+
+=== "Tab"
+
+    ~~~likec4-view
+    view2
+    ~~~
+"""
+        blocks = list(LikeC4Parser.scan(markdown))
+        assert [(b.indent, b.view_id.strip()) for b in blocks] == [
+            ("    ", "view1"),
+            ("    ", "view2"),
+        ]
+
+    def test_closing_fence_needs_same_indent(self):
+        """Test that the closing fence must be indented like the opening one."""
+        assert not list(LikeC4Parser.scan("    ```likec4-view\n    view\n```"))
+
+    def test_crlf_line_endings(self):
+        """Test that Windows line endings are handled."""
+        [block] = LikeC4Parser.scan("```likec4-view browser=false\r\nview\r\n```")
+        assert block.options == " browser=false"
+        assert block.view_id == "view"
+
+    def test_other_info_strings_are_ignored(self):
+        """Test that only the likec4-view info string starts a block."""
+        assert not list(LikeC4Parser.scan("```likec4-viewer\nview\n```"))
+        assert not list(LikeC4Parser.scan("Text ```likec4-view\nview\n```"))
+        assert not list(LikeC4Parser.scan("````likec4-view\nview\n````"))
+
+    def test_missing_closing_fence(self):
+        """Test that an unclosed block does not swallow the rest of the page."""
+        markdown = "```likec4-view\nview\n\n## More\n\n```python\ncode\n```"
+        assert not list(LikeC4Parser.scan(markdown))
+
+    def test_empty_view_id(self):
+        """Test that a block needs a view ID."""
+        assert not list(LikeC4Parser.scan("```likec4-view\n\n```"))
+
+    def test_unterminated_page(self):
+        """Test that a block cut off at the end of the page is ignored."""
+        assert not list(LikeC4Parser.scan("```likec4-view"))
+        assert not list(LikeC4Parser.scan("```likec4-view\nview"))
+
+
+class TestSub:
+    """Tests for replacing blocks."""
+
+    def test_replaces_blocks(self):
+        """Test that each block is replaced and the text around it is kept."""
+        markdown = "A\n```likec4-view\nv1\n```\nB\n~~~likec4-view\nv2\n~~~\nC"
+        result = LikeC4Parser.sub(lambda b: f"<{b.view_id}>", markdown)
+        assert result == "A\n<v1>\nB\n<v2>\nC"
+
+    def test_page_without_views_is_returned_unchanged(self):
+        """Test that pages without blocks are returned as they are."""
+        markdown = "# Title\n\n```python\ncode\n```\n"
+        assert LikeC4Parser.sub(lambda b: "x", markdown) is markdown
+
+
 class TestParseOptions:
     """Tests for the parse_options method."""
 
@@ -192,6 +300,25 @@ class TestParseOptions:
         opts = LikeC4Parser.parse_options("dynamic-variant=invalid", "view")
         assert opts.dynamic_variant == "diagram"  # default
 
+    def test_first_valid_occurrence_wins(self):
+        """Test that repeated options keep the first valid value."""
+        opts = LikeC4Parser.parse_options(
+            "browser=maybe browser=false browser=true project=a project=b", "view"
+        )
+        assert opts.browser == "false"
+        assert opts.project == "a"
+
+    def test_unknown_tokens_ignored(self):
+        """Test that unknown options and bare words are ignored."""
+        opts = LikeC4Parser.parse_options("title=Diagram linenums browser=", "view")
+        assert opts == ViewOptions(view_id="view")
+
+    def test_tabs_between_options(self):
+        """Test that options may be separated by any whitespace."""
+        opts = LikeC4Parser.parse_options("static=true\tloading=lazy", "view")
+        assert opts.static is True
+        assert opts.loading == "lazy"
+
     def test_color_scheme_default_is_auto(self):
         """color_scheme defaults to 'auto' when no option is given and no default override."""
         opts = LikeC4Parser.parse_options("", "view")
@@ -228,6 +355,19 @@ class TestParseOptions:
         )
         assert opts.color_scheme == "light"
 
+    def test_loading_lazy(self):
+        """Test parsing loading=lazy option."""
+        opts = LikeC4Parser.parse_options("loading=lazy", "view")
+        assert opts.loading == "lazy"
+
+    def test_loading_default_overridden(self):
+        """Test that loading=eager overrides a lazy default."""
+        assert LikeC4Parser.parse_options("", "v", default_loading="lazy").loading == (
+            "lazy"
+        )
+        opts = LikeC4Parser.parse_options("loading=eager", "v", default_loading="lazy")
+        assert opts.loading == "eager"
+
 
 class TestIsValidIdentifier:
     """Tests for the is_valid_identifier method."""
@@ -389,3 +529,58 @@ class TestToHtml:
         # Should escape angle brackets
         assert "<script>" not in html
         assert "&lt;" in html or "script" not in html
+
+    def test_html_with_bundle_url(self):
+        """Test that the bundle URL is added for the on-demand loader."""
+        opts = ViewOptions(view_id="v", project="proj", color_scheme="light")
+        html = LikeC4Parser.to_html(
+            opts, "../assets/mkdocs_likec4/likec4_views_proj.js"
+        )
+        assert (
+            html
+            == '<proj-view view-id="v" color-scheme="light" data-likec4-bundle="../assets/mkdocs_likec4/likec4_views_proj.js"></proj-view>'
+        )
+
+    def test_lazy_html_wrapped_in_template(self):
+        """Test that lazy views are only mounted by the loader."""
+        opts = ViewOptions(
+            view_id="v", project="proj", color_scheme="dark", loading="lazy"
+        )
+        html = LikeC4Parser.to_html(opts, "likec4_views_proj.js")
+        assert html == (
+            '<div class="likec4-lazy" data-likec4-lazy="likec4_views_proj.js" '
+            'style="min-height: 300px"><template>'
+            '<proj-view view-id="v" color-scheme="dark"></proj-view>'
+            "</template></div>"
+        )
+
+    def test_lazy_without_bundle_url_renders_element(self):
+        """Test that a lazy view without a bundle URL is rendered directly."""
+        opts = ViewOptions(view_id="v", color_scheme="dark", loading="lazy")
+        html = LikeC4Parser.to_html(opts)
+        assert html == '<likec4-view view-id="v" color-scheme="dark"></likec4-view>'
+
+    def test_html_with_placeholder(self):
+        """Test that the placeholder image is rendered inside the element."""
+        opts = ViewOptions(view_id="v", project="proj", color_scheme="light")
+        html = LikeC4Parser.to_html(opts, placeholder=Placeholder("v.png", 640, 480))
+        assert html == (
+            '<proj-view view-id="v" color-scheme="light">'
+            '<img class="likec4-placeholder" src="v.png" alt="v" width="640" '
+            'height="480" style="max-width: 100%; height: auto" loading="lazy">'
+            "</proj-view>"
+        )
+
+    def test_static_view_is_image_only(self):
+        """Test that static views are rendered without the web component."""
+        opts = ViewOptions(view_id="v", project="proj", static=True)
+        html = LikeC4Parser.to_html(opts, placeholder=Placeholder("v.png", 640, 480))
+        assert html.startswith('<img class="likec4-static" src="v.png"')
+        assert "proj-view" not in html
+
+    def test_lazy_placeholder_outside_template(self):
+        """Test that lazy views show their placeholder before mounting."""
+        opts = ViewOptions(view_id="v", loading="lazy")
+        html = LikeC4Parser.to_html(opts, "b.js", Placeholder("v.png", 640, 480))
+        assert "min-height" not in html
+        assert html.index("likec4-placeholder") < html.index("<template>")
@@ -0,0 +1,123 @@
+"""Tests for the LikeC4 pipeline module."""
+
+import threading
+from pathlib import Path
+
+import pytest
+
+from mkdocs_likec4.generator import GenerationResult, WebComponentGenerator
+from mkdocs_likec4.pipeline import CodegenPipeline
+
+
+class FakeJob:
+    """Records calls and writes a bundle like WebComponentGenerator.generate."""
+
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, project, site_dir: Path) -> GenerationResult:
+        self.calls.append((project, site_dir))
+        self.release.wait(timeout=5)
+        dest = site_dir / WebComponentGenerator.get_script_path(project)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        dest.write_text(f"bundle {project}")
+        return GenerationResult(project, ok=True)
+
+
+@pytest.fixture
+def job():
+    return FakeJob()
+
+
+class TestCodegenPipeline:
+    """Tests for background code generation."""
+
+    def test_started_project_is_copied_to_site(self, job, tmp_path):
+        """Test that an early job's bundle ends up in site_dir on join."""
+        pipeline = CodegenPipeline(job, 2)
+        pipeline.start("proj")
+
+        results = pipeline.join(["proj"], tmp_path / "site")
+
+        assert [r.project for r in results] == ["proj"]
+        bundle = tmp_path / "site" / WebComponentGenerator.get_script_path("proj")
+        assert bundle.read_text() == "bundle proj"
+        assert job.calls[0][1] != tmp_path / "site"
+
+    def test_start_is_idempotent(self, job, tmp_path):
+        """Test that a project is generated at most once."""
+        pipeline = CodegenPipeline(job, 2)
+        pipeline.start("proj")
+        pipeline.start("proj")
+
+        pipeline.join(["proj"], tmp_path / "site")
+
+        assert len(job.calls) == 1
+
+    def test_unstarted_project_generated_on_join(self, job, tmp_path):
+        """Test that referenced projects that were not started still get built."""
+        pipeline = CodegenPipeline(job, 2)
+
+        results = pipeline.join(["late"], tmp_path / "site")
+
+        assert results[0].ok
+        assert job.calls == [("late", tmp_path / "site")]
+
+    def test_results_follow_requested_order(self, job, tmp_path):
+        """Test that results are returned in the order of the given projects."""
+        pipeline = CodegenPipeline(job, 4)
+        for project in ("c", "a", "b"):
+            pipeline.start(project)
+
+        results = pipeline.join(["a", "b", "c"], tmp_path / "site")
+
+        assert [r.project for r in results] == ["a", "b", "c"]
+
+    def test_unreferenced_queued_job_is_cancelled(self, job, tmp_path):
+        """Test that queued jobs for unreferenced projects never run."""
+        job.release.clear()
+        pipeline = CodegenPipeline(job, 1)
+        pipeline.start("busy")
+        pipeline.start("unused")
+
+        # Unblock "busy" only after join has had a chance to cancel "unused"
+        threading.Timer(0.1, job.release.set).start()
+        pipeline.join(["busy"], tmp_path / "site")
+
+        assert [c[0] for c in job.calls] == ["busy"]
+
+    def test_unreferenced_bundle_not_copied(self, job, tmp_path):
+        """Test that finished speculative output is discarded."""
+        pipeline = CodegenPipeline(job, 2)
+        pipeline.start("used")
+        pipeline.start("unused")
+
+        pipeline.join(["used"], tmp_path / "site")
+
+        site_assets = tmp_path / "site" / WebComponentGenerator.ASSETS_DIR
+        assert [p.name for p in site_assets.iterdir()] == ["likec4_views_used.js"]
+
+    def test_failed_job_not_copied(self, tmp_path):
+        """Test that failed results are passed through without copying."""
+
+        def failing(project, site_dir):
+            return GenerationResult(project, error="boom")
+
+        pipeline = CodegenPipeline(failing, 1)
+        pipeline.start("proj")
+
+        results = pipeline.join(["proj"], tmp_path / "site")
+
+        assert results[0].error == "boom"
+        assert not (tmp_path / "site").exists()
+
+    def test_staging_directory_removed(self, job, tmp_path):
+        """Test that the staging directory is cleaned up after join."""
+        pipeline = CodegenPipeline(job, 2)
+        pipeline.start("proj")
+
+        pipeline.join(["proj"], tmp_path / "site")
+
+        assert not pipeline._staging.exists()
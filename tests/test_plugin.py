@@ -1,11 +1,19 @@
 """Tests for the LikeC4 plugin module."""
 
+import gzip
 import json
+import logging
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+import pathspec
 import pytest
 
+from mkdocs.exceptions import PluginError
+from mkdocs.structure.files import File, Files
+
+from mkdocs_likec4.generator import GenerationResult, WebComponentGenerator
+from mkdocs_likec4.parser import LikeC4Parser
 from mkdocs_likec4.plugin import LikeC4Plugin
 
 
@@ -13,7 +21,7 @@ from mkdocs_likec4.plugin import LikeC4Plugin
 def plugin():
     """Create a fresh plugin instance with default config."""
     p = LikeC4Plugin()
-    p.config = {"use_dot": False, "color_scheme": "auto"}
+    p.load_config({"cache": False})
     return p
 
 
@@ -25,6 +33,26 @@ def docs_dir(tmp_path):
     return docs
 
 
+@pytest.fixture
+def make_page():
+    """Build mock pages; the source path doubles as ``src_uri`` and ``src_path``."""
+
+    def make(src_uri: str = "index.md", url: str = "") -> MagicMock:
+        page = MagicMock()
+        page.file.src_uri = src_uri
+        page.file.src_path = src_uri
+        page.url = url
+        return page
+
+    return make
+
+
+@pytest.fixture
+def page(make_page):
+    """A mock page for ``index.md`` at the site root."""
+    return make_page()
+
+
 class TestPluginInit:
     """Tests for plugin initialization."""
 
@@ -158,6 +186,79 @@ class TestFindNearestProject:
 
         assert result is None
 
+    def test_innermost_project_wins(self, plugin, docs_dir):
+        """Test that nested projects take precedence over enclosing ones."""
+        plugin.project_map = {"outer": "a", "inner": str(Path("a/b/c"))}
+
+        assert plugin._find_nearest_project(docs_dir / "a/b/c/d/p.md", docs_dir) == (
+            "inner"
+        )
+        assert plugin._find_nearest_project(docs_dir / "a/b/p.md", docs_dir) == "outer"
+
+    def test_page_outside_docs_dir(self, plugin, docs_dir, tmp_path):
+        """Test that pages outside docs_dir have no project."""
+        plugin.project_map = {None: "."}
+
+        assert plugin._find_nearest_project(tmp_path / "page.md", docs_dir) is None
+
+    def test_result_is_memoized_per_directory(self, plugin, docs_dir):
+        """Test that the ancestors of a directory are looked up only once."""
+        plugin.project_map = {"myproject": "myproject"}
+        plugin._find_nearest_project(docs_dir / "myproject/sub/a.md", docs_dir)
+
+        plugin._project_dirs_index = {}
+        result = plugin._find_nearest_project(docs_dir / "myproject/sub/b.md", docs_dir)
+
+        assert result == "myproject"
+
+    def test_new_projects_reset_memo(self, plugin, docs_dir):
+        """Test that assigning project_map discards remembered results."""
+        plugin.project_map = {"myproject": "myproject"}
+        plugin._find_nearest_project(docs_dir / "other/page.md", docs_dir)
+
+        plugin.project_map = {"other": "other"}
+
+        assert plugin._find_nearest_project(docs_dir / "other/page.md", docs_dir) == (
+            "other"
+        )
+
+
+class TestOnFiles:
+    """Tests for resolving the projects of all pages in on_files."""
+
+    @pytest.fixture
+    def files(self):
+        return Files(
+            [
+                File(path, "/docs", "/site", use_directory_urls=True)
+                for path in ("index.md", "proj/index.md", "proj/sub/page.md", "a.css")
+            ]
+        )
+
+    def test_projects_of_all_pages(self, plugin, files):
+        plugin.project_map = {None: ".", "proj": "proj"}
+
+        assert plugin.on_files(files, config={}) is files
+        assert plugin.file_projects == {
+            "index.md": None,
+            "proj/index.md": "proj",
+            "proj/sub/page.md": "proj",
+        }
+
+    def test_page_markdown_uses_resolved_project(self, plugin, docs_dir, files):
+        plugin.on_config({"docs_dir": str(docs_dir)})
+        plugin.project_map = {"proj": "proj"}
+        plugin.on_files(files, config={})
+        page = MagicMock()
+        page.file.src_uri = "proj/sub/page.md"
+        page.file.src_path = "proj/sub/page.md"
+
+        with patch.object(plugin, "_find_nearest_project") as find:
+            result = plugin.on_page_markdown("```likec4-view\nview\n```", page)
+
+        find.assert_not_called()
+        assert '<proj-view view-id="view"' in result
+
 
 class TestOnConfig:
     """Tests for the on_config method."""
@@ -290,6 +391,62 @@ Some text."""
         # The HTML tag should be indented to match the code block
         assert '    <likec4-view view-id="my-view"' in result
 
+    def test_replaces_tilde_block_in_admonition(self, plugin, docs_dir):
+        """Test that tilde fences are replaced like backtick fences."""
+        plugin.docs_dir = docs_dir
+        plugin.project_map = {None: "."}
+
+        page = MagicMock()
+        page.file.src_uri = "index.md"
+        page.file.src_path = "index.md"
+
+        markdown = """!!! note
+    ~~~likec4-view browser=false
+    my-view
+    ~~~"""
+
+        result = plugin.on_page_markdown(markdown, page)
+
+        assert result == (
+            "!!! note\n"
+            '    <likec4-view view-id="my-view" browser="false" '
+            "data-likec4-auto-scheme></likec4-view>"
+        )
+
+    def test_views_rendered_once_per_build(self, plugin, docs_dir):
+        """Test that repeated views are parsed and rendered only once."""
+        plugin.on_config({"docs_dir": str(docs_dir)})
+        markdown = "```likec4-view\nmy-view\n```\n```likec4-view\nmy-view\n```"
+
+        with patch(
+            "mkdocs_likec4.plugin.LikeC4Parser.parse_options",
+            wraps=LikeC4Parser.parse_options,
+        ) as parse_options:
+            for name in ("a.md", "b.md"):
+                page = MagicMock()
+                page.file.src_uri = name
+                page.file.src_path = name
+                result = plugin.on_page_markdown(markdown, page)
+                assert result.count('<likec4-view view-id="my-view"') == 2
+
+        parse_options.assert_called_once()
+        assert plugin.page_projects == {"a.md": {None}, "b.md": {None}}
+
+    def test_rendered_views_reset_on_config(self, plugin, docs_dir):
+        """Test that a changed configuration is not served from the memo."""
+        page = MagicMock()
+        page.file.src_uri = "index.md"
+        page.file.src_path = "index.md"
+        markdown = "```likec4-view\nmy-view\n```"
+        plugin.on_config({"docs_dir": str(docs_dir)})
+        plugin.on_page_markdown(markdown, page)
+
+        plugin.config["color_scheme"] = "dark"
+        plugin.on_config({"docs_dir": str(docs_dir)})
+        result = plugin.on_page_markdown(markdown, page)
+
+        assert 'color-scheme="dark"' in result
+
 
 class TestOnPageContent:
     """Tests for the on_page_content method."""
@@ -535,3 +692,1058 @@ class TestColorScheme:
 
         copied = site_dir / "assets" / "mkdocs_likec4" / "theme_sync.js"
         assert not copied.exists()
+
+
+class TestCache:
+    """Tests for the bundle cache configuration."""
+
+    def test_on_config_creates_cache_relative_to_config_file(self, plugin, docs_dir):
+        plugin.config["cache"] = True
+        config_file = docs_dir.parent / "mkdocs.yml"
+
+        plugin.on_config(
+            {"docs_dir": str(docs_dir), "config_file_path": str(config_file)}
+        )
+
+        assert plugin.cache.cache_dir == docs_dir.parent / ".cache/plugin/likec4"
+        assert plugin.cache.max_size == 256 * 1024 * 1024
+
+    def test_on_config_cache_disabled(self, plugin, docs_dir):
+        plugin.on_config({"docs_dir": str(docs_dir)})
+
+        assert plugin.cache is None
+
+    @patch("mkdocs_likec4.plugin.WebComponentGenerator.generate")
+    def test_post_build_passes_cache(self, mock_generate, plugin, tmp_path):
+        plugin.docs_dir = tmp_path / "docs"
+        plugin.project_map = {"proj": "proj"}
+        plugin.page_projects = {"page.md": {"proj"}}
+        plugin.cache = MagicMock()
+
+        plugin.on_post_build({"site_dir": str(tmp_path / "site")})
+
+        assert mock_generate.call_args.kwargs["cache"] is plugin.cache
+        plugin.cache.save.assert_called_once()
+
+
+class TestParallelGeneration:
+    """Tests for concurrent code generation in on_post_build."""
+
+    @pytest.fixture
+    def multi_project_plugin(self, plugin, tmp_path):
+        plugin.docs_dir = tmp_path / "docs"
+        plugin.project_map = {name: name for name in ("c", "a", "b")}
+        plugin.page_projects = {"page.md": {"c", "a", "b"}}
+        return plugin
+
+    @patch("mkdocs_likec4.plugin.WebComponentGenerator.generate")
+    def test_results_logged_in_sorted_order(
+        self, mock_generate, multi_project_plugin, tmp_path, caplog
+    ):
+        mock_generate.side_effect = lambda project, *a, **kw: GenerationResult(
+            project, error=f"{project} failed"
+        )
+
+        with caplog.at_level(logging.ERROR):
+            multi_project_plugin.on_post_build({"site_dir": str(tmp_path / "site")})
+
+        errors = [r.getMessage() for r in caplog.records]
+        assert [e.split(": ")[-1] for e in errors] == [
+            "a failed",
+            "b failed",
+            "c failed",
+        ]
+
+    @patch("mkdocs_likec4.plugin.WebComponentGenerator.generate")
+    def test_passes_worker_memory(self, mock_generate, multi_project_plugin, tmp_path):
+        multi_project_plugin.config["worker_memory"] = 512
+
+        multi_project_plugin.on_post_build({"site_dir": str(tmp_path / "site")})
+
+        assert mock_generate.call_args.kwargs["node_memory"] == 512
+
+    def test_worker_count_defaults_to_cpu_count(self, plugin):
+        with patch("mkdocs_likec4.plugin.os.cpu_count", return_value=16):
+            assert plugin._worker_count(100) == 16
+
+    def test_worker_count_capped_by_jobs(self, plugin):
+        with patch("mkdocs_likec4.plugin.os.cpu_count", return_value=16):
+            assert plugin._worker_count(3) == 3
+
+    def test_worker_count_uses_max_workers(self, plugin):
+        plugin.config["max_workers"] = 2
+        assert plugin._worker_count(10) == 2
+
+    def test_worker_count_limited_by_memory(self, plugin):
+        plugin.config["max_workers"] = 8
+        plugin.config["worker_memory"] = 512
+        with patch.object(
+            LikeC4Plugin, "_available_memory", return_value=1536 * 1024 * 1024
+        ):
+            assert plugin._worker_count(10) == 3
+
+    def test_worker_count_at_least_one(self, plugin):
+        plugin.config["worker_memory"] = 4096
+        with patch.object(LikeC4Plugin, "_available_memory", return_value=1024):
+            assert plugin._worker_count(10) == 1
+
+    def test_available_memory_from_meminfo(self, tmp_path):
+        meminfo = tmp_path / "meminfo"
+        meminfo.write_text(
+            "MemTotal:       16000000 kB\n"
+            "MemFree:          200000 kB\n"
+            "MemAvailable:    8000000 kB\n"
+        )
+        with patch("mkdocs_likec4.plugin.MEMINFO", meminfo):
+            assert LikeC4Plugin._available_memory() == 8000000 * 1024
+
+    def test_available_memory_falls_back_to_sysconf(self, tmp_path):
+        pages = {"SC_AVPHYS_PAGES": 100, "SC_PAGE_SIZE": 4096}
+        with (
+            patch("mkdocs_likec4.plugin.MEMINFO", tmp_path / "missing"),
+            patch("mkdocs_likec4.plugin.os.sysconf", side_effect=pages.__getitem__),
+        ):
+            assert LikeC4Plugin._available_memory() == 100 * 4096
+
+
+class TestPipeline:
+    """Tests for overlapping codegen with page rendering."""
+
+    @pytest.fixture
+    def project_docs(self, docs_dir):
+        for name in ("proj1", "proj2"):
+            (docs_dir / name).mkdir()
+            (docs_dir / name / "likec4.config.json").write_text(
+                json.dumps({"name": name})
+            )
+        return docs_dir
+
+    def test_off_by_default(self, plugin, project_docs):
+        plugin.on_config({"docs_dir": str(project_docs)})
+
+        assert plugin.pipeline is None
+
+    @patch("mkdocs_likec4.plugin.CodegenPipeline")
+    def test_eager_starts_all_discovered_projects(
+        self, mock_pipeline, plugin, project_docs
+    ):
+        plugin.config["pipeline"] = "eager"
+
+        plugin.on_config({"docs_dir": str(project_docs)})
+
+        started = {c.args[0] for c in mock_pipeline.return_value.start.call_args_list}
+        assert started == {"proj1", "proj2"}
+
+    @patch("mkdocs_likec4.plugin.CodegenPipeline")
+    def test_on_demand_starts_projects_seen_on_pages(
+        self, mock_pipeline, plugin, project_docs
+    ):
+        plugin.config["pipeline"] = "on_demand"
+        plugin.on_config({"docs_dir": str(project_docs)})
+        mock_pipeline.return_value.start.assert_not_called()
+
+        page = MagicMock()
+        page.file.src_uri = "proj1/index.md"
+        page.file.src_path = "proj1/index.md"
+        plugin.on_page_markdown("```likec4-view\nindex\n```", page)
+
+        mock_pipeline.return_value.start.assert_called_once_with("proj1")
+
+    @patch("mkdocs_likec4.plugin.CodegenPipeline")
+    def test_post_build_joins_pipeline(self, mock_pipeline, plugin, tmp_path):
+        plugin.config["pipeline"] = "eager"
+        plugin.on_config({"docs_dir": str(tmp_path)})
+        plugin.page_projects = {"index.md": {None}}
+        mock_pipeline.return_value.join.return_value = []
+
+        site_dir = tmp_path / "site"
+        plugin.on_post_build({"site_dir": str(site_dir)})
+
+        mock_pipeline.return_value.join.assert_called_once_with([None], site_dir)
+        assert plugin.pipeline is None
+
+    @patch("mkdocs_likec4.plugin.CodegenPipeline")
+    def test_build_error_closes_pipeline(self, mock_pipeline, plugin, tmp_path):
+        plugin.config["pipeline"] = "eager"
+        plugin.on_config({"docs_dir": str(tmp_path)})
+
+        plugin.on_build_error(RuntimeError("boom"))
+
+        mock_pipeline.return_value.close.assert_called_once()
+        assert plugin.pipeline is None
+
+
+class TestServe:
+    """Tests for incremental regeneration during mkdocs serve."""
+
+    def test_startup_creates_tracker_for_serve(self, plugin):
+        plugin.on_startup(command="serve", dirty=False)
+
+        assert plugin.tracker is not None
+        plugin.on_shutdown()
+        assert plugin.tracker is None
+
+    def test_startup_no_tracker_for_build(self, plugin):
+        plugin.on_startup(command="build", dirty=False)
+
+        assert plugin.tracker is None
+
+    def test_on_config_resets_page_state(self, plugin, docs_dir):
+        plugin.page_projects = {"old.md": {"gone"}}
+        plugin.pages_with_auto_views = {"old.md"}
+
+        plugin.on_config({"docs_dir": str(docs_dir)})
+
+        assert plugin.page_projects == {}
+        assert plugin.pages_with_auto_views == set()
+
+    def test_on_serve_watches_project_dirs(self, plugin, docs_dir):
+        plugin.tracker = MagicMock()
+        plugin.docs_dir = docs_dir
+        plugin.project_map = {"proj": "proj"}
+        server = MagicMock()
+
+        assert plugin.on_serve(server, config={}, builder=None) is server
+
+        plugin.tracker.watch.assert_called_once_with(
+            {"proj": docs_dir / "proj"}, server.observer
+        )
+
+    @patch("mkdocs_likec4.plugin.WebComponentGenerator.generate")
+    def test_post_build_generates_only_stale_projects(
+        self, mock_generate, plugin, tmp_path
+    ):
+        plugin.docs_dir = tmp_path / "docs"
+        plugin.project_map = {"a": "a", "b": "b"}
+        plugin.page_projects = {"page.md": {"a", "b"}}
+        plugin.tracker = MagicMock()
+        plugin.tracker.reuse.return_value = ["b"]
+
+        plugin.on_post_build({"site_dir": str(tmp_path / "site")})
+
+        assert [c.args[0] for c in mock_generate.call_args_list] == ["b"]
+        plugin.tracker.remember.assert_called_once()
+
+    @pytest.mark.parametrize("pipeline", ["eager", "on_demand"])
+    @patch("mkdocs_likec4.plugin.WebComponentGenerator.generate")
+    def test_pipeline_skips_unchanged_projects(
+        self, mock_generate, pipeline, plugin, docs_dir, tmp_path, page
+    ):
+        (docs_dir / "likec4.config.json").write_text(json.dumps({"name": "proj"}))
+
+        def generate(project, project_dir, build_dir, site_dir, **kwargs):
+            dest = site_dir / WebComponentGenerator.get_script_path(project)
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            dest.write_text("bundle")
+            return GenerationResult(project, ok=True)
+
+        mock_generate.side_effect = generate
+        plugin.config["pipeline"] = pipeline
+        plugin.config["serve_debounce"] = 0
+        plugin.on_startup(command="serve", dirty=False)
+        site_dir = tmp_path / "site"
+
+        for _ in range(3):
+            plugin.on_config({"docs_dir": str(docs_dir)})
+            plugin.on_page_markdown("```likec4-view\nindex\n```", page=page)
+            plugin.on_post_build({"site_dir": str(site_dir)})
+
+        plugin.on_shutdown()
+        assert mock_generate.call_count == 1
+        assert (site_dir / WebComponentGenerator.get_script_path("proj")).is_file()
+
+
+class TestLikec4Path:
+    """Tests for resolving the likec4 executable."""
+
+    def test_resolved_on_config(self, plugin, docs_dir, tmp_path):
+        likec4 = tmp_path / "bin" / "likec4"
+        likec4.parent.mkdir()
+        likec4.write_text("")
+        plugin.config["likec4_path"] = "bin/likec4"
+
+        plugin.on_config(
+            {
+                "docs_dir": str(docs_dir),
+                "config_file_path": str(tmp_path / "mkdocs.yml"),
+            }
+        )
+
+        assert plugin.cli.command == [str(likec4)]
+
+    @patch("mkdocs_likec4.plugin.WebComponentGenerator.generate")
+    def test_post_build_passes_cli(self, mock_generate, plugin, tmp_path):
+        plugin.docs_dir = tmp_path / "docs"
+        plugin.project_map = {"proj": "proj"}
+        plugin.page_projects = {"page.md": {"proj"}}
+        plugin.cli = MagicMock()
+
+        plugin.on_post_build({"site_dir": str(tmp_path / "site")})
+
+        assert mock_generate.call_args.kwargs["cli"] is plugin.cli
+
+
+class TestTreeShake:
+    """Tests for the tree_shake option."""
+
+    @pytest.fixture
+    def page(self, make_page):
+        return make_page("page.md")
+
+    def test_views_recorded_per_project(self, plugin, docs_dir, page):
+        plugin.on_config({"docs_dir": str(docs_dir)})
+
+        plugin.on_page_markdown(
+            "```likec4-view project=a\nindex\n```\n"
+            "```likec4-view project=a\nflow\n```\n"
+            "```likec4-view project=b\nindex\n```\n",
+            page,
+        )
+
+        assert plugin.project_views == {"a": {"index", "flow"}, "b": {"index"}}
+
+    @patch("mkdocs_likec4.plugin.WebComponentGenerator.generate")
+    def test_disabled_by_default(self, mock_generate, plugin, tmp_path):
+        plugin.docs_dir = tmp_path / "docs"
+        plugin.project_map = {"a": "a"}
+        plugin.page_projects = {"page.md": {"a"}}
+        plugin.project_views = {"a": {"index"}}
+
+        plugin.on_post_build({"site_dir": str(tmp_path / "site")})
+
+        assert mock_generate.call_args.kwargs["views"] is None
+
+    @patch("mkdocs_likec4.plugin.WebComponentGenerator.generate")
+    def test_passes_views(self, mock_generate, plugin, tmp_path):
+        plugin.config["tree_shake"] = True
+        plugin.docs_dir = tmp_path / "docs"
+        plugin.project_map = {"a": "a"}
+        plugin.page_projects = {"page.md": {"a"}}
+        plugin.project_views = {"a": {"index"}}
+
+        plugin.on_post_build({"site_dir": str(tmp_path / "site")})
+
+        assert mock_generate.call_args.kwargs["views"] == frozenset({"index"})
+
+    def test_disables_pipeline(self, plugin, docs_dir):
+        plugin.config["tree_shake"] = True
+        plugin.config["pipeline"] = "eager"
+
+        plugin.on_config({"docs_dir": str(docs_dir)})
+
+        assert plugin.pipeline is None
+
+
+class TestOnDemandLoading:
+    """Tests for loading: on_demand."""
+
+    @pytest.fixture
+    def page(self, make_page):
+        return make_page("guide/page.md", "guide/page/")
+
+    def test_views_name_their_bundle(self, plugin, docs_dir, page):
+        plugin.config["loading"] = "on_demand"
+        plugin.on_config({"docs_dir": str(docs_dir)})
+
+        result = plugin.on_page_markdown("```likec4-view project=a\nindex\n```\n", page)
+
+        assert 'data-likec4-bundle="likec4_views_a.js"' in result
+
+    def test_eager_views_have_no_bundle(self, plugin, docs_dir, page):
+        plugin.on_config({"docs_dir": str(docs_dir)})
+
+        result = plugin.on_page_markdown("```likec4-view project=a\nindex\n```\n", page)
+
+        assert "data-likec4-bundle" not in result
+
+    def test_single_loader_script(self, plugin, page):
+        plugin.config["loading"] = "on_demand"
+        plugin.page_projects = {"guide/page.md": {"a", "b"}}
+
+        result = plugin.on_page_content("<h1>Title</h1>", page)
+
+        assert result.count("<script") == 1
+        assert "../../assets/mkdocs_likec4/loader.js" in result
+        assert "likec4_views_" not in result
+
+    @patch("mkdocs_likec4.plugin.WebComponentGenerator.generate")
+    def test_loader_copied(self, mock_generate, plugin, tmp_path):
+        plugin.config["loading"] = "on_demand"
+        plugin.docs_dir = tmp_path / "docs"
+        plugin.project_map = {"a": "a"}
+        plugin.page_projects = {"page.md": {"a"}}
+
+        plugin.on_post_build({"site_dir": str(tmp_path / "site")})
+
+        assert (tmp_path / "site" / "assets" / "mkdocs_likec4" / "loader.js").is_file()
+
+
+class TestCombinedLoading:
+    """Tests for loading: combined."""
+
+    def test_single_tag_for_all_projects(self, plugin, page):
+        plugin.config["loading"] = "combined"
+        plugin.page_projects = {"index.md": {"b", "a", "A"}}
+
+        result = plugin.on_page_content("<h1>Title</h1>", page)
+
+        assert result.count("<script") == 1
+        assert (
+            '<script src="assets/mkdocs_likec4/loader.js" '
+            'data-likec4-bundles="likec4_views_a.js likec4_views_b.js" defer></script>'
+        ) in result
+
+    def test_eager_tags_deduplicated(self, plugin, page):
+        plugin.page_projects = {"index.md": {"proj", "Proj"}}
+
+        result = plugin.on_page_content("<h1>Title</h1>", page)
+
+        assert result.count("likec4_views_proj.js") == 1
+
+    @patch("mkdocs_likec4.plugin.WebComponentGenerator.generate")
+    def test_loader_copied(self, mock_generate, plugin, tmp_path):
+        plugin.config["loading"] = "combined"
+        plugin.docs_dir = tmp_path / "docs"
+        plugin.project_map = {"a": "a"}
+        plugin.page_projects = {"page.md": {"a"}}
+
+        plugin.on_post_build({"site_dir": str(tmp_path / "site")})
+
+        assert (tmp_path / "site" / "assets" / "mkdocs_likec4" / "loader.js").is_file()
+
+
+class TestLazyLoading:
+    """Tests for lazy views."""
+
+    def test_fence_option(self, plugin, docs_dir, page):
+        plugin.on_config({"docs_dir": str(docs_dir)})
+
+        result = plugin.on_page_markdown(
+            "```likec4-view project=a loading=lazy\nindex\n```\n"
+            "```likec4-view project=b\nindex\n```\n",
+            page,
+        )
+        html = plugin.on_page_content(result, page)
+
+        assert 'data-likec4-lazy="likec4_views_a.js"' in html
+        assert (
+            '<script src="assets/mkdocs_likec4/loader.js" '
+            'data-likec4-bundles="likec4_views_b.js" defer>'
+        ) in html
+        assert '<script src="assets/mkdocs_likec4/likec4_views_' not in html
+
+    def test_global_option(self, plugin, docs_dir, page):
+        plugin.config["lazy"] = True
+        plugin.on_config({"docs_dir": str(docs_dir)})
+
+        result = plugin.on_page_markdown(
+            "```likec4-view project=a\nindex\n```\n"
+            "```likec4-view project=a loading=eager\nother\n```\n",
+            page,
+        )
+        html = plugin.on_page_content(result, page)
+
+        assert result.count("data-likec4-lazy") == 1
+        assert 'data-likec4-bundles="likec4_views_a.js"' in html
+
+    def test_eager_and_lazy_view_of_one_project(self, plugin, docs_dir, page):
+        """The bundle is loaded once, by the loader, not by a second plain tag."""
+        plugin.on_config({"docs_dir": str(docs_dir)})
+
+        result = plugin.on_page_markdown(
+            "```likec4-view project=a\nindex\n```\n"
+            "```likec4-view project=a loading=lazy\nother\n```\n",
+            page,
+        )
+        html = plugin.on_page_content(result, page)
+
+        assert 'data-likec4-lazy="likec4_views_a.js"' in html
+        assert '<script src="assets/mkdocs_likec4/likec4_views_a.js"' not in html
+        assert (
+            '<script src="assets/mkdocs_likec4/loader.js" '
+            'data-likec4-bundles="likec4_views_a.js" defer>'
+        ) in html
+
+    def test_no_loader_without_lazy_views(self, plugin, docs_dir, page):
+        plugin.on_config({"docs_dir": str(docs_dir)})
+
+        result = plugin.on_page_markdown("```likec4-view project=a\nindex\n```\n", page)
+        html = plugin.on_page_content(result, page)
+
+        assert "loader.js" not in html
+
+    @patch("mkdocs_likec4.plugin.WebComponentGenerator.generate")
+    def test_lazy_projects_generated(self, mock_generate, plugin, docs_dir, page):
+        plugin.config["lazy"] = True
+        plugin.on_config({"docs_dir": str(docs_dir)})
+        plugin.project_map = {"a": "a"}
+        plugin.on_page_markdown("```likec4-view project=a\nindex\n```\n", page)
+        site_dir = docs_dir.parent / "site"
+
+        plugin.on_post_build({"site_dir": str(site_dir)})
+
+        assert mock_generate.call_args.args[0] == "a"
+        assert (site_dir / "assets" / "mkdocs_likec4" / "loader.js").is_file()
+
+
+class TestPlaceholders:
+    """Tests for placeholder images and static views."""
+
+    @pytest.fixture
+    def exporter(self):
+        with (
+            patch("mkdocs_likec4.plugin.ViewExporter.image") as mock_image,
+            patch("mkdocs_likec4.plugin.ViewExporter.start"),
+        ):
+            mock_image.return_value = (Path("/tmp/index.png"), 640, 480)
+            yield mock_image
+
+    def test_exports_started_in_on_config(self, plugin, docs_dir, exporter):
+        (docs_dir / "a").mkdir()
+        (docs_dir / "a" / "likec4.config.json").write_text('{"name": "a"}')
+        plugin.config["placeholders"] = True
+
+        plugin.on_config({"docs_dir": str(docs_dir)})
+
+        plugin.exporter.start.assert_called_once_with("a", "a")
+        plugin.on_shutdown()
+
+    def test_exports_not_started_by_default(self, plugin, docs_dir, exporter):
+        plugin.on_config({"docs_dir": str(docs_dir)})
+
+        assert plugin.exporter is None
+
+    def test_placeholder_inside_view(self, plugin, docs_dir, page, exporter):
+        plugin.config["placeholders"] = True
+        plugin.on_config({"docs_dir": str(docs_dir)})
+
+        result = plugin.on_page_markdown("```likec4-view\nindex\n```\n", page)
+
+        assert '<likec4-view view-id="index"' in result
+        assert (
+            'src="assets/mkdocs_likec4/views/_default/index.png" alt="index" '
+            'width="640" height="480"'
+        ) in result
+        assert plugin.placeholder_images == {(None, "index")}
+
+    def test_no_export_by_default(self, plugin, docs_dir, page, exporter):
+        plugin.on_config({"docs_dir": str(docs_dir)})
+
+        plugin.on_page_markdown("```likec4-view\nindex\n```\n", page)
+
+        exporter.assert_not_called()
+
+    def test_static_view_needs_no_bundle(self, plugin, docs_dir, page, exporter):
+        plugin.on_config({"docs_dir": str(docs_dir)})
+
+        result = plugin.on_page_markdown(
+            "```likec4-view static=true\nindex\n```\n", page
+        )
+
+        assert 'class="likec4-static"' in result
+        assert "index.md" not in plugin.page_projects
+
+    def test_static_view_without_image_is_interactive(
+        self, plugin, docs_dir, page, exporter, caplog
+    ):
+        exporter.return_value = None
+        plugin.on_config({"docs_dir": str(docs_dir)})
+
+        result = plugin.on_page_markdown(
+            "```likec4-view static=true\nindex\n```\n", page
+        )
+
+        assert "<likec4-view" in result
+        assert plugin.page_projects == {"index.md": {None}}
+        assert "No image of view 'index'" in caplog.text
+
+    @patch("mkdocs_likec4.plugin.WebComponentGenerator.generate")
+    def test_images_copied_after_build(self, mock_generate, plugin, tmp_path):
+        plugin.docs_dir = tmp_path / "docs"
+        plugin.exporter = MagicMock()
+        exporter = plugin.exporter
+        plugin.placeholder_images = {("a", "index")}
+
+        plugin.on_post_build({"site_dir": str(tmp_path / "site")})
+
+        exporter.copy.assert_called_once_with("a", "index", tmp_path / "site")
+        exporter.close.assert_called_once()
+        assert plugin.exporter is None
+
+
+class TestScriptInjection:
+    """Tests for script attributes, placement, and preload hints."""
+
+    PAGE = "<html><head><title>T</title></head><body><h1>T</h1></body></html>"
+
+    @pytest.fixture
+    def view_plugin(self, plugin):
+        plugin.page_projects = {"index.md": {"proj"}}
+        return plugin
+
+    def test_deferred_by_default(self, view_plugin, page):
+        result = view_plugin.on_page_content("<h1>T</h1>", page)
+
+        assert (
+            '<script src="assets/mkdocs_likec4/likec4_views_proj.js" defer></script>'
+            in result
+        )
+
+    def test_module(self, view_plugin, page):
+        view_plugin.config["script_type"] = "module"
+
+        result = view_plugin.on_page_content("<h1>T</h1>", page)
+        output = view_plugin.on_post_page(self.PAGE, page, {})
+
+        assert 'likec4_views_proj.js" type="module"></script>' in result
+        assert (
+            '<link rel="modulepreload" href="assets/mkdocs_likec4/likec4_views_proj.js">'
+            in output
+        )
+
+    def test_blocking(self, view_plugin, page):
+        view_plugin.config["script_type"] = "blocking"
+
+        result = view_plugin.on_page_content("<h1>T</h1>", page)
+
+        assert (
+            '<script src="assets/mkdocs_likec4/likec4_views_proj.js"></script>'
+            in result
+        )
+
+    def test_preload_in_head(self, view_plugin, page):
+        output = view_plugin.on_post_page(self.PAGE, page, {})
+
+        head = output[: output.index("</head>")]
+        assert (
+            '<link rel="preload" href="assets/mkdocs_likec4/likec4_views_proj.js" '
+            'as="script">'
+        ) in head
+        assert "<script" not in output
+
+    def test_preload_disabled(self, view_plugin, page):
+        view_plugin.config["preload"] = False
+
+        assert view_plugin.on_post_page(self.PAGE, page, {}) == self.PAGE
+
+    def test_combined_bundles_preloaded(self, view_plugin, page):
+        view_plugin.config["loading"] = "combined"
+
+        output = view_plugin.on_post_page(self.PAGE, page, {})
+
+        assert 'href="assets/mkdocs_likec4/loader.js"' in output
+        assert 'href="assets/mkdocs_likec4/likec4_views_proj.js"' in output
+
+    def test_on_demand_bundles_not_preloaded(self, view_plugin, page):
+        view_plugin.config["loading"] = "on_demand"
+
+        output = view_plugin.on_post_page(self.PAGE, page, {})
+
+        assert "likec4_views_proj.js" not in output
+
+    @pytest.mark.parametrize("placement", ["head", "body"])
+    def test_placement(self, view_plugin, page, placement):
+        view_plugin.config["script_placement"] = placement
+        view_plugin.config["preload"] = False
+
+        content = view_plugin.on_page_content("<h1>T</h1>", page)
+        output = view_plugin.on_post_page(self.PAGE, page, {})
+
+        assert content == "<h1>T</h1>"
+        closing = output.index(f"</{placement}>")
+        script = output.index("<script")
+        assert script < closing
+        assert script > output.index(f"<{placement}>")
+
+    def test_no_changes_without_views(self, plugin, page):
+        assert plugin.on_post_page(self.PAGE, page, {}) == self.PAGE
+
+
+class TestPrefetch:
+    """Tests for the prefetch option."""
+
+    PAGE = "<html><head></head><body><h1>T</h1></body></html>"
+
+    @patch("mkdocs_likec4.plugin.WebComponentGenerator.generate")
+    def test_manifest(self, mock_generate, plugin, tmp_path, make_page):
+        plugin.config["prefetch"] = True
+        docs = tmp_path / "docs"
+        for name in ("a", "b"):
+            (docs / name).mkdir(parents=True)
+            (docs / name / "likec4.config.json").write_text(f'{{"name": "{name}"}}')
+        plugin.on_config({"docs_dir": str(docs)})
+        plugin.on_page_markdown(
+            "```likec4-view project=b\nindex\n```\n",
+            make_page("b/index.md", "b/"),
+        )
+        plugin.on_page_markdown(
+            "```likec4-view project=a\nindex\n```\n```likec4-view project=b\nx\n```\n",
+            make_page("index.md", ""),
+        )
+        plugin.on_page_markdown(
+            "```likec4-view project=missing\nindex\n```\n",
+            make_page("other.md", "other/"),
+        )
+
+        plugin.on_post_build({"site_dir": str(tmp_path / "site")})
+
+        assets = tmp_path / "site" / "assets" / "mkdocs_likec4"
+        assert json.loads((assets / "prefetch.json").read_text()) == {
+            "bundles": [
+                "assets/mkdocs_likec4/likec4_views_a.js",
+                "assets/mkdocs_likec4/likec4_views_b.js",
+            ],
+            "pages": {"b/": [1], "": [0, 1]},
+        }
+        assert (assets / "prefetch.js").is_file()
+
+    def test_script_on_every_page(self, plugin, make_page):
+        plugin.config["prefetch"] = True
+
+        output = plugin.on_post_page(self.PAGE, make_page("a/b.md", "a/b/"), {})
+
+        assert (
+            '<script src="../../assets/mkdocs_likec4/prefetch.js" defer></script>\n'
+            "</body>"
+        ) in output
+
+    def test_disabled_by_default(self, plugin, make_page):
+        output = plugin.on_post_page(self.PAGE, make_page("a.md", "a/"), {})
+
+        assert output == self.PAGE
+
+
+class TestInstantNavigation:
+    """Tests for themes with instant navigation."""
+
+    def test_detected_from_theme_features(self, plugin, docs_dir):
+        plugin.on_config(
+            {
+                "docs_dir": str(docs_dir),
+                "theme": {"features": ["navigation.instant", "content.code.copy"]},
+            }
+        )
+
+        assert plugin.instant_navigation is True
+
+    def test_not_detected_without_feature(self, plugin, docs_dir):
+        plugin.on_config({"docs_dir": str(docs_dir), "theme": {"features": []}})
+
+        assert plugin.instant_navigation is False
+
+    def test_eager_bundles_go_through_loader(self, plugin, page):
+        plugin.instant_navigation = True
+        plugin.page_projects = {"index.md": {"a"}}
+
+        result = plugin.on_page_content("<h1>T</h1>", page)
+
+        assert result.count("<script") == 1
+        assert 'data-likec4-bundles="likec4_views_a.js"' in result
+
+    @patch("mkdocs_likec4.plugin.WebComponentGenerator.generate")
+    def test_loader_copied(self, mock_generate, plugin, tmp_path):
+        plugin.instant_navigation = True
+        plugin.docs_dir = tmp_path / "docs"
+        plugin.project_map = {"a": "a"}
+        plugin.page_projects = {"page.md": {"a"}}
+
+        plugin.on_post_build({"site_dir": str(tmp_path / "site")})
+
+        assert (tmp_path / "site" / "assets" / "mkdocs_likec4" / "loader.js").is_file()
+
+
+class TestHashFilenames:
+    """Tests for the hash_filenames option."""
+
+    def build(self, plugin, tmp_path):
+        site_dir = tmp_path / "site"
+        page = MagicMock()
+        page.file.src_uri = "index.md"
+        page.file.abs_dest_path = str(site_dir / "index.html")
+        page.url = ""
+        plugin.docs_dir = tmp_path / "docs"
+        plugin.project_map = {"a": "a"}
+        plugin.page_projects = {"index.md": {"a"}}
+        plugin.page_urls = {"index.md": ""}
+
+        content = plugin.on_page_content("<h1>T</h1>", page)
+        output = plugin.on_post_page(
+            f"<html><head></head><body>{content}</body></html>", page, {}
+        )
+        site_dir.mkdir()
+        (site_dir / "index.html").write_text(output)
+
+        def generate(project, project_dir, build_dir, site, **kwargs):
+            bundle = site / WebComponentGenerator.get_script_path(project)
+            bundle.parent.mkdir(parents=True, exist_ok=True)
+            bundle.write_text(f"bundle {project}")
+            return GenerationResult(project, ok=True)
+
+        with patch(
+            "mkdocs_likec4.plugin.WebComponentGenerator.generate", side_effect=generate
+        ):
+            plugin.on_post_build({"site_dir": str(site_dir)})
+        return site_dir
+
+    def test_disabled_by_default(self, plugin, tmp_path):
+        assets = self.build(plugin, tmp_path) / "assets" / "mkdocs_likec4"
+
+        assert (assets / "likec4_views_a.js").is_file()
+        assert not (assets / "manifest.json").exists()
+
+    def test_bundles_renamed_and_pages_updated(self, plugin, tmp_path):
+        plugin.config["hash_filenames"] = True
+        plugin.config["prefetch"] = True
+        site_dir = self.build(plugin, tmp_path)
+
+        assets = site_dir / "assets" / "mkdocs_likec4"
+        manifest = json.loads((assets / "manifest.json").read_text())
+        hashed = manifest["assets/mkdocs_likec4/likec4_views_a.js"]
+        html = (site_dir / "index.html").read_text()
+        prefetch = json.loads((assets / "prefetch.json").read_text())
+
+        assert (site_dir / hashed).read_text() == "bundle a"
+        assert not (assets / "likec4_views_a.js").exists()
+        assert "likec4_views_a.js" not in html
+        assert html.count(hashed) == 2
+        assert prefetch["bundles"] == [hashed]
+
+
+class TestCompress:
+    """Tests for the compress option."""
+
+    build = TestHashFilenames.build
+
+    def test_disabled_by_default(self, plugin, tmp_path):
+        assets = self.build(plugin, tmp_path) / "assets" / "mkdocs_likec4"
+
+        assert not list(assets.glob("*.gz"))
+
+    def test_gzip_variants(self, plugin, tmp_path, caplog):
+        plugin.config["compress"] = ["gzip"]
+        plugin.pages_with_auto_views = {"index.md"}
+        with caplog.at_level(logging.INFO):
+            assets = self.build(plugin, tmp_path) / "assets" / "mkdocs_likec4"
+
+        bundle = assets / "likec4_views_a.js.gz"
+        assert gzip.decompress(bundle.read_bytes()) == b"bundle a"
+        assert (assets / "theme_sync.js.gz").is_file()
+        assert (
+            "Compressed assets/mkdocs_likec4/likec4_views_a.js: 8 B ->" in caplog.text
+        )
+
+    def test_hashed_bundles_are_compressed(self, plugin, tmp_path):
+        plugin.config["compress"] = ["gzip"]
+        plugin.config["hash_filenames"] = True
+        site_dir = self.build(plugin, tmp_path)
+
+        manifest = json.loads(
+            (site_dir / "assets" / "mkdocs_likec4" / "manifest.json").read_text()
+        )
+        hashed = manifest["assets/mkdocs_likec4/likec4_views_a.js"]
+        assert (site_dir / f"{hashed}.gz").is_file()
+
+    def test_missing_brotli_is_skipped(self, plugin, tmp_path, caplog):
+        plugin.config["compress"] = ["gzip", "brotli"]
+        with patch("mkdocs_likec4.compress.brotli", None):
+            assets = self.build(plugin, tmp_path) / "assets" / "mkdocs_likec4"
+
+        assert (assets / "likec4_views_a.js.gz").is_file()
+        assert not (assets / "likec4_views_a.js.br").exists()
+        assert "install the 'brotli' package" in caplog.text
+
+    def test_invalid_encoding(self):
+        plugin = LikeC4Plugin()
+        errors, _ = plugin.load_config({"compress": ["zstd"]})
+
+        assert errors
+
+
+class TestSizeBudgets:
+    """Tests for the bundle size budgets and the size report."""
+
+    build = TestHashFilenames.build
+
+    def test_no_report_by_default(self, plugin, tmp_path):
+        self.build(plugin, tmp_path)
+
+        assert not list(tmp_path.rglob("*sizes*.json"))
+
+    def test_exceeded_budget_warns(self, plugin, tmp_path, caplog):
+        plugin.config["budget_project"] = 0
+
+        self.build(plugin, tmp_path)
+
+        assert "Bundle of project 'a' is 8 B, over its budget of 0 B" in caplog.text
+
+    def test_strict_budget_fails_build(self, plugin, tmp_path):
+        plugin.config["budget_total_gzip"] = 0
+        plugin.config["budget_strict"] = True
+
+        with pytest.raises(PluginError, match="Total gzipped bundle size"):
+            self.build(plugin, tmp_path)
+
+    def test_within_budget(self, plugin, tmp_path, caplog):
+        plugin.config["budget_project"] = 1
+        plugin.config["budget_strict"] = True
+
+        self.build(plugin, tmp_path)
+
+        assert "over its budget" not in caplog.text
+
+    def test_size_report(self, plugin, tmp_path):
+        plugin.config["hash_filenames"] = True
+        plugin.size_report = tmp_path / "sizes.json"
+
+        site_dir = self.build(plugin, tmp_path)
+
+        report = json.loads((tmp_path / "sizes.json").read_text())
+        manifest = json.loads(
+            (site_dir / "assets" / "mkdocs_likec4" / "manifest.json").read_text()
+        )
+        [bundle] = report["bundles"]
+        assert bundle["project"] == "a"
+        assert bundle["path"] == manifest["assets/mkdocs_likec4/likec4_views_a.js"]
+        assert bundle["size"] == 8
+        assert report["exceeded"] == []
+
+    def test_report_path_relative_to_config(self, plugin, tmp_path):
+        plugin.config["size_report"] = "reports/sizes.json"
+        docs = tmp_path / "docs"
+        docs.mkdir()
+
+        plugin.on_config(
+            {
+                "docs_dir": str(docs),
+                "config_file_path": str(tmp_path / "mkdocs.yml"),
+            }
+        )
+
+        assert plugin.size_report == tmp_path / "reports" / "sizes.json"
+
+
+class TestProfileReport:
+    """Tests for the profile_report option."""
+
+    build = TestHashFilenames.build
+
+    def test_disabled_by_default(self, plugin, tmp_path, caplog):
+        with caplog.at_level(logging.INFO):
+            self.build(plugin, tmp_path)
+
+        assert "Profile:" not in caplog.text
+
+    def test_markdown_time_and_blocks(self, plugin, docs_dir, page):
+        plugin.on_config({"docs_dir": str(docs_dir)})
+
+        plugin.on_page_markdown("```likec4-view\na\n```\n```likec4-view\nb\n```", page)
+        plugin.on_page_markdown("# No views", page)
+
+        assert plugin.profile.pages == 2
+        assert plugin.profile.blocks == 2
+        assert plugin.profile.markdown > 0
+        assert plugin.profile.discovery > 0
+
+    def test_report_written_and_logged(self, plugin, tmp_path, caplog):
+        plugin.profile_report = tmp_path / "profile.json"
+
+        with caplog.at_level(logging.INFO):
+            self.build(plugin, tmp_path)
+
+        report = json.loads((tmp_path / "profile.json").read_text())
+        assert [r["project"] for r in report["codegen"]] == ["a"]
+        assert "Profile: codegen for project 'a'" in caplog.text
+
+
+class TestTrace:
+    """Tests for the trace option."""
+
+    def test_disabled_by_default(self, plugin, docs_dir, monkeypatch):
+        monkeypatch.delenv("MKDOCS_LIKEC4_TRACE", raising=False)
+        plugin.on_startup(command="build", dirty=False)
+        plugin.on_config({"docs_dir": str(docs_dir)})
+
+        assert not plugin.tracer.enabled
+        assert plugin.trace_file is None
+
+    def test_trace_written_on_shutdown(self, plugin, docs_dir, tmp_path, page):
+        plugin.config["trace"] = "trace.json"
+        plugin.on_startup(command="build", dirty=False)
+        plugin.on_config(
+            {
+                "docs_dir": str(docs_dir),
+                "config_file_path": str(tmp_path / "mkdocs.yml"),
+            }
+        )
+        plugin.on_page_markdown("```likec4-view\na\n```", page=page)
+
+        plugin.on_shutdown()
+
+        events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+        spans = [(e["name"], e.get("args")) for e in events if e["ph"] == "X"]
+        assert ("on_config", None) in spans
+        assert ("on_page_markdown", {"page": "index.md"}) in spans
+
+    def test_environment_variable(self, plugin, docs_dir, tmp_path, monkeypatch):
+        monkeypatch.setenv("MKDOCS_LIKEC4_TRACE", str(tmp_path / "env.json"))
+        plugin.on_startup(command="build", dirty=False)
+        plugin.on_config({"docs_dir": str(docs_dir)})
+
+        plugin.on_shutdown()
+
+        assert (tmp_path / "env.json").is_file()
+
+
+class TestProjectDiscoveryOptions:
+    """Tests for the projects_include/projects_exclude options and the index."""
+
+    def test_node_modules_and_hidden_excluded_by_default(self, plugin, docs_dir):
+        for rel, name in [("shop", "shop"), ("node_modules/x", "x"), (".git/y", "y")]:
+            (docs_dir / rel).mkdir(parents=True)
+            (docs_dir / rel / "likec4.config.json").write_text(
+                json.dumps({"name": name})
+            )
+
+        plugin.on_config({"docs_dir": str(docs_dir)})
+
+        assert plugin.project_map == {"shop": "shop"}
+
+    def test_include(self, plugin, docs_dir):
+        for rel in ["architecture", "examples"]:
+            (docs_dir / rel).mkdir()
+            (docs_dir / rel / "likec4.config.json").write_text(
+                json.dumps({"name": rel})
+            )
+        plugin.config["projects_include"] = ["architecture/"]
+
+        plugin.on_config({"docs_dir": str(docs_dir)})
+
+        assert plugin.project_map == {"architecture": "architecture"}
+
+    def test_exclude_docs(self, plugin, docs_dir):
+        (docs_dir / "drafts").mkdir()
+        (docs_dir / "drafts" / "likec4.config.json").write_text(
+            json.dumps({"name": "drafts"})
+        )
+        # What MkDocs' PathSpec option makes of `exclude_docs`
+        exclude_docs = pathspec.GitIgnoreSpec.from_lines(["drafts/"])
+
+        plugin.on_config({"docs_dir": str(docs_dir), "exclude_docs": exclude_docs})
+
+        assert plugin.project_map == {None: "."}
+
+    def test_index_kept_in_cache_dir(self, docs_dir, tmp_path):
+        (docs_dir / "likec4.config.json").write_text(json.dumps({"name": "root"}))
+        plugin = LikeC4Plugin()
+        plugin.load_config({"cache_dir": ".cache/likec4"})
+
+        plugin.on_config(
+            {
+                "docs_dir": str(docs_dir),
+                "config_file_path": str(tmp_path / "mkdocs.yml"),
+            }
+        )
+
+        index = json.loads((tmp_path / ".cache/likec4/discovery.json").read_text())
+        assert index["configs"]["likec4.config.json"][2] == "root"
+        plugin.on_shutdown()
@@ -0,0 +1,109 @@
+import json
+import os
+import subprocess
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from mkdocs_likec4.generator import GenerationResult
+from mkdocs_likec4.profiling import BuildProfile, ProcessUsage, run_measured
+
+needs_wait4 = pytest.mark.skipif(not hasattr(os, "wait4"), reason="needs os.wait4")
+
+
+class TestRunMeasured:
+    """Tests for running a process and recording its resource usage."""
+
+    @needs_wait4
+    def test_output_and_usage(self):
+        proc = run_measured(
+            [
+                sys.executable,
+                "-c",
+                "import sys; print('out'); print('err', file=sys.stderr)",
+            ],
+            capture_output=True,
+            text=True,
+        )
+
+        assert proc.returncode == 0
+        assert proc.stdout == "out\n"
+        assert proc.stderr == "err\n"
+        assert proc.usage.cpu_time > 0
+        assert proc.usage.max_rss > 1024 * 1024
+
+    @needs_wait4
+    def test_check_raises_with_stderr(self):
+        with pytest.raises(subprocess.CalledProcessError) as e:
+            run_measured(
+                [sys.executable, "-c", "import sys; sys.exit('failed')"],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+
+        assert e.value.returncode == 1
+        assert e.value.stderr == "failed\n"
+
+    def test_missing_command(self):
+        with pytest.raises(FileNotFoundError):
+            run_measured(["/nonexistent/likec4"])
+
+    def test_without_wait4(self):
+        with patch("mkdocs_likec4.profiling.os") as mock_os:
+            del mock_os.wait4
+            proc = run_measured([sys.executable, "-c", "pass"])
+
+        assert proc.returncode == 0
+        assert proc.usage is None
+
+
+class TestBuildProfile:
+    """Tests for the per-build profile."""
+
+    @pytest.fixture
+    def profile(self):
+        profile = BuildProfile(discovery=0.25)
+        profile.add_page(0.5, 2)
+        profile.add_page(0.25, 1)
+        profile.codegen = [
+            GenerationResult(
+                "a", ok=True, duration=3.0, cpu_time=4.5, max_rss=200 * 2**20
+            ),
+            GenerationResult(None, ok=True, cached=True),
+            GenerationResult("b", ok=True, duration=1.0),
+        ]
+        return profile
+
+    def test_summary(self, profile):
+        assert profile.summary() == [
+            "project discovery 0.250s",
+            "likec4-view blocks 0.750s (3 blocks on 2 pages)",
+            "codegen for project 'a' 3.0s wall, 4.5s CPU, 200 MB peak RSS",
+            "codegen for default project cached",
+            "codegen for project 'b' 1.0s wall",
+        ]
+
+    def test_write(self, profile, tmp_path):
+        path = tmp_path / "reports" / "profile.json"
+
+        profile.write(path)
+
+        report = json.loads(path.read_text())
+        assert report["discovery"] == {"time": 0.25}
+        assert report["markdown"] == {"time": 0.75, "pages": 2, "blocks": 3}
+        assert report["codegen"][0] == {
+            "project": "a",
+            "ok": True,
+            "cached": False,
+            "wall_time": 3.0,
+            "cpu_time": 4.5,
+            "max_rss": 200 * 2**20,
+        }
+
+
+def test_process_usage_fields():
+    usage = ProcessUsage(1.5, 1024)
+
+    assert (usage.cpu_time, usage.max_rss) == (1.5, 1024)
@@ -0,0 +1,168 @@
+"""Tests for the LikeC4 serve module."""
+
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pathspec
+import pytest
+from watchdog.events import (
+    DirModifiedEvent,
+    FileClosedNoWriteEvent,
+    FileModifiedEvent,
+    FileMovedEvent,
+)
+
+from mkdocs_likec4.generator import GenerationResult, WebComponentGenerator
+from mkdocs_likec4.serve import ServeTracker, _ProjectHandler, is_source
+
+FLAGS = (False,)
+
+
+@pytest.fixture
+def tracker():
+    t = ServeTracker(debounce=0)
+    yield t
+    t.close()
+
+
+def write_bundle(site_dir, project, content="bundle"):
+    dest = site_dir / WebComponentGenerator.get_script_path(project)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    dest.write_text(content)
+    return dest
+
+
+class TestIsSource:
+    """Tests for the is_source function."""
+
+    def test_model_files(self):
+        assert is_source("/docs/proj/model.c4")
+        assert is_source("/docs/proj/views.likec4")
+
+    def test_config_file(self):
+        assert is_source("/docs/proj/likec4.config.json")
+
+    def test_markdown_is_not_a_source(self):
+        assert not is_source("/docs/proj/index.md")
+
+
+class TestProjectHandler:
+    """Tests for filtering file system events."""
+
+    def test_source_change_marks_project_dirty(self):
+        tracker = MagicMock()
+        _ProjectHandler(tracker, "proj").dispatch(FileModifiedEvent("/d/model.c4"))
+        tracker.mark_dirty.assert_called_once_with("proj")
+
+    def test_move_to_source_marks_project_dirty(self):
+        tracker = MagicMock()
+        handler = _ProjectHandler(tracker, "proj")
+        handler.dispatch(FileMovedEvent("/d/.model.c4.swp", "/d/model.c4"))
+        tracker.mark_dirty.assert_called_once_with("proj")
+
+    def test_markdown_change_ignored(self):
+        tracker = MagicMock()
+        _ProjectHandler(tracker, "proj").dispatch(FileModifiedEvent("/d/index.md"))
+        tracker.mark_dirty.assert_not_called()
+
+    def test_icon_change_marks_project_dirty(self):
+        tracker = MagicMock()
+        _ProjectHandler(tracker, "proj").dispatch(FileModifiedEvent("/d/i/db.svg"))
+        tracker.mark_dirty.assert_called_once_with("proj")
+
+    def test_excluded_change_ignored(self):
+        tracker = MagicMock()
+        exclude = pathspec.GitIgnoreSpec.from_lines(["node_modules/"])
+        handler = _ProjectHandler(tracker, "proj", Path("/d"), exclude)
+        handler.dispatch(FileModifiedEvent("/d/node_modules/pkg/icon.svg"))
+        tracker.mark_dirty.assert_not_called()
+
+    def test_directory_and_read_events_ignored(self):
+        tracker = MagicMock()
+        handler = _ProjectHandler(tracker, "proj")
+        handler.dispatch(DirModifiedEvent("/d/sub.c4"))
+        handler.dispatch(FileClosedNoWriteEvent("/d/model.c4"))
+        tracker.mark_dirty.assert_not_called()
+
+
+class TestServeTracker:
+    """Tests for reusing bundles across serve rebuilds."""
+
+    def test_first_build_generates_everything(self, tracker, tmp_path):
+        assert tracker.reuse(["a", "b"], tmp_path, FLAGS) == ["a", "b"]
+
+    def test_unchanged_project_is_reused(self, tracker, tmp_path):
+        write_bundle(tmp_path / "site1", "a", "first")
+        tracker.reuse(["a"], tmp_path / "site1", FLAGS)
+        tracker.remember([GenerationResult("a", ok=True)], tmp_path / "site1")
+
+        site_dir = tmp_path / "site2"
+        assert tracker.reuse(["a"], site_dir, FLAGS) == []
+        bundle = site_dir / WebComponentGenerator.get_script_path("a")
+        assert bundle.read_text() == "first"
+
+    def test_dirty_project_is_regenerated(self, tracker, tmp_path):
+        for project in ("a", "b"):
+            write_bundle(tmp_path, project)
+        tracker.reuse(["a", "b"], tmp_path, FLAGS)
+        tracker.remember(
+            [GenerationResult("a", ok=True), GenerationResult("b", ok=True)],
+            tmp_path,
+        )
+
+        tracker.mark_dirty("b")
+
+        assert tracker.is_stale("b")
+        assert not tracker.is_stale("a")
+        assert tracker.reuse(["a", "b"], tmp_path / "site", FLAGS) == ["b"]
+        assert not tracker.is_stale("a")
+
+    def test_failed_generation_not_remembered(self, tracker, tmp_path):
+        tracker.reuse(["a"], tmp_path, FLAGS)
+        tracker.remember([GenerationResult("a", error="boom")], tmp_path)
+
+        assert tracker.reuse(["a"], tmp_path, FLAGS) == ["a"]
+
+    def test_changed_flags_regenerate_everything(self, tracker, tmp_path):
+        write_bundle(tmp_path, "a")
+        tracker.reuse(["a"], tmp_path, (False,))
+        tracker.remember([GenerationResult("a", ok=True)], tmp_path)
+
+        assert tracker.reuse(["a"], tmp_path / "site", (True,)) == ["a"]
+
+    def test_watch_schedules_each_project(self, tracker, tmp_path):
+        observer = MagicMock()
+        (tmp_path / "a").mkdir()
+        (tmp_path / "b").mkdir()
+
+        tracker.watch({"a": tmp_path / "a", "b": tmp_path / "b"}, observer)
+
+        watched = {c.args[1] for c in observer.schedule.call_args_list}
+        assert watched == {str(tmp_path / "a"), str(tmp_path / "b")}
+
+    def test_watch_schedules_included_dirs(self, tracker, tmp_path):
+        observer = MagicMock()
+        (tmp_path / "shared").mkdir()
+        (tmp_path / "a").mkdir()
+        (tmp_path / "a" / "likec4.config.json").write_text(
+            '{"name": "a", "include": {"paths": ["../shared"]}}'
+        )
+
+        tracker.watch({"a": tmp_path / "a"}, observer)
+
+        watched = [c.args[1] for c in observer.schedule.call_args_list]
+        assert watched == [str(tmp_path / "a"), str((tmp_path / "shared").resolve())]
+
+    def test_watch_drops_removed_projects(self, tracker, tmp_path):
+        observer = MagicMock()
+        (tmp_path / "a").mkdir()
+        tracker.watch({"a": tmp_path / "a"}, observer)
+
+        tracker.watch({})
+
+        observer.unschedule.assert_called_once_with(observer.schedule.return_value)
+
+    def test_watch_without_observer_is_noop(self, tracker, tmp_path):
+        tracker.watch({"a": tmp_path})
+
+        assert tracker._watches == {}
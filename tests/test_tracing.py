@@ -0,0 +1,101 @@
+import json
+import threading
+from unittest.mock import MagicMock
+
+from mkdocs_likec4.tracing import NULL_TRACER, Tracer, traced
+
+
+class TestTracer:
+    """Tests for recording spans as Chrome trace events."""
+
+    def test_span_is_complete_event(self, tmp_path):
+        tracer = Tracer()
+        with tracer.span("codegen", "codegen", project="a"):
+            pass
+
+        tracer.write(tmp_path / "trace.json")
+
+        trace = json.loads((tmp_path / "trace.json").read_text())
+        [meta, span] = trace["traceEvents"]
+        assert meta["ph"] == "M"
+        assert meta["args"] == {"name": threading.current_thread().name}
+        assert span["name"] == "codegen"
+        assert span["cat"] == "codegen"
+        assert span["ph"] == "X"
+        assert span["args"] == {"project": "a"}
+        assert span["dur"] >= 0
+        assert span["tid"] == meta["tid"]
+
+    def test_span_recorded_on_error(self, tmp_path):
+        tracer = Tracer()
+        try:
+            with tracer.span("failing"):
+                raise ValueError
+        except ValueError:
+            pass
+
+        tracer.write(tmp_path / "trace.json")
+
+        trace = json.loads((tmp_path / "trace.json").read_text())
+        assert trace["traceEvents"][-1]["name"] == "failing"
+
+    def test_spans_from_threads(self, tmp_path):
+        tracer = Tracer()
+
+        def work():
+            with tracer.span("work"):
+                pass
+
+        threads = [threading.Thread(target=work, name=f"t{i}") for i in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        tracer.write(tmp_path / "trace.json")
+
+        events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+        names = {e["args"]["name"] for e in events if e["ph"] == "M"}
+        assert {"t0", "t1", "t2"} <= names
+        assert len([e for e in events if e["ph"] == "X"]) == 3
+
+
+class TestNullTracer:
+    def test_span_does_nothing(self, tmp_path):
+        with NULL_TRACER.span("hook", page="index.md"):
+            pass
+        NULL_TRACER.write(tmp_path / "trace.json")
+
+        assert not NULL_TRACER.enabled
+        assert not (tmp_path / "trace.json").exists()
+
+
+class Plugin:
+    def __init__(self, tracer):
+        self.tracer = tracer
+
+    @traced
+    def on_page_markdown(self, markdown, **kwargs):
+        return markdown.upper()
+
+
+class TestTraced:
+    """Tests for the hook decorator."""
+
+    def test_records_hook_with_page(self, tmp_path):
+        plugin = Plugin(Tracer())
+        page = MagicMock()
+        page.file.src_uri = "index.md"
+
+        assert plugin.on_page_markdown("text", page=page) == "TEXT"
+
+        plugin.tracer.write(tmp_path / "trace.json")
+        events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+        assert events[-1]["name"] == "on_page_markdown"
+        assert events[-1]["cat"] == "hook"
+        assert events[-1]["args"] == {"page": "index.md"}
+
+    def test_disabled(self):
+        assert Plugin(NULL_TRACER).on_page_markdown("text") == "TEXT"
+
+    def test_keeps_name(self):
+        assert Plugin.on_page_markdown.__name__ == "on_page_markdown"
@@ -0,0 +1,183 @@
+from pathlib import Path
+
+from mkdocs_likec4.treeshake import (
+    reachable,
+    remove_views,
+    scan_views,
+    shaken_workspace,
+)
+
+SOURCE = """\
+model {
+  api = system 'API' {
+    description 'view fake { not a view }'
+  }
+}
+
+views {
+  // view commented { }
+  view index {
+    title 'Landscape'
+    include *
+  }
+
+  view api of api {
+    include api.*
+    style api { color red }
+  }
+
+  dynamic view flow {
+    customer -> api 'calls' {
+      navigateTo api
+    }
+  }
+
+  deployment view prod {
+    include prod.**
+  }
+
+  view of api {
+    include *
+  }
+}
+"""
+
+EXTENDS = """\
+views {
+  view base {
+    include *
+  }
+
+  view child extends base {
+    include api
+  }
+
+  view unrelated {
+    include *
+  }
+}
+"""
+
+
+class TestScanViews:
+    """Tests for finding view declarations."""
+
+    def test_named_views(self):
+        assert [v.name for v in scan_views(SOURCE)] == ["index", "api", "flow", "prod"]
+
+    def test_ignores_strings_and_comments(self):
+        names = {v.name for v in scan_views(SOURCE)}
+
+        assert "fake" not in names
+        assert "commented" not in names
+
+    def test_navigate_to_refs(self):
+        flow = next(v for v in scan_views(SOURCE) if v.name == "flow")
+
+        assert flow.refs == {"api"}
+
+    def test_extends_refs(self):
+        child = next(v for v in scan_views(EXTENDS) if v.name == "child")
+
+        assert child.refs == {"base"}
+
+    def test_views_outside_views_block_ignored(self):
+        assert scan_views("model {\n  view x {\n  }\n}\n") == []
+
+
+class TestRemoveViews:
+    """Tests for cutting views out of a source file."""
+
+    def test_removes_blocks_and_keeps_lines(self):
+        views = [v for v in scan_views(SOURCE) if v.name in ("api", "prod")]
+
+        result = remove_views(SOURCE, views)
+
+        assert result.count("\n") == SOURCE.count("\n")
+        assert [v.name for v in scan_views(result)] == ["index", "flow"]
+        assert "view of api" in result
+
+
+class TestReachable:
+    """Tests for following navigateTo links."""
+
+    def test_transitive(self):
+        views = {v.name: [v] for v in scan_views(SOURCE)}
+
+        assert reachable(views, {"flow"}) == {"flow", "api"}
+
+    def test_unknown_roots_kept(self):
+        assert reachable({}, {"missing"}) == {"missing"}
+
+
+class TestShakenWorkspace:
+    """Tests for the filtered copy of a project."""
+
+    def test_copies_filtered_sources(self, tmp_path):
+        project = tmp_path / "proj"
+        (project / "sub").mkdir(parents=True)
+        (project / "likec4.config.json").write_text('{"name": "proj"}')
+        (project / "sub" / "views.c4").write_text(SOURCE)
+        (project / "notes.md").write_text("ignored")
+
+        with shaken_workspace(project, {"index"}) as workspace:
+            files = sorted(
+                p.relative_to(workspace).as_posix() for p in workspace.rglob("*.*")
+            )
+            names = [
+                v.name for v in scan_views((workspace / "sub" / "views.c4").read_text())
+            ]
+
+        assert files == ["likec4.config.json", "sub/views.c4"]
+        assert names == ["index"]
+        assert not Path(workspace).exists()
+
+    def test_keeps_extended_views(self, tmp_path):
+        project = tmp_path / "proj"
+        project.mkdir()
+        (project / "likec4.config.json").write_text('{"name": "proj"}')
+        (project / "v.c4").write_text(EXTENDS)
+
+        with shaken_workspace(project, {"child"}) as workspace:
+            names = [v.name for v in scan_views((workspace / "v.c4").read_text())]
+
+        assert names == ["base", "child"]
+
+    def test_keeps_local_icons(self, tmp_path):
+        project = tmp_path / "proj"
+        (project / "icons").mkdir(parents=True)
+        (project / "likec4.config.json").write_text('{"name": "proj"}')
+        (project / "m.c4").write_text(
+            "model {\n  db = element {\n    icon ./icons/db.svg\n  }\n}\n" + EXTENDS
+        )
+        (project / "icons" / "db.svg").write_text("<svg/>")
+        (project / "node_modules" / "pkg").mkdir(parents=True)
+        (project / "node_modules" / "pkg" / "x.svg").write_text("<svg/>")
+
+        with shaken_workspace(project, {"base"}) as workspace:
+            files = sorted(
+                p.relative_to(workspace).as_posix() for p in workspace.rglob("*.*")
+            )
+            icon = (workspace / "icons" / "db.svg").read_text()
+
+        assert files == ["icons/db.svg", "likec4.config.json", "m.c4"]
+        assert icon == "<svg/>"
+
+    def test_links_included_dirs(self, tmp_path):
+        project = tmp_path / "docs" / "proj"
+        project.mkdir(parents=True)
+        shared = tmp_path / "shared"
+        shared.mkdir()
+        (shared / "specs.c4").write_text("specification { }")
+        (project / "likec4.config.json").write_text(
+            '{"name": "proj", "include": {"paths": ["../../shared"]}}'
+        )
+        (project / "v.c4").write_text(EXTENDS)
+
+        with shaken_workspace(project, {"unrelated"}) as workspace:
+            included = (workspace / "../../shared/specs.c4").read_text()
+            names = [v.name for v in scan_views((workspace / "v.c4").read_text())]
+
+        assert included == "specification { }"
+        assert names == ["unrelated"]
+        assert (shared / "specs.c4").exists()